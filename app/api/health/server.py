@@ -1,4 +1,7 @@
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Depends, status
+from dependency_injector.wiring import inject
+from app.utils.dependencyManager import Dependencies
+from app.dependencies.jwtAuth import require_admin
 from datetime import datetime
 import platform
 import psutil
@@ -42,4 +45,137 @@ async def health_check():
             "status": "Down",
             "timestamp": datetime.now().isoformat(),
             "error": str(e)
-        }, status.HTTP_503_SERVICE_UNAVAILABLE
\ No newline at end of file
+        }, status.HTTP_503_SERVICE_UNAVAILABLE
+
+@server_health_router.get("/health/db",
+    summary="Database Connection Pool Stats",
+    description="Returns the configured MongoDB pool limits and live pool statistics of this worker: connections checked out, available, wait-queue length and connection-creation latency",
+    response_description="MongoDB connection pool metrics"
+)
+@inject
+async def db_pool_stats(db:Dependencies.MongoDBClientDependency):
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "pool": db.pool_stats()
+    }
+
+
+@server_health_router.get("/health/db/indexes",
+    summary="Database Index Report",
+    description="Compares the index registry with the cluster: missing, unused ($indexStats) and undeclared indexes per collection",
+    response_description="MongoDB index report"
+)
+@inject
+async def db_index_report(base_repo:Dependencies.BaseRepositoryDependency):
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "indexes": await base_repo.index_report()
+    }
+
+
+@server_health_router.get("/health/db/indexes/explain",
+    summary="Hot Query Plans",
+    description="Admin only. Explains every hot query against the cluster and returns the winning plan stages, and the ones falling back to COLLSCAN",
+    response_description="Winning plan stages per hot query",
+    dependencies=[Depends(require_admin)]
+)
+@inject
+async def db_hot_query_plans(base_repo:Dependencies.BaseRepositoryDependency):
+    plans = await base_repo.explain_hot_queries()
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "hot_queries": plans,
+        "collection_scans": [name for name, stages in plans.items() if "COLLSCAN" in stages]
+    }
+
+
+@server_health_router.get("/health/config-cache",
+    summary="Reference Config Cache Stats",
+    description="Returns hits, misses, invalidation source and the version stamp of every cached config collection of this worker",
+    response_description="Config cache metrics"
+)
+@inject
+async def config_cache_stats(config_cache:Dependencies.ConfigCacheDependency):
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "cache": config_cache.cache_stats()
+    }
+
+
+@server_health_router.get("/health/hashing",
+    summary="Password Hashing Pool Stats",
+    description="Returns the argon2 worker pool size, live running/queued jobs, utilisation, rejected (shed) jobs and average queue wait and hash time of this worker",
+    response_description="Password hashing pool metrics"
+)
+@inject
+async def hashing_pool_stats(security:Dependencies.SecurityDependency):
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "pool": security.hashing_stats()
+    }
+
+
+@server_health_router.get("/health/last-login",
+    summary="last_login Write-Behind Buffer Stats",
+    description="Returns the users waiting to be flushed, logins coalesced per user, and the count, failures and latency of the bulk flushes of this worker",
+    response_description="last_login buffer metrics"
+)
+@inject
+async def last_login_buffer_stats(last_login_buffer:Dependencies.LastLoginBufferDependency):
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "buffer": last_login_buffer.buffer_stats()
+    }
+
+
+@server_health_router.get("/health/token-cache",
+    summary="Verified Token Cache Stats",
+    description="Returns the size, hit/miss, eviction and expiration counters of the verified access token cache and the size of its revocation lists for this worker",
+    response_description="Verified token cache metrics"
+)
+@inject
+async def token_cache_stats(security:Dependencies.SecurityDependency):
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "cache": security.token_cache.cache_stats()
+    }
+
+
+@server_health_router.get("/health/login-rate-limiter",
+    summary="Login Rate Limiter Stats",
+    description="Returns the backend, the per-user and per-IP token bucket rules, the buckets tracked in memory and the allowed/throttled login attempts of this worker",
+    response_description="Login rate limiter metrics"
+)
+@inject
+async def login_rate_limiter_stats(rate_limiter:Dependencies.LoginRateLimiterDependency):
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "limiter": rate_limiter.limiter_stats()
+    }
+
+
+@server_health_router.get("/health/fee-table",
+    summary="Compiled Fee Table and Quote Cache Stats",
+    description="Returns the config version, compile time and number of compilations of the in-memory fee table used for course fee quotes, the grades and subject counts it covers, and the size and hit rate of the quote cache of this worker",
+    response_description="Fee table and quote cache metrics"
+)
+@inject
+async def fee_table_stats(fee_tables:Dependencies.FeeTableDependency, quote_cache:Dependencies.FeeQuoteCacheDependency):
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "fee_table": fee_tables.table_stats(),
+        "quote_cache": quote_cache.cache_stats()
+    }
+
+
+@server_health_router.get("/health/student-profiles",
+    summary="Student Profile Cache Stats",
+    description="Returns the size, hit/miss, eviction, expiration and invalidation counters of the assembled student profile cache of this worker",
+    response_description="Student profile cache metrics"
+)
+@inject
+async def student_profile_cache_stats(profile_cache:Dependencies.StudentProfileCacheDependency):
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "cache": profile_cache.cache_stats()
+    }
@@ -1,8 +1,14 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, status
 from dependency_injector.wiring import inject
 from app.utils.dependencyManager import Dependencies
+from app.dependencies.jwtAuth import require_admin
 
-from app.schemas.admin_client_req_res import AddNewStudentRequest, AddNewTeacherRequest
+from app.schemas.admin_client_req_res import AddNewStudentRequest, AddNewTeacherRequest, BulkImportResponse
+from app.schemas.admin_client_req_res import StudentListFilters, TeacherListFilters, ListPageResponse, CoachingModes, FeeTypes
+from app.schemas.admin_client_req_res import MarkAttendanceRequest, MarkAttendanceResponse
+from app.utils.bulkImport import row_parser
+from datetime import date
+from typing import Any, Dict, List, Literal, Optional
 
 admin_router = APIRouter(
     prefix="/v1/admin",
@@ -15,13 +21,94 @@ admin_router = APIRouter(
 async def health_check():
     return {"status": "OK"}
 
+@admin_router.get("/students", response_model=ListPageResponse, dependencies=[Depends(require_admin)])
+@inject
+async def list_students(
+    admin_service:Dependencies.AdminService,
+    grade:Optional[int] = Query(None),
+    coaching_mode:Optional[CoachingModes] = Query(None),
+    fee_type:Optional[FeeTypes] = Query(None),
+    date_joined_from:Optional[date] = Query(None, description="Inclusive"),
+    date_joined_to:Optional[date] = Query(None, description="Inclusive"),
+    order:Literal["_id", "grade"] = "_id",
+    limit:int = Query(50, ge=1, le=200),
+    cursor:Optional[str] = Query(None, description="next_cursor of the previous page"),
+    fields:Optional[str] = Query(None, description="Comma-separated fields of the list view"),
+):
+    filters = StudentListFilters(
+        grade=grade,
+        coaching_mode=coaching_mode,
+        fee_type=fee_type,
+        date_joined_from=date_joined_from,
+        date_joined_to=date_joined_to
+    )
+    return await admin_service.list_students(filters=filters, order=order, limit=limit, cursor=cursor, fields=fields)
+
+
+@admin_router.get("/teachers", response_model=ListPageResponse, dependencies=[Depends(require_admin)])
+@inject
+async def list_teachers(
+    admin_service:Dependencies.AdminService,
+    date_joined_from:Optional[date] = Query(None, description="Inclusive"),
+    date_joined_to:Optional[date] = Query(None, description="Inclusive"),
+    limit:int = Query(50, ge=1, le=200),
+    cursor:Optional[str] = Query(None, description="next_cursor of the previous page"),
+    fields:Optional[str] = Query(None, description="Comma-separated fields of the list view"),
+):
+    filters = TeacherListFilters(date_joined_from=date_joined_from, date_joined_to=date_joined_to)
+    return await admin_service.list_teachers(filters=filters, limit=limit, cursor=cursor, fields=fields)
+
+
+@admin_router.get("/students/{student_id}/profile", dependencies=[Depends(require_admin)])
+@inject
+async def get_student_profile(
+    student_id:str,
+    admin_service:Dependencies.AdminService,
+    include:Optional[str] = Query(None, description="Comma-separated sections: subjects, performance, installments. All of them by default"),
+):
+    return await admin_service.get_student_profile(student_id=student_id, include=include)
+
+
+@admin_router.post("/attendance", response_model=MarkAttendanceResponse)
+@inject
+async def mark_attendance(attendance:MarkAttendanceRequest, admin_service:Dependencies.AdminService):
+    """
+    Mark one class of one subject for a whole roster. Re-submitting the same date is harmless,
+    marks already counted are skipped.
+    """
+    return await admin_service.mark_attendance(attendance=attendance)
+
+
 @admin_router.post("/student/add")
 @inject
 async def add_new_student(student_details:AddNewStudentRequest, admin_service:Dependencies.AdminService):
-    return admin_service.add_student(student=student_details)
+    return await admin_service.add_student(student=student_details)
+
+
+@admin_router.post("/student/bulk-import", response_model=BulkImportResponse)
+@inject
+async def bulk_import_students(request:Request, admin_service:Dependencies.AdminService):
+    """
+    Onboard students from a CSV (`text/csv`, dotted column names) or NDJSON
+    (`application/x-ndjson`) upload of AddNewStudentRequest rows. The body is read as a
+    stream, so uploads of any size are never held in memory at once.
+    """
+    parse_rows = row_parser(request.headers.get("content-type", ""))
+    if parse_rows is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Upload students as text/csv or application/x-ndjson"
+        )
+    return await admin_service.bulk_import_students(rows=parse_rows(request.stream()))
 
 
 @admin_router.post("/teacher/add")
 @inject
 async def add_new_teacher(teacher_details:AddNewTeacherRequest, admin_service:Dependencies.AdminService):
-    return admin_service.add_teacher(teacher=teacher_details)
\ No newline at end of file
+    return await admin_service.add_teacher(teacher=teacher_details)
+
+
+@admin_router.post("/teacher/bulk-add", response_model=BulkImportResponse)
+@inject
+async def bulk_add_teachers(admin_service:Dependencies.AdminService, teachers:List[Dict[str, Any]] = Body(..., description="AddNewTeacherRequest payloads, validated one by one")):
+    return await admin_service.bulk_add_teachers(teachers=teachers)
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Request, status
 from dependency_injector.wiring import inject
 from app.utils.dependencyManager import Dependencies
 
-from app.schemas.auth_schema import LoginRequest, Token
-from app.dependencies.jwtAuth import get_current_user_id
-from app.exceptions.authExceptions import UserNotFound, InvalidCredentials, AccessDenied
+from app.schemas.auth_schema import LoginRequest, Token, RefreshRequest
+from typing import Optional
+from app.dependencies.jwtAuth import get_current_user_id, oauth2_scheme, require_admin
+from app.exceptions.authExceptions import UserNotFound, InvalidCredentials, AccessDenied, TokenExpired, LoginThrottled
+from math import ceil
 
 auth_router = APIRouter(
     prefix="/v1/auth",
@@ -16,7 +18,7 @@ auth_router = APIRouter(
 
 @auth_router.post("/login", response_model=Token)
 @inject
-async def login(creds:LoginRequest, auth_service:Dependencies.AuthService):
+async def login(creds:LoginRequest, request:Request, auth_service:Dependencies.AuthService, rate_limiter:Dependencies.LoginRateLimiterDependency):
     """
     Generates a JWT token given a valid user_id and password.
 
@@ -24,15 +26,20 @@ async def login(creds:LoginRequest, auth_service:Dependencies.AuthService):
         creds (LoginRequest): A Pydantic model containing the user_id and password.
 
     Returns:
-        Token: A Pydantic model containing the JWT token.
+        Token: A Pydantic model containing the JWT access token and a refresh token.
 
     Raises:
-        HTTPException: If the user_id is invalid (404) or the password is incorrect (401).
+        HTTPException: If the user_id is invalid (404), the password is incorrect (401) or too many attempts were made (429).
     """
     
     try:
-        token = auth_service.authenticate(creds.user_id, creds.password)
-        return Token(access_token=token)
+        return await auth_service.authenticate(creds.user_id, creds.password, client_ip=rate_limiter.client_ip(request.headers))
+    except LoginThrottled as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={"Retry-After": str(max(ceil(e.retry_after), 1))}
+        )
     except UserNotFound as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except AccessDenied as e:
@@ -40,6 +47,31 @@ async def login(creds:LoginRequest, auth_service:Dependencies.AuthService):
     except InvalidCredentials as e:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
     
+@auth_router.post("/refresh", response_model=Token)
+@inject
+async def refresh(body:RefreshRequest, auth_service:Dependencies.AuthService):
+    """
+    Exchanges a refresh token for a new access token and a new refresh token, without the password.
+    Each refresh token can be used once; reusing one revokes the whole session.
+
+    Args:
+        body (RefreshRequest): A Pydantic model containing the refresh token.
+
+    Returns:
+        Token: A Pydantic model containing the new JWT access token and refresh token.
+
+    Raises:
+        HTTPException: If the refresh token is invalid, expired, revoked or reused (401), or the user was deactivated (403).
+    """
+    try:
+        return await auth_service.refresh(body.refresh_token)
+    except TokenExpired:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Session expired. Please log in again.")
+    except AccessDenied as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except InvalidCredentials as e:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
+
 @auth_router.get("/token/validate")
 async def validate_token(user_id: str = Depends(get_current_user_id)):
     """
@@ -55,4 +87,54 @@ async def validate_token(user_id: str = Depends(get_current_user_id)):
         HTTPException: If the token is invalid or expired.
     """
 
-    return {"user_id": user_id}
\ No newline at end of file
+    return {"user_id": user_id}
+
+
+@auth_router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+@inject
+async def logout(auth_service:Dependencies.AuthService, token:str = Depends(oauth2_scheme), body:Optional[RefreshRequest] = None):
+    """
+    Revokes the bearer token of the current session, and its refresh tokens when one is sent.
+
+    Args:
+        token (str): The JWT token sent in the Authorization header.
+        body (Optional[RefreshRequest]): The session's refresh token.
+
+    Raises:
+        HTTPException: If the token is invalid or already expired (401).
+    """
+    try:
+        await auth_service.logout(token, refresh_token=body.refresh_token if body else None)
+    except (TokenExpired, InvalidCredentials) as e:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
+
+
+@auth_router.post("/users/{user_id}/deactivate", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(require_admin)])
+@inject
+async def deactivate_user(user_id:str, auth_service:Dependencies.AuthService):
+    """
+    Blocks a user and signs them out everywhere. Admins only.
+
+    Args:
+        user_id (str): The user to deactivate.
+
+    Raises:
+        HTTPException: If the user does not exist (404).
+    """
+    try:
+        await auth_service.deactivate_user(user_id)
+    except UserNotFound as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+
+@auth_router.get("/jwks")
+@inject
+async def jwks(security:Dependencies.SecurityDependency):
+    """
+    Publishes the public keys access tokens are signed with, so other services can verify
+    them without the secret. Empty when tokens are signed with an HMAC algorithm.
+
+    Returns:
+        dict: A JWK set.
+    """
+    return security.token_backend.jwks()
@@ -1,7 +1,12 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Header, Query, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from dependency_injector.wiring import inject
 from app.utils.dependencyManager import Dependencies
-from app.schemas.admin_client_req_res import CalculateCourseFeeRequest, CalculateCourseFeeResponse
+from app.dependencies.jwtAuth import require_admin
+from app.utils.httpCaching import etag_matches
+from app.schemas.admin_client_req_res import CalculateCourseFeeRequest, CalculateCourseFeeResponse, CourseFeeQuoteBatchResponse, InstallmentScheduleBatchResponse, Modes, PaymentType
+from datetime import date, datetime, time
+from typing import List, Literal, Optional
 
 fee_router = APIRouter(
     prefix="/v1/fee",
@@ -13,4 +18,88 @@ fee_router = APIRouter(
 @fee_router.get("/calculate-course-fee", response_model=CalculateCourseFeeResponse)
 @inject
 async def get_fee_type_configurations(studentDetails:CalculateCourseFeeRequest, fees:Dependencies.PaymentService):
-    return fees.calculate_course_fee(studentDetails=studentDetails)
\ No newline at end of file
+    return await fees.calculate_course_fee(studentDetails=studentDetails)
+
+
+@fee_router.get("/quote", response_model=CalculateCourseFeeResponse, responses={304: {"description": "Quote unchanged since the ETag sent in If-None-Match"}})
+@inject
+async def get_course_fee_quote(
+    response:Response,
+    fees:Dependencies.PaymentService,
+    grade:int,
+    date_joined:date,
+    percentage:float = Query(..., description="Previous year result, only its scholarship band matters"),
+    number_of_subjects:int = Query(..., ge=1),
+    payment_type:PaymentType = Query(...),
+    coaching_mode:Modes = Query(...),
+    if_none_match:Optional[str] = Header(None),
+):
+    """
+    Query parameter form of calculate-course-fee that HTTP caches can key on. The ETag covers
+    the fee config version and the normalised inputs, so `If-None-Match` gets a 304 until the
+    config changes, without the quote being computed.
+    """
+    fee_table, key = await fees.fee_quote_key(
+        grade=grade,
+        number_of_subjects=number_of_subjects,
+        payment_type=payment_type.value,
+        coaching_mode=coaching_mode.value,
+        percentage=percentage,
+        date_joined=datetime.combine(date_joined, time.min)
+    )
+    headers = {"ETag": key.etag(), "Cache-Control": fees.quote_cache_control}
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    quote = fees.quote_for_key(fee_table, key)
+    response.headers.update(headers)
+    return quote
+
+
+@fee_router.post("/calculate-course-fee/batch", response_model=CourseFeeQuoteBatchResponse)
+@inject
+async def calculate_course_fees(studentDetails:List[CalculateCourseFeeRequest], fees:Dependencies.PaymentService, format:Literal["columnar", "ndjson"] = "columnar"):
+    """
+    Quote many students in one request. `columnar` returns one list per quote field (index =
+    request row); `ndjson` streams one JSON object per request instead. Rows that cannot be
+    quoted are reported with their error, the others are still quoted.
+    """
+    batch = await fees.calculate_course_fees(requests=studentDetails)
+    if format == "ndjson":
+        return StreamingResponse(batch.to_ndjson(), media_type="application/x-ndjson")
+    return JSONResponse(batch.to_columnar())
+
+
+@fee_router.get("/reports/outstanding", dependencies=[Depends(require_admin)])
+@inject
+async def outstanding_fees_report(
+    fees:Dependencies.PaymentService,
+    format:Literal["ndjson", "csv"] = "ndjson",
+    as_of:Optional[date] = Query(None, description="Report day, installments whose window ended before it are overdue. Today (UTC) by default"),
+    grade:Optional[int] = Query(None),
+):
+    """
+    Unpaid installments past their payment window with the amount outstanding, grouped by grade
+    and coaching mode. Streamed as it is read from the database: installment records, a
+    `subtotal` record after each group and a final `total` record.
+    """
+    report = fees.outstanding_fees_report(as_of=as_of, grade=grade)
+    if format == "csv":
+        return StreamingResponse(
+            report.to_csv(),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="outstanding-fees-{report.as_of.isoformat()}.csv"'}
+        )
+    return StreamingResponse(report.to_ndjson(), media_type="application/x-ndjson")
+
+
+@fee_router.post("/installment-schedules", response_model=InstallmentScheduleBatchResponse)
+@inject
+async def generate_installment_schedules(studentDetails:List[CalculateCourseFeeRequest], fees:Dependencies.PaymentService):
+    """
+    Installment schedules for many students at once: each final fee is split over the
+    installments of the student's payment type (one_time FEE01, two_time FEE02, four_time
+    FEE04) with payment windows spread up to the course end date.
+    """
+    schedules = await fees.generate_installment_schedules(requests=studentDetails)
+    return JSONResponse(schedules.to_response())
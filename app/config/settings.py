@@ -1,7 +1,7 @@
 from pydantic import Field, ValidationError, field_validator
 from pydantic_settings import BaseSettings
 from functools import lru_cache
-from typing import List, Union
+from typing import List, Optional, Union
 
 class Settings(BaseSettings):
     # App info
@@ -12,12 +12,85 @@ class Settings(BaseSettings):
     jwt_secret_key: str = Field(..., env="SECRET_KEY")
     jwt_algorithm: str = Field(..., env="ALGORITHM")
     jwt_access_token_expire_minutes: int = Field(30, env="ACCESS_TOKEN_EXPIRE_MINUTES")
+    jwt_backend: str = Field("jose", env="JWT_BACKEND", description="jose or pyjwt (optional dependency)")
+    jwt_private_key_file: Optional[str] = Field(None, env="JWT_PRIVATE_KEY_FILE", description="PEM private key, required for RS*/ES* algorithms")
+    jwt_public_key_file: Optional[str] = Field(None, env="JWT_PUBLIC_KEY_FILE", description="PEM public key, derived from the private key if omitted")
+    jwt_refresh_token_expire_days: int = Field(7, env="REFRESH_TOKEN_EXPIRE_DAYS")
+    token_cache_size: int = Field(10000, env="TOKEN_CACHE_SIZE", description="Verified access tokens cached per worker")
 
     # MongoDB Settings
     mongodb_user: str = Field(..., env="MONGODB_USER")
     mongodb_password: str = Field(..., env="MONGODB_PASSWORD")
     mongodb_cluster: str = Field(..., env="MONGODB_CLUSTER")
 
+    # MongoDB Connection Pool Settings (per worker process)
+    mongodb_max_pool_size: int = Field(100, env="MONGODB_MAX_POOL_SIZE")
+    mongodb_min_pool_size: int = Field(5, env="MONGODB_MIN_POOL_SIZE")
+    mongodb_max_idle_time_ms: int = Field(300000, env="MONGODB_MAX_IDLE_TIME_MS")
+    mongodb_wait_queue_timeout_ms: int = Field(2000, env="MONGODB_WAIT_QUEUE_TIMEOUT_MS")
+    mongodb_max_connecting: int = Field(2, env="MONGODB_MAX_CONNECTING")
+    mongodb_server_selection_timeout_ms: int = Field(5000, env="MONGODB_SERVER_SELECTION_TIMEOUT_MS")
+    mongodb_compressors: str = Field("zlib", env="MONGODB_COMPRESSORS", description="Comma-separated wire compressors: zstd, snappy, zlib")
+
+    # MongoDB Client Lifecycle Settings
+    mongodb_connect_attempts: int = Field(5, env="MONGODB_CONNECT_ATTEMPTS")
+    mongodb_connect_backoff_max_seconds: float = Field(30.0, env="MONGODB_CONNECT_BACKOFF_MAX_SECONDS")
+    mongodb_shutdown_drain_timeout_seconds: float = Field(10.0, env="MONGODB_SHUTDOWN_DRAIN_TIMEOUT_SECONDS")
+    mongodb_sync_indexes_on_startup: bool = Field(True, env="MONGODB_SYNC_INDEXES_ON_STARTUP")
+
+    # Reference Config Cache Settings
+    config_cache_ttl_seconds: float = Field(3600.0, env="CONFIG_CACHE_TTL_SECONDS")
+    config_cache_poll_interval_seconds: float = Field(30.0, env="CONFIG_CACHE_POLL_INTERVAL_SECONDS")
+    config_cache_change_streams: bool = Field(True, env="CONFIG_CACHE_CHANGE_STREAMS")
+
+    # Argon2 Cost Settings (the defaults match passlib's, so existing hashes stay current)
+    argon2_time_cost: int = Field(3, env="ARGON2_TIME_COST")
+    argon2_memory_cost_kib: int = Field(65536, env="ARGON2_MEMORY_COST_KIB")
+    argon2_parallelism: int = Field(4, env="ARGON2_PARALLELISM")
+    argon2_calibrate: bool = Field(False, env="ARGON2_CALIBRATE", description="Benchmark the host at startup and pick the cost for argon2_target_verify_ms")
+    argon2_target_verify_ms: float = Field(250.0, env="ARGON2_TARGET_VERIFY_MS")
+    argon2_min_memory_cost_kib: int = Field(19456, env="ARGON2_MIN_MEMORY_COST_KIB", description="Calibration never goes below this memory cost")
+
+    # Password Hashing Pool Settings
+    password_hashing_workers: int = Field(4, env="PASSWORD_HASHING_WORKERS", description="argon2 threads per worker process, at most the CPU cores available to it")
+    password_hashing_max_queue: int = Field(64, env="PASSWORD_HASHING_MAX_QUEUE", description="Hash/verify jobs allowed to wait before requests are shed with 503")
+    password_hashing_retry_after_seconds: int = Field(2, env="PASSWORD_HASHING_RETRY_AFTER_SECONDS")
+
+    # Login Rate Limit Settings
+    login_rate_limit_backend: str = Field("memory", env="LOGIN_RATE_LIMIT_BACKEND", description="memory (per worker) or mongodb (shared by every worker)")
+    login_rate_limit_user_burst: float = Field(5, env="LOGIN_RATE_LIMIT_USER_BURST")
+    login_rate_limit_user_per_minute: float = Field(5, env="LOGIN_RATE_LIMIT_USER_PER_MINUTE")
+    login_rate_limit_ip_burst: float = Field(30, env="LOGIN_RATE_LIMIT_IP_BURST", description="Keep generous, a whole school can share one address")
+    login_rate_limit_ip_per_minute: float = Field(60, env="LOGIN_RATE_LIMIT_IP_PER_MINUTE")
+    login_rate_limit_client_ip_header: Optional[str] = Field(None, env="LOGIN_RATE_LIMIT_CLIENT_IP_HEADER", description="Header the trusted proxy sets to the client address (x-real-ip or x-forwarded-for on Vercel); the per-IP limit is off when unset")
+    login_rate_limit_eviction_interval_seconds: float = Field(60.0, env="LOGIN_RATE_LIMIT_EVICTION_INTERVAL_SECONDS")
+
+    # last_login Write-Behind Settings
+    last_login_flush_interval_seconds: float = Field(5.0, env="LAST_LOGIN_FLUSH_INTERVAL_SECONDS")
+    last_login_buffer_size: int = Field(10000, env="LAST_LOGIN_BUFFER_SIZE", description="Users buffered before a login forces a flush")
+
+    # Bulk Import Settings
+    bulk_import_chunk_size: int = Field(200, env="BULK_IMPORT_CHUNK_SIZE", description="Rows validated, hashed and written per transaction")
+
+    # Fee Quote Settings
+    fee_quote_batch_max_rows: int = Field(20000, env="FEE_QUOTE_BATCH_MAX_ROWS", description="Requests accepted by one batch fee quote")
+    fee_quote_cache_size: int = Field(4096, env="FEE_QUOTE_CACHE_SIZE", description="Distinct quotes kept per worker")
+    fee_quote_cache_ttl_seconds: float = Field(3600.0, env="FEE_QUOTE_CACHE_TTL_SECONDS")
+    fee_quote_max_age_seconds: int = Field(300, env="FEE_QUOTE_MAX_AGE_SECONDS", description="How long HTTP caches may reuse a quote without revalidating, config edits can take this long to reach them")
+
+    # Installment Schedule Settings
+    installment_payment_window_days: int = Field(15, env="INSTALLMENT_PAYMENT_WINDOW_DAYS", description="Days a generated installment stays open for payment")
+
+    # Outstanding Fees Report Settings
+    outstanding_report_batch_size: int = Field(1000, env="OUTSTANDING_REPORT_BATCH_SIZE", description="Installments fetched per cursor batch and rendered per response chunk")
+
+    # Attendance Settings
+    attendance_max_marks: int = Field(500, env="ATTENDANCE_MAX_MARKS", description="Students accepted by one attendance submission")
+
+    # Student Profile Settings
+    student_profile_cache_size: int = Field(2048, env="STUDENT_PROFILE_CACHE_SIZE", description="Student profiles kept per worker, one per student and section selection")
+    student_profile_cache_ttl_seconds: float = Field(300.0, env="STUDENT_PROFILE_CACHE_TTL_SECONDS", description="Bounds how stale another worker's copy can get, writes only invalidate the local one")
+
     # Email Settings
     email: str = Field(..., env="EMAIL")
     email_to: str = Field(..., env="EMAIL_TO")
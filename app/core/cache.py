@@ -0,0 +1,112 @@
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from time import monotonic
+from typing import Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass
+class LRUCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Bounded LRU cache whose entries also expire after a per-entry time to live.
+
+    Meant for per-process hot paths running on the event loop (no locking): lookups and
+    inserts are O(1), the least recently used entry is evicted once `max_size` is reached and
+    expired entries are dropped lazily when they are read.
+
+    Args:
+        max_size (int): entries kept before the least recently used one is evicted
+        default_ttl_seconds (Optional[float]): time to live of entries set without one, None for no expiry
+    """
+
+    def __init__(self, max_size:int, default_ttl_seconds:Optional[float] = None):
+        self.max_size = max_size
+        self.default_ttl_seconds = default_ttl_seconds
+        self.stats = LRUCacheStats()
+        self._entries: "OrderedDict[K, Tuple[V, float]]" = OrderedDict()
+
+    def get(self, key:K) -> Optional[V]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        value, expires_at = entry
+        if expires_at <= monotonic():
+            del self._entries[key]
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    def set(self, key:K, value:V, ttl_seconds:Optional[float] = None):
+        """
+        Cache a value; a non-positive time to live is not cached at all
+
+        Args:
+            key (K): cache key
+            value (V): value to cache
+            ttl_seconds (Optional[float]): time to live, defaults to `default_ttl_seconds`
+        """
+        ttl_seconds = self.default_ttl_seconds if ttl_seconds is None else ttl_seconds
+        if ttl_seconds is not None and ttl_seconds <= 0:
+            return
+        expires_at = monotonic() + ttl_seconds if ttl_seconds is not None else float("inf")
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def pop(self, key:K) -> Optional[V]:
+        """Drop an entry, returning its value if it was cached"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        self.stats.invalidations += 1
+        return entry[0]
+
+    def pop_where(self, predicate:Callable[[K, V], bool]) -> int:
+        """Drop every entry matching `predicate(key, value)`; O(n), meant for rare invalidations"""
+        keys = [key for key, (value, _) in self._entries.items() if predicate(key, value)]
+        for key in keys:
+            del self._entries[key]
+        self.stats.invalidations += len(keys)
+        return len(keys)
+
+    def clear(self):
+        self.stats.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def __contains__(self, key:K) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry[1] > monotonic()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def cache_stats(self) -> Dict:
+        """
+        Size and hit/miss counters
+
+        Returns:
+            Dict: cache statistics
+        """
+        lookups = self.stats.hits + self.stats.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            **asdict(self.stats),
+            "hit_rate": round(self.stats.hits / lookups, 4) if lookups else 0.0,
+        }
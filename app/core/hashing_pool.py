@@ -0,0 +1,101 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from time import perf_counter
+from typing import Callable, Dict, TypeVar
+import asyncio
+
+from app.exceptions.authExceptions import HashingPoolSaturated
+
+T = TypeVar("T")
+
+
+class HashingPool:
+    """
+    Bounded worker pool for argon2 hashing and verification.
+
+    argon2-cffi releases the GIL while hashing, so a thread pool gives real parallelism without
+    the pickling and start-up cost of processes. Work is admitted only while fewer than
+    `workers + max_queue` jobs are in flight; past that the call fails fast with
+    HashingPoolSaturated instead of queueing unbounded work behind a login storm.
+
+    Args:
+        workers (int): hashing threads
+        max_queue (int): jobs allowed to wait for a free thread
+    """
+
+    def __init__(self, workers:int, max_queue:int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="argon2")
+        self._lock = Lock()
+        self._in_flight = 0
+        self._running = 0
+        self._peak_in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_seconds = 0.0
+        self._run_seconds = 0.0
+        self._max_wait_seconds = 0.0
+
+    async def run(self, func:Callable[..., T], *args) -> T:
+        """
+        Run a CPU-bound call on the pool without blocking the event loop
+
+        Raises:
+            HashingPoolSaturated: when the queue is full
+        """
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_queue:
+                self._rejected += 1
+                raise HashingPoolSaturated(f"Password hashing queue is full ({self._in_flight} jobs in flight)")
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+
+        submitted = perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, self._timed, submitted, func, *args)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _timed(self, submitted:float, func:Callable[..., T], *args) -> T:
+        started = perf_counter()
+        with self._lock:
+            self._running += 1
+            wait = started - submitted
+            self._wait_seconds += wait
+            self._max_wait_seconds = max(self._max_wait_seconds, wait)
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                self._run_seconds += perf_counter() - started
+
+    def stats(self) -> Dict:
+        """
+        Utilisation of the pool since startup
+
+        Returns:
+            Dict: pool size, live queue depth and wait/run latency counters
+        """
+        with self._lock:
+            completed = self._completed
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": max(self._in_flight - self._running, 0),
+                "utilisation": round(self._running / self.workers, 4),
+                "peak_in_flight": self._peak_in_flight,
+                "completed": completed,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(self._wait_seconds * 1000 / completed, 2) if completed else 0.0,
+                "max_wait_ms": round(self._max_wait_seconds * 1000, 2),
+                "avg_run_ms": round(self._run_seconds * 1000 / completed, 2) if completed else 0.0,
+            }
+
+    def shutdown(self):
+        """Finish the jobs already admitted and stop the threads"""
+        self._executor.shutdown(wait=True, cancel_futures=False)
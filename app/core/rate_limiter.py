@@ -0,0 +1,180 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from app.config.settings import Settings
+from app.exceptions.authExceptions import LoginThrottled
+from app.repositories.rate_limit_repository import RateLimitRepository
+from logging import Logger
+from pymongo.errors import PyMongoError
+from time import monotonic
+from typing import Dict, Mapping, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class BucketRule:
+    """
+    Token bucket parameters: `capacity` attempts in a burst, refilled at `refill_per_second`
+
+    Args:
+        capacity (float): burst size
+        refill_per_second (float): sustained attempts per second
+    """
+    capacity: float
+    refill_per_second: float
+
+    def retry_after(self, tokens:float, cost:float = 1.0) -> float:
+        """Seconds until the bucket holds `cost` tokens again"""
+        return max(cost - tokens, 0.0) / self.refill_per_second
+
+
+class RateLimitBackend(ABC):
+    """Storage of the token buckets; implementations must update a bucket atomically"""
+
+    @abstractmethod
+    async def consume(self, key:str, rule:BucketRule, cost:float = 1.0) -> Tuple[bool, float]:
+        """
+        Take `cost` tokens from a bucket if it holds enough
+
+        Returns:
+            Tuple[bool, float]: whether the attempt is allowed, and the tokens left
+        """
+
+    def tracked_keys(self) -> Optional[int]:
+        return None
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """
+    Token buckets in a dict of this worker process. Every update is O(1); buckets that have
+    refilled completely carry no information and are swept every `eviction_interval_seconds`.
+    With several workers each one throttles on its own, multiply the limits accordingly or
+    use the shared backend.
+    """
+
+    def __init__(self, eviction_interval_seconds:float = 60.0):
+        self.eviction_interval_seconds = eviction_interval_seconds
+        # key -> (tokens, updated_at, full_at)
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+        self._next_eviction = monotonic() + eviction_interval_seconds
+
+    async def consume(self, key:str, rule:BucketRule, cost:float = 1.0) -> Tuple[bool, float]:
+        now = monotonic()
+        if now >= self._next_eviction:
+            self.evict(now)
+
+        bucket = self._buckets.get(key)
+        tokens = rule.capacity if bucket is None else min(rule.capacity, bucket[0] + (now - bucket[1]) * rule.refill_per_second)
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        self._buckets[key] = (tokens, now, now + (rule.capacity - tokens) / rule.refill_per_second)
+        return allowed, tokens
+
+    def evict(self, now:Optional[float] = None) -> int:
+        """Drop the buckets that are full again"""
+        now = now or monotonic()
+        self._next_eviction = now + self.eviction_interval_seconds
+        full = [key for key, (_, _, full_at) in self._buckets.items() if full_at <= now]
+        for key in full:
+            del self._buckets[key]
+        return len(full)
+
+    def tracked_keys(self) -> int:
+        return len(self._buckets)
+
+
+class MongoRateLimitBackend(RateLimitBackend):
+    """
+    Token buckets shared by every worker through MongoDB: one atomic pipeline update per
+    attempt, and a TTL index drops buckets once they have refilled. When the database cannot
+    be reached the attempt is allowed, so an outage of the limiter never locks users out.
+    """
+
+    def __init__(self, repo:RateLimitRepository, logger:Logger):
+        self.repo = repo
+        self.logger = logger
+
+    async def consume(self, key:str, rule:BucketRule, cost:float = 1.0) -> Tuple[bool, float]:
+        try:
+            return await self.repo.consume(key, rule.capacity, rule.refill_per_second, cost)
+        except PyMongoError as e:
+            self.logger.error(f"Rate limiter backend unavailable, allowing attempt: {str(e)}")
+            return True, rule.capacity
+
+
+class LoginRateLimiter:
+    """
+    Throttles login attempts per user ID and per client IP before any password hashing is done,
+    so bursts of bad logins or credential stuffing cannot saturate the argon2 workers.
+    Every attempt counts, successful or not.
+
+    Behind a proxy every request comes from the proxy's address, so the client IP is only read
+    from the header named by LOGIN_RATE_LIMIT_CLIENT_IP_HEADER, which the proxy sets itself;
+    without it the per-IP limit is off and only the per-user limit applies.
+    """
+
+    def __init__(self, backend:RateLimitBackend, settings:Settings, logger:Logger):
+        self.backend = backend
+        self.logger = logger
+        self.user_rule = BucketRule(settings.login_rate_limit_user_burst, settings.login_rate_limit_user_per_minute / 60)
+        self.ip_rule = BucketRule(settings.login_rate_limit_ip_burst, settings.login_rate_limit_ip_per_minute / 60)
+        self.client_ip_header = settings.login_rate_limit_client_ip_header
+        self.stats = {"allowed": 0, "throttled_user": 0, "throttled_ip": 0}
+
+    def client_ip(self, headers:Mapping[str, str]) -> Optional[str]:
+        """
+        The client address set by the trusted proxy. In a forwarded chain the last entry is the
+        one the proxy appended, anything before it came from the client and can be forged.
+
+        Args:
+            headers (Mapping[str, str]): request headers
+
+        Returns:
+            Optional[str]: the address, None when no header is configured or it is missing
+        """
+        if not self.client_ip_header:
+            return None
+        value = headers.get(self.client_ip_header)
+        if not value:
+            return None
+        return value.split(",")[-1].strip() or None
+
+    async def check(self, user_id:str, client_ip:Optional[str] = None):
+        """
+        Take one attempt from the client IP's bucket, then from the user's
+
+        Args:
+            user_id (str): The user ID being logged into
+            client_ip (Optional[str]): The client's address, skipped when unknown
+
+        Raises:
+            LoginThrottled: When either bucket is empty
+        """
+        if client_ip:
+            allowed, tokens = await self.backend.consume(f"ip:{client_ip}", self.ip_rule)
+            if not allowed:
+                self.stats["throttled_ip"] += 1
+                self.logger.warning(f"Login throttled for IP {client_ip}")
+                raise LoginThrottled("Too many login attempts from this address", retry_after=self.ip_rule.retry_after(tokens))
+
+        allowed, tokens = await self.backend.consume(f"user:{user_id}", self.user_rule)
+        if not allowed:
+            self.stats["throttled_user"] += 1
+            self.logger.warning(f"Login throttled for user {user_id}")
+            raise LoginThrottled("Too many login attempts for this user", retry_after=self.user_rule.retry_after(tokens))
+        self.stats["allowed"] += 1
+
+    def limiter_stats(self) -> Dict:
+        """
+        Allowed/throttled counters and the configured rules
+
+        Returns:
+            Dict: limiter statistics
+        """
+        return {
+            "backend": type(self.backend).__name__,
+            "tracked_keys": self.backend.tracked_keys(),
+            "user_rule": {"burst": self.user_rule.capacity, "per_minute": self.user_rule.refill_per_second * 60},
+            "ip_rule": {"burst": self.ip_rule.capacity, "per_minute": self.ip_rule.refill_per_second * 60},
+            "client_ip_header": self.client_ip_header,
+            **self.stats,
+        }
@@ -1,23 +1,136 @@
-from jose import jwt, JWTError, ExpiredSignatureError
 from datetime import datetime, timedelta, timezone
 from passlib.context import CryptContext
-from app.exceptions.authExceptions import InvalidCredentials, TokenExpired
+from passlib.hash import argon2
+from app.exceptions.authExceptions import InvalidCredentials, HashingPoolSaturated
 
+from app.core.hashing_pool import HashingPool
+from app.core.token_cache import VerifiedTokenCache
+from app.core.token_backends import TokenBackend, build_token_backend
 from app.config.settings import Settings
 from logging import Logger
+from typing import Dict, List, Optional, Tuple
+from statistics import median
+from time import perf_counter
+from uuid import uuid4
+import asyncio
 
 # from app.utils.code_profiler import log_timeit
 
+ACCESS_TOKEN_TYPE = "access"
+REFRESH_TOKEN_TYPE = "refresh"
+
 class Security:
 
     def __init__(self, settings:Settings, logger:Logger):
         self.logger = logger
-        self.SECRET_KEY = settings.jwt_secret_key
         self.ALGORITHM = settings.jwt_algorithm
+        self.token_backend: TokenBackend = build_token_backend(settings, logger)
         self.ACCESS_TOKEN_EXPIRE_MINUTES = settings.jwt_access_token_expire_minutes
+        self.REFRESH_TOKEN_EXPIRE_DAYS = settings.jwt_refresh_token_expire_days
 
-        self.pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+        self.settings = settings
+        self.calibrated = False
+        self.configure_argon2(
+            time_cost=settings.argon2_time_cost,
+            memory_cost=settings.argon2_memory_cost_kib,
+            parallelism=settings.argon2_parallelism
+        )
+        self.token_cache = VerifiedTokenCache(
+            max_size=settings.token_cache_size,
+            max_token_lifetime_seconds=self.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        )
+        self.hashing_pool = HashingPool(
+            workers=settings.password_hashing_workers,
+            max_queue=settings.password_hashing_max_queue
+        )
     
+    def configure_argon2(self, time_cost: int, memory_cost: int, parallelism: int):
+        """
+        Build the password context with the given argon2 cost. Hashes made with any other
+        cost keep verifying, `needs_rehash` flags them for an upgrade on the next login.
+
+        Args:
+            time_cost (int): argon2 iterations
+            memory_cost (int): argon2 memory in KiB
+            parallelism (int): argon2 lanes
+        """
+        self.pwd_context = CryptContext(
+            schemes=["argon2"],
+            deprecated="auto",
+            argon2__rounds=time_cost,
+            argon2__memory_cost=memory_cost,
+            argon2__parallelism=parallelism
+        )
+        self.argon2_parameters = {"time_cost": time_cost, "memory_cost": memory_cost, "parallelism": parallelism}
+
+    def calibrate_argon2(self, target_ms: float = None, samples: int = 3) -> Dict:
+        """
+        Benchmark this host and pick the argon2 cost whose verify time reaches `target_ms`.
+        Memory cost and parallelism start from the settings: time cost is raised until the
+        target is met, and if one iteration is already too slow, memory is halved down to
+        `argon2_min_memory_cost_kib` instead. Blocking, run it off the event loop.
+
+        Args:
+            target_ms (float, optional): Target verify time. Defaults to argon2_target_verify_ms.
+            samples (int, optional): Hashes timed per candidate, the median is used.
+
+        Returns:
+            Dict: the chosen parameters and their measured verify time
+        """
+        target_ms = target_ms or self.settings.argon2_target_verify_ms
+        parallelism = self.settings.argon2_parallelism
+
+        def measure(time_cost: int, memory_cost: int) -> float:
+            handler = argon2.using(rounds=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+            timings = []
+            for _ in range(samples):
+                started = perf_counter()
+                handler.hash("calibration")
+                timings.append((perf_counter() - started) * 1000)
+            return median(timings)
+
+        memory_cost = self.settings.argon2_memory_cost_kib
+        time_cost = 1
+        elapsed = measure(time_cost, memory_cost)
+        while elapsed > target_ms and memory_cost // 2 >= self.settings.argon2_min_memory_cost_kib:
+            memory_cost //= 2
+            elapsed = measure(time_cost, memory_cost)
+        while elapsed < target_ms:
+            # Time cost scales linearly, estimate the next step instead of walking one at a time
+            next_time_cost = max(time_cost + 1, int(time_cost * target_ms / max(elapsed, 0.001)))
+            next_elapsed = measure(next_time_cost, memory_cost)
+            if next_elapsed > target_ms * 1.25:
+                break
+            time_cost, elapsed = next_time_cost, next_elapsed
+
+        self.configure_argon2(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+        self.calibrated = True
+        self.logger.info(f"argon2 calibrated to {self.argon2_parameters}, verify takes ~{elapsed:.0f}ms (target {target_ms:.0f}ms)")
+        return {**self.argon2_parameters, "verify_ms": round(elapsed, 1), "target_ms": target_ms}
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """
+        Check whether a stored hash should be replaced with one using the current cost.
+        With calibration on, workers on slightly different hosts can settle on different
+        costs, so only hashes weaker than the current cost are upgraded; otherwise logins
+        would keep rehashing back and forth between workers.
+
+        Args:
+            hashed (str): Hashed password
+
+        Returns:
+            bool: True if the hash should be upgraded
+        """
+        if not self.calibrated:
+            return self.pwd_context.needs_update(hashed)
+        if not argon2.identify(hashed):
+            return True
+        stored = argon2.from_string(hashed)
+        return (
+            stored.rounds < self.argon2_parameters["time_cost"]
+            or stored.memory_cost < self.argon2_parameters["memory_cost"]
+        )
+
     def hash_password(self, password: str) -> str:
         """
         Hash password
@@ -44,6 +157,85 @@ class Security:
         """
         return self.pwd_context.verify(plain, hashed)
 
+    async def hash_password_async(self, password: str) -> str:
+        """
+        Hash password on the hashing pool, keeping the event loop free
+
+        Args:
+            password (str): Password to hash
+
+        Returns:
+            str: Hashed password
+
+        Raises:
+            HashingPoolSaturated: When the hashing queue is full
+        """
+        return await self.hashing_pool.run(self.hash_password, password)
+
+    async def hash_passwords_async(self, passwords: List[str]) -> List[str]:
+        """
+        Hash a batch of passwords, submitting at most one job per hashing thread at a time
+        so a bulk import never fills the queue that interactive logins rely on
+
+        Args:
+            passwords (List[str]): Passwords to hash
+
+        Returns:
+            List[str]: Hashed passwords, in order
+        """
+        hashed = []
+        window = self.hashing_pool.workers
+        for start in range(0, len(passwords), window):
+            hashed.extend(await asyncio.gather(*(
+                self.hash_password_async(password) for password in passwords[start:start + window]
+            )))
+        return hashed
+
+    async def verify_password_async(self, plain: str, hashed: str) -> bool:
+        """
+        Verify password on the hashing pool, keeping the event loop free
+
+        Args:
+            plain (str): Plain password
+            hashed (str): Hashed password
+
+        Returns:
+            bool: True if password is correct, False otherwise
+
+        Raises:
+            HashingPoolSaturated: When the hashing queue is full
+        """
+        return await self.hashing_pool.run(self.verify_password, plain, hashed)
+
+    async def verify_and_rehash_async(self, plain: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify password and, when the stored hash uses an outdated cost, hash it again with
+        the current one. The upgrade is best effort: it is skipped when the hashing pool is
+        saturated, and the next login tries again.
+
+        Args:
+            plain (str): Plain password
+            hashed (str): Hashed password
+
+        Returns:
+            Tuple[bool, Optional[str]]: whether the password is correct, and the new hash to store if any
+        """
+        if not await self.verify_password_async(plain, hashed):
+            return False, None
+        if not self.needs_rehash(hashed):
+            return True, None
+        try:
+            return True, await self.hash_password_async(plain)
+        except HashingPoolSaturated:
+            return True, None
+
+    def hashing_stats(self) -> Dict:
+        return {**self.hashing_pool.stats(), "argon2": {**self.argon2_parameters, "calibrated": self.calibrated}}
+
+    def shutdown(self):
+        """Stop the hashing pool once in-flight jobs are done"""
+        self.hashing_pool.shutdown()
+
     # @log_timeit("Create Access Token")
     def create_access_token(self, user_id: str, expires_delta: timedelta = None):
         """
@@ -56,14 +248,16 @@ class Security:
         Returns:
             str: JWT token
         """
-        to_encode = {"sub": user_id}
-        expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=self.ACCESS_TOKEN_EXPIRE_MINUTES))
+        issued_at = datetime.now(timezone.utc)
+        to_encode = {"sub": user_id, "typ": ACCESS_TOKEN_TYPE, "iat": issued_at}
+        expire = issued_at + (expires_delta or timedelta(minutes=self.ACCESS_TOKEN_EXPIRE_MINUTES))
         to_encode.update({"exp": expire})
-        return jwt.encode(to_encode, self.SECRET_KEY, algorithm=self.ALGORITHM)
+        return self.token_backend.encode(to_encode)
     
     def decode_token(self, token: str) -> str:
         """
-        Decode and validate JWT token
+        Decode and validate JWT token. Tokens verified before are answered from the
+        verified-token cache without checking the signature again.
         
         Args:
             token (str): JWT token to decode
@@ -75,16 +269,88 @@ class Security:
             TokenExpired: When token has expired
             InvalidCredentials: When token is invalid
         """
+        subject = self.token_cache.get(token)
+        if subject is not None:
+            return subject
+
+        payload = self._verify(token)
+        # Tokens issued before `typ` existed are access tokens
+        if payload.get("typ", ACCESS_TOKEN_TYPE) != ACCESS_TOKEN_TYPE:
+            raise InvalidCredentials("Token is invalid")
+        if self.token_cache.is_revoked(token, payload):
+            raise InvalidCredentials("Token has been revoked")
+        self.token_cache.put(token, payload)
+        return payload["sub"]
+
+    def create_refresh_token(self, user_id: str, family: str) -> Tuple[str, str, datetime]:
+        """
+        Create a long-lived refresh token, exchanged at /v1/auth/refresh for a new access token
+        without going through the password hash again
+
+        Args:
+            user_id (str): Subject of the token
+            family (str): Id of the login session the token belongs to, kept across rotations
+
+        Returns:
+            Tuple[str, str, datetime]: the token, its id (`jti`) and its expiry
+        """
+        issued_at = datetime.now(timezone.utc)
+        expire = issued_at + timedelta(days=self.REFRESH_TOKEN_EXPIRE_DAYS)
+        jti = uuid4().hex
+        token = self.token_backend.encode(
+            {"sub": user_id, "typ": REFRESH_TOKEN_TYPE, "jti": jti, "fam": family, "iat": issued_at, "exp": expire}
+        )
+        return token, jti, expire
+
+    def decode_refresh_token(self, token: str) -> Dict:
+        """
+        Verify a refresh token's signature, expiry and type
+
+        Args:
+            token (str): Refresh token
+
+        Returns:
+            Dict: its claims (`sub`, `jti`, `fam`, ...)
+
+        Raises:
+            TokenExpired: When token has expired
+            InvalidCredentials: When token is invalid or is not a refresh token
+        """
+        payload = self._verify(token)
+        if payload.get("typ") != REFRESH_TOKEN_TYPE or "jti" not in payload or "fam" not in payload:
+            raise InvalidCredentials("Token is not a refresh token")
+        return payload
+
+    def _verify(self, token: str) -> Dict:
         try:
-            payload = jwt.decode(token, self.SECRET_KEY, algorithms=[self.ALGORITHM])
-            return payload["sub"]
-        except ExpiredSignatureError:
-            # self.logger.warning(f"Expired token attempt")
-            raise TokenExpired("Token has expired")
-        except JWTError as e:
-            self.logger.error(f"Invalid token: {str(e)}")
+            return self.token_backend.decode(token)
+        except InvalidCredentials as e:
+            self.logger.error(str(e))
             raise InvalidCredentials("Token is invalid")
-        
+
+    def revoke_token(self, token: str):
+        """
+        Reject a token on this worker until it expires
+
+        Args:
+            token (str): JWT token to revoke
+
+        Raises:
+            TokenExpired: When token has already expired
+            InvalidCredentials: When token is invalid
+        """
+        payload = self._verify(token)
+        self.token_cache.revoke(token, expires_at=payload["exp"])
+
+    def revoke_user_tokens(self, user_id: str):
+        """
+        Reject every token issued to a user so far on this worker
+
+        Args:
+            user_id (str): Subject whose tokens are revoked
+        """
+        self.token_cache.revoke_subject(user_id)
+
     
 if __name__ == "__main__":
     security = Security()
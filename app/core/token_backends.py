@@ -0,0 +1,158 @@
+from abc import ABC, abstractmethod
+from app.config.settings import Settings
+from app.exceptions.authExceptions import InvalidCredentials, TokenExpired
+from hashlib import sha256
+from jose import jwk, jwt as jose_jwt, ExpiredSignatureError, JWTError
+from logging import Logger
+from pathlib import Path
+from typing import Dict, Optional
+import json
+
+try:
+    import jwt as pyjwt
+except ImportError:  # optional, `pip install pyjwt cryptography`
+    pyjwt = None
+
+HMAC_ALGORITHMS = {"HS256", "HS384", "HS512"}
+
+
+class TokenBackend(ABC):
+    """
+    Signs and verifies JWTs with keys prepared once at startup instead of on every call.
+
+    HMAC algorithms sign and verify with the shared secret. Asymmetric algorithms (RS*, ES*)
+    sign with the private key and verify with the public one, which is published as a JWK set
+    so other services can verify our tokens without holding the secret.
+
+    Args:
+        algorithm (str): JWS algorithm, e.g. HS256, RS256, ES256
+        signing_key (str): HMAC secret or PEM private key
+        verification_key (Optional[str]): PEM public key, derived from the private key if omitted
+    """
+    name = "abstract"
+
+    def __init__(self, algorithm:str, signing_key:str, verification_key:Optional[str] = None):
+        self.algorithm = algorithm
+        self.asymmetric = algorithm not in HMAC_ALGORITHMS
+
+    @abstractmethod
+    def encode(self, claims:Dict) -> str:
+        """Sign claims into a compact JWT"""
+
+    @abstractmethod
+    def decode(self, token:str) -> Dict:
+        """
+        Verify a token's signature and expiry and return its claims
+
+        Raises:
+            TokenExpired: When token has expired
+            InvalidCredentials: When token is invalid
+        """
+
+    @abstractmethod
+    def public_jwk(self) -> Optional[Dict]:
+        """Public verification key as a JWK, None for HMAC"""
+
+    def jwks(self) -> Dict:
+        """JWK set of the public verification keys, empty for HMAC"""
+        key = self.public_jwk()
+        return {"keys": [key] if key else []}
+
+    @staticmethod
+    def key_id(public_jwk:Dict) -> str:
+        """Stable key id derived from the public key, sent as `kid` so verifiers can pick the key"""
+        members = {name: public_jwk[name] for name in ("crv", "e", "kty", "n", "x", "y") if name in public_jwk}
+        return sha256(json.dumps(members, sort_keys=True, separators=(",", ":")).encode()).hexdigest()[:16]
+
+
+class JoseTokenBackend(TokenBackend):
+    """python-jose with pre-constructed key objects (no secret parsing or key loading per call)"""
+    name = "jose"
+
+    def __init__(self, algorithm:str, signing_key:str, verification_key:Optional[str] = None):
+        super().__init__(algorithm, signing_key, verification_key)
+        self._signing_key = jwk.construct(signing_key, algorithm)
+        if not self.asymmetric:
+            self._verification_key = self._signing_key
+            self._headers = None
+            self._public_jwk = None
+        else:
+            self._verification_key = jwk.construct(verification_key, algorithm) if verification_key else self._signing_key.public_key()
+            self._public_jwk = self._verification_key.to_dict()
+            self._public_jwk["kid"] = self.key_id(self._public_jwk)
+            self._public_jwk["use"] = "sig"
+            self._headers = {"kid": self._public_jwk["kid"]}
+
+    def encode(self, claims:Dict) -> str:
+        return jose_jwt.encode(claims, self._signing_key, algorithm=self.algorithm, headers=self._headers)
+
+    def decode(self, token:str) -> Dict:
+        try:
+            return jose_jwt.decode(token, self._verification_key, algorithms=[self.algorithm])
+        except ExpiredSignatureError:
+            raise TokenExpired("Token has expired")
+        except JWTError as e:
+            raise InvalidCredentials(f"Token is invalid: {str(e)}")
+
+    def public_jwk(self) -> Optional[Dict]:
+        return self._public_jwk
+
+
+class PyJWTTokenBackend(TokenBackend):
+    """PyJWT (with `cryptography` for asymmetric keys), keys prepared once through the algorithm object"""
+    name = "pyjwt"
+
+    def __init__(self, algorithm:str, signing_key:str, verification_key:Optional[str] = None):
+        if pyjwt is None:
+            raise RuntimeError("JWT_BACKEND=pyjwt needs PyJWT: pip install pyjwt cryptography")
+        super().__init__(algorithm, signing_key, verification_key)
+        self._algorithm = pyjwt.get_algorithm_by_name(algorithm)
+        self._signing_key = self._algorithm.prepare_key(signing_key)
+        if not self.asymmetric:
+            self._verification_key = self._signing_key
+            self._headers = None
+            self._public_jwk = None
+        else:
+            self._verification_key = self._algorithm.prepare_key(verification_key) if verification_key else self._signing_key.public_key()
+            self._public_jwk = self._algorithm.to_jwk(self._verification_key, as_dict=True)
+            self._public_jwk["kid"] = self.key_id(self._public_jwk)
+            self._public_jwk.update({"use": "sig", "alg": algorithm})
+            self._headers = {"kid": self._public_jwk["kid"]}
+
+    def encode(self, claims:Dict) -> str:
+        return pyjwt.encode(claims, self._signing_key, algorithm=self.algorithm, headers=self._headers)
+
+    def decode(self, token:str) -> Dict:
+        try:
+            return pyjwt.decode(token, self._verification_key, algorithms=[self.algorithm])
+        except pyjwt.ExpiredSignatureError:
+            raise TokenExpired("Token has expired")
+        except pyjwt.InvalidTokenError as e:
+            raise InvalidCredentials(f"Token is invalid: {str(e)}")
+
+    def public_jwk(self) -> Optional[Dict]:
+        return self._public_jwk
+
+
+TOKEN_BACKENDS = {backend.name: backend for backend in (JoseTokenBackend, PyJWTTokenBackend)}
+
+
+def build_token_backend(settings:Settings, logger:Logger) -> TokenBackend:
+    """
+    Build the configured JWT backend. HMAC algorithms use `jwt_secret_key`; asymmetric ones
+    read the PEM files at `jwt_private_key_file` and (optionally) `jwt_public_key_file`.
+    """
+    backend = TOKEN_BACKENDS.get(settings.jwt_backend)
+    if backend is None:
+        raise ValueError(f"Unknown JWT_BACKEND {settings.jwt_backend!r}, expected one of {sorted(TOKEN_BACKENDS)}")
+
+    if settings.jwt_algorithm in HMAC_ALGORITHMS:
+        token_backend = backend(settings.jwt_algorithm, settings.jwt_secret_key)
+    else:
+        if not settings.jwt_private_key_file:
+            raise ValueError(f"JWT algorithm {settings.jwt_algorithm} needs JWT_PRIVATE_KEY_FILE")
+        public_key = Path(settings.jwt_public_key_file).read_text() if settings.jwt_public_key_file else None
+        token_backend = backend(settings.jwt_algorithm, Path(settings.jwt_private_key_file).read_text(), public_key)
+
+    logger.info(f"JWT backend: {token_backend.name} ({settings.jwt_algorithm})")
+    return token_backend
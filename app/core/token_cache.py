@@ -0,0 +1,83 @@
+from app.core.cache import TTLCache
+from hashlib import sha256
+from time import time
+from typing import Dict, Optional
+
+
+class VerifiedTokenCache:
+    """
+    Per-process cache of access tokens whose signature and claims were already verified.
+
+    Entries are keyed by the SHA-256 digest of the token (the token itself is never kept) and
+    expire exactly at the token's `exp`, so a hit is always a token that would still verify.
+    Revocation is explicit: `revoke` denylists a single token until it expires, `revoke_subject`
+    rejects every token of a user issued before the call. Both only apply to this worker
+    process.
+
+    Only verified tokens are bounded by `max_size`. The denylist is a plain dict that drops an
+    entry once its token has expired and never because of its size: evicting a live revocation
+    would accept a logged-out token again.
+
+    Args:
+        max_size (int): verified tokens kept before the least recently used one is evicted
+        max_token_lifetime_seconds (float): longest access token lifetime, bounds how long
+            subject revocations are remembered
+    """
+
+    def __init__(self, max_size:int, max_token_lifetime_seconds:float):
+        self.max_token_lifetime_seconds = max_token_lifetime_seconds
+        self._verified: TTLCache[bytes, str] = TTLCache(max_size)
+        self._revoked: Dict[bytes, float] = {}          # token digest -> its `exp`
+        self._revoked_subjects: Dict[str, int] = {}     # subject -> second of the revocation
+
+    @staticmethod
+    def digest(token:str) -> bytes:
+        return sha256(token.encode()).digest()
+
+    def get(self, token:str) -> Optional[str]:
+        """Subject of an already verified token, None on a miss"""
+        return self._verified.get(self.digest(token))
+
+    def put(self, token:str, claims:Dict):
+        """Remember a verified token until its `exp`"""
+        self._verified.set(self.digest(token), claims["sub"], ttl_seconds=claims["exp"] - time())
+
+    def is_revoked(self, token:str, claims:Dict) -> bool:
+        expires_at = self._revoked.get(self.digest(token))
+        if expires_at is not None and expires_at > time():
+            return True
+        # `iat` is in whole seconds: tokens issued in the second of the revocation count as issued after it
+        revoked_at = self._revoked_subjects.get(claims["sub"])
+        return revoked_at is not None and claims.get("iat", 0) < revoked_at
+
+    def revoke(self, token:str, expires_at:float):
+        """Reject a token from now until it would have expired anyway"""
+        digest = self.digest(token)
+        self._verified.pop(digest)
+        now = time()
+        self._revoked = {revoked: expiry for revoked, expiry in self._revoked.items() if expiry > now}
+        if expires_at > now:
+            self._revoked[digest] = expires_at
+
+    def revoke_subject(self, subject:str):
+        """Reject every token of a user issued up to now, e.g. after deactivation"""
+        now = int(time())
+        self._revoked_subjects = {
+            revoked_subject: revoked_at for revoked_subject, revoked_at in self._revoked_subjects.items()
+            if revoked_at > now - self.max_token_lifetime_seconds
+        }
+        self._revoked_subjects[subject] = now
+        self._verified.pop_where(lambda _, cached_subject: cached_subject == subject)
+
+    def cache_stats(self) -> Dict:
+        """
+        Hit/miss counters of the verified tokens and the size of the revocation lists
+
+        Returns:
+            Dict: cache statistics
+        """
+        return {
+            **self._verified.cache_stats(),
+            "revoked_tokens": len(self._revoked),
+            "revoked_subjects": len(self._revoked_subjects),
+        }
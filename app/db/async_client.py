@@ -0,0 +1,363 @@
+from pymongo import AsyncMongoClient, IndexModel, InsertOne, ReturnDocument
+from pymongo.asynchronous.client_session import AsyncClientSession
+from pymongo.errors import BulkWriteError, ClientBulkWriteException, ConnectionFailure, DuplicateKeyError
+from pymongo.results import BulkWriteResult
+from app.config.settings import Settings
+from app.db.client import mongo_client_options, connect_retry_policy
+from app.db.pool_monitor import PoolMonitor
+from logging import Logger
+from bson import ObjectId
+from typing import AsyncIterator, Optional, List, Dict
+from tenacity import AsyncRetrying
+from time import monotonic
+import asyncio
+
+class AsyncMongoDBClient:
+    """
+    Awaitable counterpart of `MongoDBClient` built on pymongo's native asyncio driver.
+    Exposes the same insert/find/update/delete surface so repositories can `await` their
+    queries instead of blocking the event loop on every Atlas round trip.
+
+    One instance (and therefore one `AsyncMongoClient` and one connection pool) is shared per
+    process through the container; it is opened and closed by the application lifespan.
+    """
+
+    def __init__(self, settings:Settings, logger:Logger):
+        user = settings.mongodb_user
+        password = settings.mongodb_password
+        cluster = settings.mongodb_cluster
+        self.uri = f"mongodb+srv://{user}:{password}@{cluster}.mongodb.net/?retryWrites=true&w=majority"
+        self.logger = logger
+        self.settings = settings
+        self.pool_monitor = PoolMonitor()
+        self.client: Optional[AsyncMongoClient] = None
+        self.database = None
+        self.max_wire_version = 0
+
+    async def connect(self, database_name:str = "dashboard"):
+        """
+        Open the shared client: send `hello` with exponential backoff until the cluster answers,
+        then pre-fill the pool. Calling it again on a connected client is a no-op.
+        """
+        if self.client is not None:
+            return
+        try:
+            if not self.uri:
+                self.logger.error("MongoDB URI is not set")
+                return
+            async for attempt in AsyncRetrying(**connect_retry_policy(self.settings, self.logger)):
+                with attempt:
+                    await self._open(database_name)
+
+            await self.warm_up()
+            self.logger.info("Connected to MongoDB successfully!")
+
+        except ConnectionFailure as e:
+            self.logger.error(f"MongoDB connection failed: {str(e)}")
+            raise
+
+        except Exception as e:
+            self.logger.error(f"Failed to connect to MongoDB: {str(e)}")
+            raise
+
+    async def _open(self, database_name:str):
+        client = AsyncMongoClient(self.uri, **mongo_client_options(self.settings, self.pool_monitor))
+        try:
+            hello = await client.admin.command('hello')
+        except Exception:
+            await client.close()
+            raise
+        self.client = client
+        self.database = client[database_name]
+        self.max_wire_version = hello.get("maxWireVersion", 0)
+
+    async def reconnect(self, database_name:str = "dashboard"):
+        """Drop the current client and connect again with backoff"""
+        self.logger.warning("Reconnecting to MongoDB")
+        await self.close(drain=False)
+        await self.connect(database_name)
+
+    async def warm_up(self):
+        """
+        Open `mongodb_min_pool_size` connections up front by running that many pings
+        concurrently, so the first requests after startup don't pay the TCP + TLS + auth handshake
+        """
+        connections = self.settings.mongodb_min_pool_size
+        if connections <= 1:
+            return
+        await asyncio.gather(*(self.client.admin.command('ping') for _ in range(connections)))
+        self.logger.info(f"Warmed up MongoDB connection pool with {connections} connections")
+
+    def pool_stats(self) -> Dict:
+        """
+        Live connection pool statistics collected by the pool listener
+
+        Returns:
+            Dict: configured pool limits and per-server pool statistics
+        """
+        return {
+            "config": {
+                "max_pool_size": self.settings.mongodb_max_pool_size,
+                "min_pool_size": self.settings.mongodb_min_pool_size,
+                "max_idle_time_ms": self.settings.mongodb_max_idle_time_ms,
+                "wait_queue_timeout_ms": self.settings.mongodb_wait_queue_timeout_ms,
+                "compressors": self.settings.mongodb_compressors,
+            },
+            "servers": self.pool_monitor.stats(),
+        }
+
+    async def create_index(self, collection_name, key, unique=False):
+        try:
+            await self.database[collection_name].create_index(key, unique=unique)
+            self.logger.info(f"Index created successfully at collection: {collection_name} on key: {key}!")
+        except Exception as e:
+            self.logger.error(f"Failed to create index: {str(e)}")
+            raise
+
+    async def create_indexes(self, collection_name:str, indexes:List[IndexModel]) -> List[str]:
+        """Create several indexes in one `createIndexes` command, returns the index names"""
+        if not indexes:
+            return []
+        return await self.database[collection_name].create_indexes(indexes)
+
+    async def index_stats(self, collection_name:str) -> List[dict]:
+        """Per-index usage statistics (`$indexStats`) of a collection"""
+        return await self.aggregate(collection_name, [{"$indexStats": {}}])
+
+    async def explain_find(self, collection_name:str, query:dict, sort:Optional[list] = None, projection:Optional[dict] = None) -> dict:
+        """Query planner output for a find, used to check that hot queries are index-backed"""
+        cursor = self.database[collection_name].find(query, projection)
+        if sort:
+            cursor = cursor.sort(sort)
+        return await cursor.explain()
+
+    async def verify_connection(self) -> bool:
+        """Verify MongoDB connection is working, reconnecting with backoff if the ping fails"""
+        if not self.client:
+            await self.connect()
+
+        try:
+            await self.client.admin.command('ping')
+            return True
+        except ConnectionFailure as e:
+            self.logger.error(f"MongoDB connection failed: {str(e)}")
+            await self.reconnect()
+            return True
+
+    async def insert(self, collection_name, data) -> Optional[ObjectId]:
+        """
+        Returns the id of the inserted document
+        Returns None if failed
+        """
+        try:
+            result = await self.database[collection_name].insert_one(data)
+            if result.acknowledged:
+                return result.inserted_id
+            return None
+        except Exception as e:
+            self.logger.error("Exception while inserting data in database")
+            self.logger.error(e)
+            return None
+
+    async def insert_many(self, collection_name, data) -> Optional[List[ObjectId]]:
+        try:
+            result = await self.database[collection_name].insert_many(data)
+            if result.acknowledged:
+                self.logger.info(f"Documents inserted successfully with ids: {result.inserted_ids}")
+                return result.inserted_ids
+            return None
+        except Exception as e:
+            self.logger.error("Exception while inserting data in database")
+            self.logger.error(e)
+            return None
+
+    async def bulk_write(self, collection_name:str, requests:List, ordered:bool = True, raise_write_errors:bool = False) -> Optional[BulkWriteResult]:
+        """
+        Send many write operations on one collection in as few round trips as the driver can batch
+
+        Args:
+            collection_name (str): target collection
+            requests (List): pymongo write models (InsertOne, UpdateOne, ...)
+            ordered (bool): stop at the first error; unordered lets the server apply the rest
+            raise_write_errors (bool): let `BulkWriteError` through, its `details` hold the counts
+                of the operations that were applied before or besides the failed ones
+
+        Returns:
+            Optional[BulkWriteResult]: the result, None if the write failed
+        """
+        try:
+            return await self.database[collection_name].bulk_write(requests, ordered=ordered)
+        except BulkWriteError as e:
+            if raise_write_errors:
+                raise
+            self.logger.error(f"Exception while bulk writing {len(requests)} operations to {collection_name}")
+            self.logger.error(e)
+            return None
+        except Exception as e:
+            self.logger.error(f"Exception while bulk writing {len(requests)} operations to {collection_name}")
+            self.logger.error(e)
+            return None
+
+    @property
+    def supports_client_bulk_write(self) -> bool:
+        """MongoDB 8.0+ (wire version 25) can insert into several collections with one `bulkWrite` command"""
+        return self.max_wire_version >= 25
+
+    async def insert_documents_in_transaction(self, documents:Dict[str, List[dict]]) -> bool:
+        """
+        Insert documents into several collections atomically in one multi-document transaction.
+        On MongoDB 8.0+ every insert goes out as a single client-level `bulkWrite`, so the whole
+        transaction costs that round trip plus the commit. Older servers get one `insert_many`
+        per collection inside the same transaction.
+
+        Args:
+            documents (Dict[str, List[dict]]): documents to insert keyed by collection name
+
+        Returns:
+            bool: True if the transaction committed, False if it was rolled back
+
+        Raises:
+            DuplicateKeyError: the transaction was rolled back because a document collided with
+                a unique index, e.g. a userID taken by a concurrent request
+        """
+        documents = {collection_name: docs for collection_name, docs in documents.items() if docs}
+
+        async def insert_all(session:AsyncClientSession):
+            if self.supports_client_bulk_write:
+                await self.client.bulk_write([
+                    InsertOne(doc, namespace=f"{self.database.name}.{collection_name}")
+                    for collection_name, docs in documents.items() for doc in docs
+                ], session=session)
+                return
+            for collection_name, docs in documents.items():
+                await self.database[collection_name].insert_many(docs, session=session)
+
+        try:
+            async with self.client.start_session() as session:
+                await session.with_transaction(insert_all)
+            return True
+        except Exception as e:
+            self.logger.error(f"Transaction rolled back while inserting into {list(documents)}")
+            self.logger.error(e)
+            if self.is_duplicate_key_error(e):
+                raise DuplicateKeyError(str(e), 11000) from e
+            return False
+
+    @staticmethod
+    def is_duplicate_key_error(error:Exception) -> bool:
+        """True if a write failed on a unique index, whether it came from a single write or a bulk write"""
+        if isinstance(error, DuplicateKeyError):
+            return True
+        if isinstance(error, BulkWriteError):
+            write_errors = error.details.get("writeErrors", [])
+        elif isinstance(error, ClientBulkWriteException):
+            write_errors = error.write_errors or []
+        else:
+            return False
+        return any(write_error.get("code") == 11000 for write_error in write_errors)
+
+    async def watch(self, collection_names:List[str]):
+        """Open a change stream over the given collections of the database"""
+        return await self.database.watch([{"$match": {"ns.coll": {"$in": collection_names}}}])
+
+    async def find(self, collection_name, query, projection:Optional[dict] = None, sort:Optional[list] = None, limit:int = 0) -> List[dict]:
+        cursor = self.database[collection_name].find(query, projection, sort=sort, limit=limit)
+        return await cursor.to_list(length=None)
+
+    async def aggregate(self, collection_name:str, pipeline:List[dict]) -> List[dict]:
+        cursor = await self.database[collection_name].aggregate(pipeline)
+        return await cursor.to_list(length=None)
+
+    async def stream_aggregate(self, collection_name:str, pipeline:List[dict], batch_size:int, allow_disk_use:bool = False) -> AsyncIterator[dict]:
+        """
+        Yield the results of an aggregation as the server returns them, `batch_size` documents
+        per `getMore`, so only one batch is held in memory. The cursor is closed when the
+        iteration ends or is abandoned (e.g. the client of a streaming response disconnects).
+
+        Args:
+            collection_name (str): collection to aggregate
+            pipeline (List[dict]): aggregation pipeline
+            batch_size (int): documents per batch fetched from the server
+            allow_disk_use (bool): let blocking stages such as `$sort` spill to disk past 100MB
+        """
+        cursor = await self.database[collection_name].aggregate(pipeline, batchSize=batch_size, allowDiskUse=allow_disk_use)
+        try:
+            async for document in cursor:
+                yield document
+        finally:
+            await cursor.close()
+
+    async def find_one(self, collection_name, query, projection:Optional[dict] = None):
+        return await self.database[collection_name].find_one(query, projection)
+
+    async def find_one_and_update(self, collection_name:str, query:dict, update, projection:Optional[dict] = None, upsert:bool = False) -> Optional[dict]:
+        """
+        Atomically update one document and return it as it is after the update
+
+        Args:
+            collection_name (str): target collection
+            query (dict): filter selecting the document
+            update: update document or aggregation pipeline
+            projection (Optional[dict]): fields to return
+            upsert (bool): insert the document when nothing matches
+
+        Returns:
+            Optional[dict]: the updated document, None if nothing matched
+        """
+        return await self.database[collection_name].find_one_and_update(
+            query, update, projection=projection, upsert=upsert, return_document=ReturnDocument.AFTER
+        )
+
+    async def update(self, collection_name, query, data) -> bool:
+        try:
+            await self.database[collection_name].update_one(query, {"$set": data})
+            return True
+        except Exception as e:
+            self.logger.error("Exception while updating data in MongoDB\nException in db/async_client.py update function")
+            self.logger.error(e)
+            return False
+
+    async def update_many(self, collection_name:str, query:dict, data:dict) -> Optional[int]:
+        """
+        Set fields on every matching document
+
+        Returns:
+            Optional[int]: number of documents modified, None if the update failed
+        """
+        try:
+            result = await self.database[collection_name].update_many(query, {"$set": data})
+            return result.modified_count
+        except Exception as e:
+            self.logger.error(f"Exception while updating many documents in {collection_name}")
+            self.logger.error(e)
+            return None
+
+    async def delete(self, collection_name: str, query: dict) -> bool:
+        try:
+            result = await self.database[collection_name].delete_one(query)
+            if result.deleted_count > 0:
+                self.logger.info("Document deleted successfully!")
+                return True
+            return False
+        except Exception as e:
+            self.logger.error("Exception while deleting data from MongoDB\nException in db/async_client.py delete function")
+            self.logger.error(e)
+            return False
+
+    async def close(self, drain:bool = True):
+        """
+        Close the shared client. With `drain`, wait up to `mongodb_shutdown_drain_timeout_seconds`
+        for checked-out connections to be returned so in-flight operations can finish first.
+        """
+        if self.client is None:
+            return
+        if drain:
+            deadline = monotonic() + self.settings.mongodb_shutdown_drain_timeout_seconds
+            while self.pool_monitor.checked_out() and monotonic() < deadline:
+                await asyncio.sleep(0.05)
+            if self.pool_monitor.checked_out():
+                self.logger.warning(f"Closing MongoDB client with {self.pool_monitor.checked_out()} connections still checked out")
+        await self.client.close()
+        self.client = None
+        self.database = None
+        self.logger.info("MongoDB connection closed")
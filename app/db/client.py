@@ -2,35 +2,77 @@ from pymongo.mongo_client import MongoClient
 from pymongo.errors import ConnectionFailure
 from pymongo.server_api import ServerApi
 from app.config.settings import Settings
+from app.db.pool_monitor import PoolMonitor
 from logging import Logger
 from bson import ObjectId
-from typing import Optional
-from tenacity import retry, stop_after_attempt, wait_fixed
+from typing import Optional, Dict
+from tenacity import Retrying, stop_after_attempt, wait_exponential, retry_if_exception_type
+from time import monotonic, sleep
+
+def mongo_client_options(settings:Settings, pool_monitor:PoolMonitor) -> Dict:
+    """
+    Connection pool and transport options shared by the sync and async MongoDB clients
+
+    Args:
+        settings (Settings): Application settings holding the pool configuration
+        pool_monitor (PoolMonitor): Listener collecting live pool statistics
+
+    Returns:
+        Dict: Keyword arguments for `MongoClient` / `AsyncMongoClient`
+    """
+    options = {
+        "maxPoolSize": settings.mongodb_max_pool_size,
+        "minPoolSize": settings.mongodb_min_pool_size,
+        "maxIdleTimeMS": settings.mongodb_max_idle_time_ms,
+        "waitQueueTimeoutMS": settings.mongodb_wait_queue_timeout_ms,
+        "maxConnecting": settings.mongodb_max_connecting,
+        "serverSelectionTimeoutMS": settings.mongodb_server_selection_timeout_ms,
+        "server_api": ServerApi('1'),
+        "event_listeners": [pool_monitor],
+    }
+    if settings.mongodb_compressors:
+        options["compressors"] = settings.mongodb_compressors
+    return options
+
+def connect_retry_policy(settings:Settings, logger:Logger) -> Dict:
+    """
+    Exponential backoff used when (re)connecting to MongoDB: 0.5s, 1s, 2s, ... capped at
+    `mongodb_connect_backoff_max_seconds`, for `mongodb_connect_attempts` attempts.
+    Only connection failures are retried, configuration errors surface immediately.
+    """
+    return {
+        "stop": stop_after_attempt(settings.mongodb_connect_attempts),
+        "wait": wait_exponential(multiplier=0.5, max=settings.mongodb_connect_backoff_max_seconds),
+        "retry": retry_if_exception_type(ConnectionFailure),
+        "before_sleep": lambda state: logger.warning(
+            f"MongoDB connection attempt {state.attempt_number} failed, retrying in {state.next_action.sleep:.1f}s"
+        ),
+        "reraise": True,
+    }
 
 class MongoDBClient:
 
-    @retry(stop=stop_after_attempt(3), wait=wait_fixed(2))
     def __init__(self, settings:Settings, logger:Logger):
-        try:
-            user = settings.mongodb_user
-            password = settings.mongodb_password
-            cluster = settings.mongodb_cluster
-            self.uri = f"mongodb+srv://{user}:{password}@{cluster}.mongodb.net/?retryWrites=true&w=majority"
-            self.logger = logger
-            
-        except Exception as e:
-            self.client = None
-            self.logger.error(f"Database connection error: {str(e)}")
+        user = settings.mongodb_user
+        password = settings.mongodb_password
+        cluster = settings.mongodb_cluster
+        self.uri = f"mongodb+srv://{user}:{password}@{cluster}.mongodb.net/?retryWrites=true&w=majority"
+        self.logger = logger
+        self.settings = settings
+        self.pool_monitor = PoolMonitor()
+        self.client: Optional[MongoClient] = None
+        self.database = None
 
     def connect(self, database_name:str = "dashboard"):
+        if self.client is not None:
+            return
         try:
             if not self.uri:
                 self.logger.error("MongoDB URI is not set")
                 return
-            client = MongoClient(self.uri, serverSelectionTimeoutMS=5000, server_api=ServerApi('1'))
-            self.database = client[database_name]
-
-            client.admin.command('ping')
+            for attempt in Retrying(**connect_retry_policy(self.settings, self.logger)):
+                with attempt:
+                    self._open(database_name)
             self.logger.info("Connected to MongoDB successfully!")
 
         except ConnectionFailure as e:
@@ -41,6 +83,16 @@ class MongoDBClient:
             self.logger.error(f"Failed to connect to MongoDB: {str(e)}")
             raise
 
+    def _open(self, database_name:str):
+        client = MongoClient(self.uri, **mongo_client_options(self.settings, self.pool_monitor))
+        try:
+            client.admin.command('ping')
+        except Exception:
+            client.close()
+            raise
+        self.client = client
+        self.database = client[database_name]
+
     def create_index(self, collection_name, key, unique=False):
         try:
             self.database[collection_name].create_index(key, unique=unique)
@@ -52,12 +104,10 @@ class MongoDBClient:
     def verify_connection(self):
         """Verify MongoDB connection is working"""
         if not self.client:
-            connection_string = f"mongodb+srv://{self.settings.mongodb_user}:{self.settings.mongodb_password}@{self.settings.mongodb_cluster}"
-            self.client = MongoClient(connection_string)
+            self.connect()
         
         try:
-            # The ismaster command is cheap and does not require auth
-            self.client.admin.command('ismaster')
+            self.client.admin.command('ping')
             return True
         except ConnectionFailure as e:
             self.logger.error(f"MongoDB connection failed: {str(e)}")
@@ -121,7 +171,13 @@ class MongoDBClient:
             return False
         
     def close(self):
+        if self.client is None:
+            return
+        deadline = monotonic() + self.settings.mongodb_shutdown_drain_timeout_seconds
+        while self.pool_monitor.checked_out() and monotonic() < deadline:
+            sleep(0.05)
         self.client.close()
+        self.client = None
 
 
 if __name__ == "__main__":
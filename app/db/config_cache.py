@@ -0,0 +1,236 @@
+from dataclasses import dataclass
+from pydantic import BaseModel
+from pymongo.errors import OperationFailure, PyMongoError
+from app.db.async_client import AsyncMongoDBClient
+from app.config.settings import Settings
+from logging import Logger
+from bson import encode
+from hashlib import blake2b
+from time import monotonic
+from typing import Dict, Generic, Iterable, Optional, Type, TypeVar
+import asyncio
+
+T = TypeVar("T", bound=BaseModel)
+
+SINGLE_DOCUMENT_KEY = "default"
+
+@dataclass(frozen=True)
+class ConfigDocument(Generic[T]):
+    """
+    A reference config collection served from the in-process cache, declared next to the
+    repository that reads it. Documents are validated into `model` once per load.
+
+    Args:
+        collection (str): collection holding the config documents
+        model (Type[T]): pydantic model every document is parsed into
+        key_field (Optional[str]): field the documents are looked up by; None when the
+            collection holds a single config document (the first one is used)
+    """
+    collection: str
+    model: Type[T]
+    key_field: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot(Generic[T]):
+    values: Dict[str, T]
+    version: int
+    fingerprint: str
+    loaded_at: float
+    expires_at: float
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    loads: int = 0
+    failed_loads: int = 0
+    invalidations: int = 0
+
+
+class ConfigCache:
+    """
+    In-process cache of reference config documents (fee, discount, fee type and coaching mode
+    configuration) which almost never change.
+
+    Every collection is loaded in one query into an immutable snapshot with a version stamp;
+    the version only moves when the content actually changed, so consumers can rebuild derived
+    state cheaply by comparing versions. Snapshots expire after `config_cache_ttl_seconds` as a
+    safety net; invalidation is pushed by a change stream on the config collections, with a
+    polling fallback when change streams are unavailable (standalone servers, missing privileges).
+    A reload that fails (database error, or a config edit that no longer validates) keeps the
+    last good snapshot in service for another TTL instead of failing the requests reading it.
+    """
+
+    def __init__(self, db:AsyncMongoDBClient, settings:Settings, logger:Logger):
+        self.db = db
+        self.logger = logger
+        self.ttl_seconds = settings.config_cache_ttl_seconds
+        self.poll_interval_seconds = settings.config_cache_poll_interval_seconds
+        self.use_change_streams = settings.config_cache_change_streams
+
+        self.stats = CacheStats()
+        self.invalidation_source = "none"
+        self._documents: Dict[str, ConfigDocument] = {}
+        self._snapshots: Dict[str, ConfigSnapshot] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._invalidated_at: Dict[str, float] = {}
+        self._watcher: Optional[asyncio.Task] = None
+
+    async def get(self, document:ConfigDocument[T], key:str = SINGLE_DOCUMENT_KEY) -> Optional[T]:
+        """
+        Get a config document, loading its whole collection on a miss
+
+        Args:
+            document (ConfigDocument[T]): declaration of the config collection
+            key (str): value of `key_field` to look up, omit for single-document collections
+
+        Returns:
+            Optional[T]: the typed config document, None if it does not exist
+        """
+        snapshot = self._snapshots.get(document.collection)
+        if snapshot is not None and snapshot.expires_at > monotonic():
+            self.stats.hits += 1
+            return snapshot.values.get(key)
+
+        self.stats.misses += 1
+        snapshot = await self.load(document)
+        return snapshot.values.get(key)
+
+    def version(self, collection:str) -> int:
+        """Version stamp of a collection's snapshot, 0 if it has never been loaded"""
+        snapshot = self._snapshots.get(collection)
+        return snapshot.version if snapshot else 0
+
+    async def load(self, document:ConfigDocument[T]) -> ConfigSnapshot[T]:
+        """Load (or reload) a config collection; concurrent callers share one query"""
+        self._documents[document.collection] = document
+        lock = self._locks.setdefault(document.collection, asyncio.Lock())
+        async with lock:
+            current = self._snapshots.get(document.collection)
+            if current is not None and current.expires_at > monotonic() and current.loaded_at > self._invalidated_at.get(document.collection, 0.0):
+                return current
+
+            try:
+                raw_documents = await self.db.find(document.collection, {})
+                fingerprint = blake2b(b"".join(encode(raw) for raw in raw_documents), digest_size=16).hexdigest()
+                if document.key_field is None:
+                    raw_documents = raw_documents[:1]
+                values = {
+                    str(raw[document.key_field]) if document.key_field else SINGLE_DOCUMENT_KEY: document.model(**raw)
+                    for raw in raw_documents
+                }
+            except Exception as e:
+                self.stats.failed_loads += 1
+                if current is None:
+                    raise
+                self.logger.error(f"Config cache failed to reload {document.collection}, serving version {current.version}: {str(e)}")
+                now = monotonic()
+                snapshot = ConfigSnapshot(
+                    values=current.values, version=current.version, fingerprint=current.fingerprint, loaded_at=now, expires_at=now + self.ttl_seconds
+                )
+                self._snapshots[document.collection] = snapshot
+                return snapshot
+
+            version = 1
+            if current is not None:
+                version = current.version if current.fingerprint == fingerprint else current.version + 1
+            now = monotonic()
+            snapshot = ConfigSnapshot(values=values, version=version, fingerprint=fingerprint, loaded_at=now, expires_at=now + self.ttl_seconds)
+            self._snapshots[document.collection] = snapshot
+            self.stats.loads += 1
+            if current is not None and version != current.version:
+                self.logger.info(f"Config cache: {document.collection} changed, now at version {version}")
+            return snapshot
+
+    async def invalidate(self, collection:str):
+        """Drop a collection's snapshot and reload it right away so readers keep hitting memory"""
+        self.stats.invalidations += 1
+        self._invalidated_at[collection] = monotonic()
+        document = self._documents.get(collection)
+        if document is not None:
+            await self.load(document)
+
+    async def start(self, documents:Iterable[ConfigDocument]):
+        """Load every declared config collection and start the invalidation watcher"""
+        for document in documents:
+            await self.load(document)
+        if self._watcher is None:
+            self._watcher = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        if self._watcher is not None:
+            self._watcher.cancel()
+            try:
+                await self._watcher
+            except asyncio.CancelledError:
+                pass
+            self._watcher = None
+        self.invalidation_source = "none"
+
+    async def _watch(self):
+        backoff = 1.0
+        while self.use_change_streams:
+            try:
+                async with await self.db.watch(list(self._documents)) as stream:
+                    self.invalidation_source = "change_stream"
+                    self.logger.info(f"Config cache watching {list(self._documents)} for changes")
+                    backoff = 1.0
+                    async for change in stream:
+                        await self.invalidate(change["ns"]["coll"])
+            except OperationFailure as e:
+                self.logger.warning(f"Config cache: change streams unavailable ({str(e)}), falling back to polling")
+                break
+            except PyMongoError as e:
+                # Stream interrupted, reload everything in case a change was missed while reconnecting
+                self.logger.error(f"Config cache change stream interrupted: {str(e)}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60.0)
+                await self._reload_all()
+            except Exception as e:
+                self.logger.error(f"Config cache watcher failed: {str(e)}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60.0)
+        await self._poll()
+
+    async def _poll(self):
+        self.invalidation_source = "polling"
+        while True:
+            await asyncio.sleep(self.poll_interval_seconds)
+            await self._reload_all()
+
+    async def _reload_all(self):
+        for collection in list(self._documents):
+            try:
+                await self.invalidate(collection)
+            except Exception as e:
+                self.logger.error(f"Config cache failed to reload {collection}: {str(e)}")
+
+    def cache_stats(self) -> Dict:
+        """
+        Hit/miss counters and the version of every cached collection
+
+        Returns:
+            Dict: cache statistics
+        """
+        now = monotonic()
+        lookups = self.stats.hits + self.stats.misses
+        return {
+            "hits": self.stats.hits,
+            "misses": self.stats.misses,
+            "hit_rate": round(self.stats.hits / lookups, 4) if lookups else 0.0,
+            "loads": self.stats.loads,
+            "failed_loads": self.stats.failed_loads,
+            "invalidations": self.stats.invalidations,
+            "invalidation_source": self.invalidation_source,
+            "collections": {
+                collection: {
+                    "version": snapshot.version,
+                    "documents": len(snapshot.values),
+                    "age_seconds": round(now - snapshot.loaded_at, 1),
+                    "expires_in_seconds": round(snapshot.expires_at - now, 1),
+                }
+                for collection, snapshot in self._snapshots.items()
+            },
+        }
@@ -0,0 +1,119 @@
+from dataclasses import dataclass, field
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure
+from app.db.async_client import AsyncMongoDBClient
+from logging import Logger
+from typing import Dict, List, Optional, Iterable
+
+@dataclass(frozen=True)
+class HotQuery:
+    """
+    A query shape the application runs on a hot path, declared next to the repository that
+    issues it. The explain check runs it with sample values and fails if the winning plan
+    falls back to a collection scan.
+    """
+    name: str
+    collection: str
+    filter: Dict
+    sort: Optional[List] = None
+    projection: Optional[Dict] = None
+
+
+@dataclass
+class IndexRegistry:
+    """
+    Declarative registry of the indexes every repository relies on.
+
+    Repositories declare `indexes: Dict[str, List[IndexModel]]` (collection -> indexes) and
+    `hot_queries: List[HotQuery]` as class attributes; the registry merges them and can
+    reconcile them against the cluster, report missing/unused indexes and explain hot queries.
+    """
+    indexes: Dict[str, List[IndexModel]] = field(default_factory=dict)
+    hot_queries: List[HotQuery] = field(default_factory=list)
+
+    @classmethod
+    def from_repositories(cls, repositories:Iterable[type]) -> "IndexRegistry":
+        registry = cls()
+        for repository in repositories:
+            for collection_name, models in getattr(repository, "indexes", {}).items():
+                registry.indexes.setdefault(collection_name, []).extend(models)
+            registry.hot_queries.extend(getattr(repository, "hot_queries", []))
+        return registry
+
+    @staticmethod
+    def index_name(model:IndexModel) -> str:
+        return model.document["name"]
+
+    async def apply(self, db:AsyncMongoDBClient, logger:Logger) -> Dict[str, List[str]]:
+        """
+        Create every declared index. `createIndexes` is a no-op for indexes that already exist
+        with the same keys and options, so this is safe to run on every startup.
+        Conflicting definitions are logged and left untouched rather than dropped.
+
+        Returns:
+            Dict[str, List[str]]: names of the indexes ensured per collection
+        """
+        ensured = {}
+        for collection_name, models in self.indexes.items():
+            try:
+                ensured[collection_name] = await db.create_indexes(collection_name, models)
+            except OperationFailure as e:
+                logger.error(f"Failed to reconcile indexes on {collection_name}: {str(e)}")
+        logger.info(f"Indexes reconciled on {len(ensured)} collections")
+        return ensured
+
+    async def report(self, db:AsyncMongoDBClient) -> Dict[str, Dict[str, List]]:
+        """
+        Compare the declared indexes with the cluster using `$indexStats`
+
+        Returns:
+            Dict[str, Dict[str, List]]: per collection, the `missing` declared indexes, the
+            `unused` indexes (no operations since the server's stats were last reset) and the
+            `undeclared` indexes present on the cluster but absent from the registry
+        """
+        report = {}
+        for collection_name, models in self.indexes.items():
+            declared = {self.index_name(model) for model in models}
+            stats = await db.index_stats(collection_name)
+            existing = {stat["name"] for stat in stats}
+            report[collection_name] = {
+                "missing": sorted(declared - existing),
+                "unused": sorted(
+                    stat["name"] for stat in stats
+                    if stat["name"] != "_id_" and stat["accesses"]["ops"] == 0
+                ),
+                "undeclared": sorted(existing - declared - {"_id_"}),
+            }
+        return report
+
+    async def explain_hot_queries(self, db:AsyncMongoDBClient) -> Dict[str, List[str]]:
+        """
+        Explain every hot query and collect the plan stages of its winning plan
+
+        Returns:
+            Dict[str, List[str]]: winning plan stages keyed by hot query name
+        """
+        plans = {}
+        for query in self.hot_queries:
+            explanation = await db.explain_find(query.collection, query.filter, sort=query.sort, projection=query.projection)
+            plans[query.name] = plan_stages(explanation["queryPlanner"]["winningPlan"])
+        return plans
+
+    async def collection_scans(self, db:AsyncMongoDBClient) -> List[str]:
+        """Names of the hot queries whose winning plan contains a COLLSCAN stage"""
+        plans = await self.explain_hot_queries(db)
+        return [name for name, stages in plans.items() if "COLLSCAN" in stages]
+
+
+def plan_stages(plan:Dict) -> List[str]:
+    """Flatten an explain plan tree (classic or slot-based engine) into its list of stages"""
+    stages = []
+    node = plan.get("queryPlan", plan)
+    if "stage" in node:
+        stages.append(node["stage"])
+    for child_key in ("inputStage", "outerStage", "innerStage"):
+        if child_key in node:
+            stages.extend(plan_stages(node[child_key]))
+    for child in node.get("inputStages", []):
+        stages.extend(plan_stages(child))
+    return stages
@@ -0,0 +1,124 @@
+from pymongo import monitoring
+from threading import Lock
+from typing import Dict
+
+class _ServerPoolStats:
+    def __init__(self) -> None:
+        self.open_connections = 0
+        self.checked_out = 0
+        self.wait_queue_length = 0
+        self.checkout_failures = 0
+        self.pool_cleared = 0
+        self.connections_created = 0
+        self.connection_creation_total_ms = 0.0
+        self.connection_creation_max_ms = 0.0
+        self.connection_creation_last_ms = 0.0
+        self.checkout_wait_max_ms = 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        created = self.connections_created
+        return {
+            "open_connections": self.open_connections,
+            "checked_out": self.checked_out,
+            "available": max(self.open_connections - self.checked_out, 0),
+            "wait_queue_length": self.wait_queue_length,
+            "checkout_failures": self.checkout_failures,
+            "pool_cleared": self.pool_cleared,
+            "connection_creation_ms": {
+                "count": created,
+                "avg": round(self.connection_creation_total_ms / created, 2) if created else 0.0,
+                "max": round(self.connection_creation_max_ms, 2),
+                "last": round(self.connection_creation_last_ms, 2),
+            },
+            "checkout_wait_max_ms": round(self.checkout_wait_max_ms, 2),
+        }
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """
+    Connection pool listener keeping live per-server pool statistics.
+
+    Registered on the MongoDB client through `event_listeners`, so the counters track the
+    driver's own view of the pool: connections checked out, idle connections available,
+    operations waiting for a connection and how long new connections take to become ready.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._servers: Dict[str, _ServerPoolStats] = {}
+
+    def _server(self, address) -> _ServerPoolStats:
+        key = f"{address[0]}:{address[1]}"
+        if key not in self._servers:
+            self._servers[key] = _ServerPoolStats()
+        return self._servers[key]
+
+    def stats(self) -> Dict[str, Dict]:
+        """
+        Snapshot of the pool statistics of every server the client has talked to
+
+        Returns:
+            Dict[str, Dict]: Pool statistics keyed by `host:port`
+        """
+        with self._lock:
+            return {address: server.as_dict() for address, server in self._servers.items()}
+
+    def checked_out(self) -> int:
+        with self._lock:
+            return sum(server.checked_out for server in self._servers.values())
+
+    def pool_created(self, event):
+        with self._lock:
+            self._server(event.address)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self._server(event.address).pool_cleared += 1
+
+    def pool_closed(self, event):
+        with self._lock:
+            self._servers.pop(f"{event.address[0]}:{event.address[1]}", None)
+
+    def connection_created(self, event):
+        with self._lock:
+            self._server(event.address).open_connections += 1
+
+    def connection_ready(self, event):
+        duration_ms = (event.duration or 0.0) * 1000
+        with self._lock:
+            server = self._server(event.address)
+            server.connections_created += 1
+            server.connection_creation_total_ms += duration_ms
+            server.connection_creation_last_ms = duration_ms
+            server.connection_creation_max_ms = max(server.connection_creation_max_ms, duration_ms)
+
+    def connection_closed(self, event):
+        with self._lock:
+            server = self._server(event.address)
+            server.open_connections = max(server.open_connections - 1, 0)
+
+    def connection_check_out_started(self, event):
+        with self._lock:
+            self._server(event.address).wait_queue_length += 1
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            server = self._server(event.address)
+            server.wait_queue_length = max(server.wait_queue_length - 1, 0)
+            server.checkout_failures += 1
+
+    def connection_checked_out(self, event):
+        duration_ms = (event.duration or 0.0) * 1000
+        with self._lock:
+            server = self._server(event.address)
+            server.wait_queue_length = max(server.wait_queue_length - 1, 0)
+            server.checked_out += 1
+            server.checkout_wait_max_ms = max(server.checkout_wait_max_ms, duration_ms)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            server = self._server(event.address)
+            server.checked_out = max(server.checked_out - 1, 0)
@@ -1,19 +1,28 @@
 from dependency_injector import containers, providers
 from app.config.settings import get_settings
 from app.core.logger import get_logger
-from app.db.client import MongoDBClient
+from app.db.async_client import AsyncMongoDBClient
+from app.db.config_cache import ConfigCache
 from app.core.security import Security
+from app.core.rate_limiter import LoginRateLimiter, InMemoryRateLimitBackend, MongoRateLimitBackend
 
 # Services
 from app.services.auth_service import AuthService
+from app.services.last_login_buffer import LastLoginBuffer
 from app.services.admin_services import AdminService
 from app.services.payment_services import PaymentService
+from app.services.fee_table import FeeTableProvider
+from app.services.fee_quote_cache import FeeQuoteCache
+from app.services.installment_schedule import InstallmentScheduler
+from app.services.student_profile_cache import StudentProfileCache
 
 # Repositories
 from app.repositories.auth_repository import AuthRepository
 from app.repositories.base_repository import BaseRepository
 from app.repositories.admin_repository import AdminRepository
 from app.repositories.payment_repository import PaymentRepository
+from app.repositories.rate_limit_repository import RateLimitRepository
+from app.repositories.refresh_token_repository import RefreshTokenRepository
 
 
 class Container(containers.DeclarativeContainer):
@@ -23,24 +32,41 @@ class Container(containers.DeclarativeContainer):
             ],
         packages=[
             "app.api.v1",
+            "app.api.health",
         ]
     )
 
     # Singletons
     settings = providers.Singleton(get_settings)
     logger = providers.Singleton(get_logger, "BrainAspire", "app/logs")
-    db = providers.Singleton(MongoDBClient, settings, logger)
+    db = providers.Singleton(AsyncMongoDBClient, settings, logger)
     baseDB = providers.Singleton(BaseRepository, db)
+    config_cache = providers.Singleton(ConfigCache, db, settings, logger)
     security = providers.Singleton(Security, settings, logger)
 
     # Repositories
     auth_repo = providers.Factory(AuthRepository, db)
-    admin_repo = providers.Factory(AdminRepository, db)
-    payment_repo = providers.Factory(PaymentRepository, db)
+    admin_repo = providers.Factory(AdminRepository, db, config_cache)
+    payment_repo = providers.Factory(PaymentRepository, db, config_cache)
+    rate_limit_repo = providers.Factory(RateLimitRepository, db)
+    refresh_token_repo = providers.Factory(RefreshTokenRepository, db)
+
+    # Login throttling, the backend is picked by LOGIN_RATE_LIMIT_BACKEND
+    login_rate_limit_backend = providers.Selector(
+        settings.provided.login_rate_limit_backend,
+        memory=providers.Singleton(InMemoryRateLimitBackend, settings.provided.login_rate_limit_eviction_interval_seconds),
+        mongodb=providers.Singleton(MongoRateLimitBackend, rate_limit_repo, logger),
+    )
+    login_rate_limiter = providers.Singleton(LoginRateLimiter, login_rate_limit_backend, settings, logger)
 
     # Services
-    auth_service = providers.Factory(AuthService, security, auth_repo)
-    admin_service = providers.Factory(AdminService, admin_repo, security, logger)
-    payment_service = providers.Factory(PaymentService, payment_repo, logger)
+    last_login_buffer = providers.Singleton(LastLoginBuffer, auth_repo, settings, logger)
+    auth_service = providers.Factory(AuthService, security, auth_repo, refresh_token_repo, last_login_buffer, login_rate_limiter)
+    fee_tables = providers.Singleton(FeeTableProvider, payment_repo, config_cache, logger)
+    fee_quote_cache = providers.Singleton(FeeQuoteCache, settings)
+    installment_scheduler = providers.Singleton(InstallmentScheduler, settings)
+    student_profile_cache = providers.Singleton(StudentProfileCache, settings)
+    admin_service = providers.Factory(AdminService, admin_repo, security, logger, settings, fee_tables, installment_scheduler, student_profile_cache)
+    payment_service = providers.Factory(PaymentService, payment_repo, logger, fee_tables, fee_quote_cache, installment_scheduler, settings)
 
     
\ No newline at end of file
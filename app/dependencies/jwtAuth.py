@@ -4,6 +4,7 @@ from app.dependencies.container import Container
 from fastapi.security import OAuth2PasswordBearer
 from app.core.security import Security
 from app.exceptions.authExceptions import TokenExpired, InvalidCredentials
+from app.services.auth_service import AuthService
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/v1/auth/login")
 
@@ -23,3 +24,15 @@ async def get_current_user_id(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials.",
         )
+
+
+@inject
+async def require_admin(
+    user_id: str = Depends(get_current_user_id),
+    auth_service: AuthService = Depends(Provide[Container.auth_service])) -> str:
+    if not await auth_service.is_admin(user_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required.",
+        )
+    return user_id
@@ -26,4 +26,28 @@ class FailedToMapTeacherSubjects(Exception):
     pass
 
 class FailedToGetPreferredSubjects(Exception):
-    pass
\ No newline at end of file
+    pass
+
+class UserIDAlreadyExists(Exception):
+    pass
+
+class FailedToOnboardStudent(Exception):
+    pass
+
+class FailedToOnboardTeacher(Exception):
+    pass
+
+class InvalidListQuery(Exception):
+    pass
+
+class InvalidProfileQuery(Exception):
+    pass
+
+class StudentNotFound(Exception):
+    pass
+
+class InvalidAttendanceRequest(Exception):
+    pass
+
+class FailedToMarkAttendance(Exception):
+    pass
@@ -8,4 +8,12 @@ class TokenExpired(Exception):
     pass
 
 class AccessDenied(Exception):
-    pass
\ No newline at end of file
+    pass
+
+class HashingPoolSaturated(Exception):
+    pass
+
+class LoginThrottled(Exception):
+    def __init__(self, message:str, retry_after:float):
+        super().__init__(message)
+        self.retry_after = retry_after
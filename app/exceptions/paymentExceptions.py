@@ -2,4 +2,10 @@ class FailedToGetCourseFeeConfig(Exception):
     pass
 
 class FailedToGetDiscountConfig(Exception):
+    pass
+
+class GradeNotOffered(Exception):
+    pass
+
+class UnknownDiscount(Exception):
     pass
\ No newline at end of file
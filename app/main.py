@@ -1,6 +1,7 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-# from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager
+import asyncio
 
 from .config.settings import get_settings
 from .middlewares.globalExceptionHandlers import ExceptionMiddleware
@@ -8,33 +9,37 @@ from .utils.routes import add_routes
 from .dependencies.container import Container
 
 
-# @asynccontextmanager
-# async def lifespan(app: FastAPI):
-#     """Lifespan handler replacing on_event('startup') and on_event('shutdown')"""
-#     container = Container()
-
-#     # Store container reference in app
-#     app.container = container
-
-#     try:
-#         container.init_resources()
-#         container.wire(
-#             modules=[
-#                 "app.middlewares.globalExceptionHandlers",
-#             ],
-#             packages=[
-#                 "app.api.v1",
-#             ]
-#         )
-#         container.logger().info("Container wired and resources initialized")
-#     except Exception as e:
-#         print(f"Startup failed: {str(e)}")
-#         raise RuntimeError(f"Failed to initialize: {str(e)}")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Lifespan handler owning the process-wide MongoDB client.
+    Startup: calibrate argon2 when enabled, connect with backoff, warm-up ping and pool pre-fill
+    before traffic is accepted, then reconcile the declared indexes and preload the reference
+    config cache and start the last_login write-behind buffer.
+    Shutdown: stop the config cache watcher, flush pending last_login updates, stop the
+    password hashing pool, drain checked-out connections, then close the client.
+    """
+    container: Container = app.container
+    try:
+        if container.settings().argon2_calibrate:
+            await asyncio.to_thread(container.security().calibrate_argon2)
+        await container.baseDB().connect()
+        if container.settings().mongodb_sync_indexes_on_startup:
+            await container.baseDB().create_indexes()
+        await container.config_cache().start(container.baseDB().config_documents())
+        container.last_login_buffer().start()
+        container.logger().info("Startup complete, MongoDB client ready")
+    except Exception as e:
+        container.logger().error(f"Startup failed: {str(e)}")
+        raise RuntimeError(f"Failed to initialize: {str(e)}")
 
-#     yield  # App is now running
+    yield  # App is now running
 
-#     # Optional: Add shutdown logic here
-#     # container.logger().info("Shutting down app...")
+    container.logger().info("Shutting down app...")
+    await container.config_cache().stop()
+    await container.last_login_buffer().stop()
+    await asyncio.to_thread(container.security().shutdown)
+    await container.baseDB().close()
 
 def init_resources(app: FastAPI):
     container = Container()
@@ -43,15 +48,13 @@ def init_resources(app: FastAPI):
     app.container = container
 
     try:
-        container.logger().info("Container wired and resources initialized")
-        container.baseDB().connect()
-        # container.baseDB().create_indexes()   # uncomment to create indexes
         container.wire(
             modules=[
                 "app.middlewares.globalExceptionHandlers",
             ],
             packages=[
                 "app.api.v1",
+                "app.api.health",
             ]
         )
         container.logger().info("Container wired and resources initialized\n\n")
@@ -65,7 +68,8 @@ def create_app() -> FastAPI:
     # Create FastAPI instance
     app = FastAPI(
         title=settings.PROJECT_NAME,
-        version=settings.VERSION
+        version=settings.VERSION,
+        lifespan=lifespan
     )
 
     # Add startup and shutdown events
@@ -2,8 +2,9 @@ from fastapi import Request, status
 from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 from time import time
-from pymongo.errors import ServerSelectionTimeoutError
+from pymongo.errors import ServerSelectionTimeoutError, WaitQueueTimeoutError
 from pydantic import ValidationError
+from app.exceptions.authExceptions import HashingPoolSaturated
 
 # DI dependencies
 from dependency_injector.wiring import inject
@@ -13,9 +14,10 @@ from app.utils.dependencyManager import Dependencies
 class ExceptionMiddleware(BaseHTTPMiddleware):
 
     @inject
-    def __init__(self, app, logger:Dependencies.LoggerDependency):
+    def __init__(self, app, logger:Dependencies.LoggerDependency, settings:Dependencies.SettingsDependency):
         super().__init__(app)
         self.logger = logger
+        self.hashing_retry_after = str(settings.password_hashing_retry_after_seconds)
 
     async def dispatch(self, request: Request, call_next):
         start = time()
@@ -41,6 +43,27 @@ class ExceptionMiddleware(BaseHTTPMiddleware):
                 }
             )
         
+        except WaitQueueTimeoutError as e:
+            self.logger.error(f"Database connection pool exhausted: {str(e)}")
+            return JSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                content={
+                    "detail": "Database is busy",
+                    "message": "Timed out waiting for a free database connection"
+                }
+            )
+
+        except HashingPoolSaturated as e:
+            self.logger.warning(f"Shedding request, {str(e)}")
+            return JSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": self.hashing_retry_after},
+                content={
+                    "detail": "Server is busy",
+                    "message": "Too many sign-ins in progress, please retry shortly"
+                }
+            )
+
         except Exception as e:
             self.logger.exception("Unhandled exception during request")
             raise
@@ -1,66 +1,307 @@
-from app.db.client import MongoDBClient
+from app.db.async_client import AsyncMongoDBClient
+from app.db.indexes import HotQuery
+from app.db.config_cache import ConfigCache, ConfigDocument
 from app.schemas.auth_schema import Auth
 from app.schemas.student_schema import Students
 from app.schemas.teacher_scherma import Teachers
 from app.schemas.common import Subjects, MonthlyPerformanceTracker, UserRoles
-from app.schemas.fee_schema import Installments
+from app.schemas.fee_schema import Installments, FeeTypeConfigurations
+from app.schemas.student_schema import CoachingModes
+from pymongo import IndexModel, ASCENDING, UpdateOne
+from pymongo.errors import BulkWriteError
+from pymongo.results import BulkWriteResult
 from bson import ObjectId
-from typing import Dict, List
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+FEE_TYPE_CONFIG = ConfigDocument(collection="fee-type-configurations", model=FeeTypeConfigurations, key_field="_id")
+COACHING_MODE_CONFIG = ConfigDocument(collection="coaching-mode-config", model=CoachingModes, key_field="name")
 
 class AdminRepository:
-    def __init__(self, db: MongoDBClient) -> ObjectId|None:
+    # Student listings page on `_id` or `(grade, _id)`: each index serves one equality filter
+    # together with the keyset order, so a page is an index range scan whatever its depth.
+    # Teacher listings page on `_id` alone, served by the default `_id_` index.
+    # A date_joined range is bounded on `(date_joined, _id)`: the page is sorted on `_id` after
+    # the range scan, so that sort only ever holds the students or teachers of the range.
+    # The outstanding-fees report walks each (grade, coaching mode) group in `_id` order on
+    # `(grade, coaching_modeID, _id)`.
+    indexes = {
+        "students": [
+            IndexModel([("grade", ASCENDING), ("_id", ASCENDING)]),
+            IndexModel([("coaching_modeID", ASCENDING), ("_id", ASCENDING)]),
+            IndexModel([("fee_typeID", ASCENDING), ("_id", ASCENDING)]),
+            IndexModel([("date_joined", ASCENDING), ("_id", ASCENDING)]),
+            IndexModel([("grade", ASCENDING), ("coaching_modeID", ASCENDING), ("_id", ASCENDING)]),
+        ],
+        "teachers": [IndexModel([("date_joined", ASCENDING), ("_id", ASCENDING)])],
+        "subjects": [IndexModel([("grade", ASCENDING), ("name", ASCENDING)])],
+        "coaching-mode-config": [IndexModel([("name", ASCENDING)])],
+        "student-subjects": [IndexModel([("studentID", ASCENDING), ("subjectID", ASCENDING)])],
+        "teacher-subjects": [IndexModel([("teacherID", ASCENDING), ("subjectID", ASCENDING)])],
+        "installments": [
+            IndexModel([("studentID", ASCENDING), ("installment_number", ASCENDING)]),
+            IndexModel([("payment_status", ASCENDING), ("payment_window.end_date", ASCENDING)]),
+        ],
+        "student-monthly-performance-trackers": [
+            IndexModel([("studentID", ASCENDING), ("subjectID", ASCENDING), ("year_batch", ASCENDING)]),
+        ],
+    }
+    hot_queries = [
+        HotQuery(name="students.by_id", collection="students", filter={"_id": ObjectId()}),
+        HotQuery(name="students.page_by_id", collection="students", filter={"_id": {"$gt": ObjectId()}}, sort=[("_id", ASCENDING)]),
+        HotQuery(name="students.page_by_grade", collection="students", filter={
+            "$or": [{"grade": {"$gt": 9}}, {"grade": 9, "_id": {"$gt": ObjectId()}}]
+        }, sort=[("grade", ASCENDING), ("_id", ASCENDING)]),
+        HotQuery(name="students.page_of_grade", collection="students", filter={"grade": 9, "_id": {"$gt": ObjectId()}}, sort=[("_id", ASCENDING)]),
+        HotQuery(name="students.page_of_coaching_mode", collection="students", filter={"coaching_modeID": ObjectId(), "_id": {"$gt": ObjectId()}}, sort=[("_id", ASCENDING)]),
+        HotQuery(name="students.page_of_fee_type", collection="students", filter={"fee_typeID": "FEE02", "_id": {"$gt": ObjectId()}}, sort=[("_id", ASCENDING)]),
+        HotQuery(name="students.page_joined_between", collection="students", filter={
+            "$and": [{"date_joined": {"$gte": datetime(2025, 6, 1), "$lt": datetime(2025, 7, 1)}}, {"_id": {"$gt": ObjectId()}}]
+        }, sort=[("_id", ASCENDING)]),
+        HotQuery(name="teachers.page_by_id", collection="teachers", filter={"_id": {"$gt": ObjectId()}}, sort=[("_id", ASCENDING)]),
+        HotQuery(name="teachers.page_joined_between", collection="teachers", filter={
+            "$and": [{"date_joined": {"$gte": datetime(2025, 6, 1), "$lt": datetime(2025, 7, 1)}}, {"_id": {"$gt": ObjectId()}}]
+        }, sort=[("_id", ASCENDING)]),
+        HotQuery(name="subjects.by_grade_and_name", collection="subjects", filter={
+            "$or": [{"grade": 9, "name": {"$in": ["maths", "science"]}}, {"grade": 10, "name": {"$in": ["maths"]}}]
+        }),
+        HotQuery(name="coaching-mode-config.by_name", collection="coaching-mode-config", filter={"name": "online"}),
+        HotQuery(name="student-subjects.by_studentID", collection="student-subjects", filter={"studentID": ObjectId()}),
+        HotQuery(name="teacher-subjects.by_teacherID", collection="teacher-subjects", filter={"teacherID": ObjectId()}),
+        HotQuery(name="installments.by_studentID", collection="installments", filter={"studentID": ObjectId()}),
+        HotQuery(name="installments.overdue", collection="installments", filter={
+            "payment_status": False, "payment_window.end_date": {"$lt": datetime(2026, 1, 1)}
+        }),
+        HotQuery(name="students.outstanding_report_group", collection="students", filter={
+            "grade": 9, "coaching_modeID": ObjectId()
+        }, sort=[("_id", ASCENDING)]),
+        HotQuery(name="installments.overdue_of_student", collection="installments", filter={
+            "studentID": ObjectId(), "payment_status": False, "payment_window.end_date": {"$lt": datetime(2026, 1, 1)}
+        }, sort=[("installment_number", ASCENDING)]),
+        HotQuery(name="trackers.by_student_subject_batch", collection="student-monthly-performance-trackers", filter={
+            "studentID": ObjectId(), "subjectID": "MATH009", "year_batch": 2025
+        }),
+    ]
+
+    cached_configs = [FEE_TYPE_CONFIG, COACHING_MODE_CONFIG]
+
+    def __init__(self, db: AsyncMongoDBClient, config_cache: ConfigCache) -> None:
         self.db = db
+        self.config_cache = config_cache
     
-    def create_new_user_auth(self, user:Auth, collection_name:str = "auth"):
-        return self.db.insert(collection_name, user.model_dump(exclude={"id"}))
+    async def user_id_exists(self, user_id:str, collection_name:str = "auth") -> bool:
+        return await self.db.find_one(collection_name, {"userID": user_id}, {"_id": 1}) is not None
+
+    async def existing_user_ids(self, user_ids:List[str], collection_name:str = "auth") -> Set[str]:
+        """Which of the given userIDs are already taken, in one query served by the userID index"""
+        taken = await self.db.find(collection_name, {"userID": {"$in": user_ids}}, {"_id": 0, "userID": 1})
+        return {user["userID"] for user in taken}
+
+    async def insert_onboarding_documents(self, documents:Dict[str, List[dict]]) -> bool:
+        """
+        Write every document of an onboarding (auth, profile, mappings, trackers, installments)
+        in one transaction, so a failure leaves nothing behind
+
+        Args:
+            documents (Dict[str, List[dict]]): documents keyed by collection name
+
+        Returns:
+            bool: True if all documents were committed
+
+        Raises:
+            DuplicateKeyError: a userID of the documents was taken by a concurrent onboarding
+        """
+        return await self.db.insert_documents_in_transaction(documents)
+
+    async def create_new_user_auth(self, user:Auth, collection_name:str = "auth"):
+        return await self.db.insert(collection_name, user.model_dump(exclude={"id"}))
     
-    def create_new_roles(self, user:UserRoles, collection_name:str="user-roles"):
-        return self.db.insert(collection_name, user.model_dump(by_alias=True))
+    async def create_new_roles(self, user:UserRoles, collection_name:str="user-roles"):
+        return await self.db.insert(collection_name, user.model_dump(by_alias=True))
 
-    def save_student_profile(self, student:Students, collection_name:str="students"):
-        return self.db.insert(collection_name, student.model_dump(by_alias=True))
+    async def save_student_profile(self, student:Students, collection_name:str="students"):
+        return await self.db.insert(collection_name, student.model_dump(by_alias=True))
         
-    def get_preferred_subjects(self, grade_subjects:Dict[int, List[str]], collection_name:str="subjects") -> List[Subjects] | None:
-        return list(self.db.find(collection_name, {
+    async def get_preferred_subjects(self, grade_subjects:Dict[int, List[str]], collection_name:str="subjects") -> List[Subjects] | None:
+        return await self.db.find(collection_name, {
                 "$or":[
                     {"grade":grade_item, "name":{"$in":preferred_subjects}} for grade_item, preferred_subjects in grade_subjects.items()
                 ]
             })
-            )
     
-    def add_mapped_student_subject(self, student_objID:ObjectId, subject_objIDs:List[ObjectId], collection_name:str="student-subjects") -> List[ObjectId] | None:
+    async def add_mapped_student_subject(self, student_objID:ObjectId, subject_objIDs:List[ObjectId], collection_name:str="student-subjects") -> List[ObjectId] | None:
         student_subject_mappings = [
             {
                 "studentID":student_objID,
                 "subjectID":subject_objID
             } for subject_objID in subject_objIDs
         ]
-        return self.db.insert_many(collection_name, student_subject_mappings)
+        return await self.db.insert_many(collection_name, student_subject_mappings)
     
-    def add_mapped_student_monthly_performance_tracker(self, performance_trackers:List[MonthlyPerformanceTracker], collection_name:str="student-monthly-performance-trackers") -> List[ObjectId] | None:
+    async def add_mapped_student_monthly_performance_tracker(self, performance_trackers:List[MonthlyPerformanceTracker], collection_name:str="student-monthly-performance-trackers") -> List[ObjectId] | None:
         performance_trackers = [
             tracker.model_dump(by_alias=True) for tracker in performance_trackers
         ]
-        return self.db.insert_many(collection_name, performance_trackers)
+        return await self.db.insert_many(collection_name, performance_trackers)
     
-    def get_fee_type_configurations(self, collection_name:str="fee-type-configurations") -> Dict[str, str] | None:
-        return self.db.find_one(collection_name, {"_id":"fee_type"})
+    async def list_page(self, collection_name:str, query:dict, sort:List, limit:int, projection:dict) -> List[dict]:
+        """
+        One page of a keyset-paginated listing
+
+        Args:
+            collection_name (str): students or teachers
+            query (dict): filters combined with the keyset position
+            sort (List): keyset order, ending with `_id`
+            limit (int): documents to return
+            projection (dict): fields of the list view
+
+        Returns:
+            List[dict]: the page, in keyset order
+        """
+        return await self.db.find(collection_name, query, projection, sort=sort, limit=limit)
+
+    async def get_student_profile(self, student_objID:ObjectId, sections:Tuple[str, ...]) -> Optional[dict]:
+        """
+        A student together with the requested sections of its profile, assembled server-side by
+        one aggregation: `_id` match on `students`, then one `$lookup` per section, each served
+        by the `studentID`-prefixed index of the joined collection
+
+        Args:
+            student_objID (ObjectId): the student's ObjectID
+            sections (Tuple[str, ...]): any of subjects, performance and installments
+
+        Returns:
+            Optional[dict]: the profile, None if there is no such student
+        """
+        pipeline = [
+            {"$match": {"_id": student_objID}},
+            {"$lookup": {
+                "from": "coaching-mode-config",
+                "localField": "coaching_modeID",
+                "foreignField": "_id",
+                "pipeline": [{"$project": {"_id": 0, "name": 1}}],
+                "as": "coaching_mode",
+            }},
+            {"$set": {"coaching_mode": {"$first": "$coaching_mode.name"}}},
+        ]
+        if "subjects" in sections:
+            pipeline.append({"$lookup": {
+                "from": "student-subjects",
+                "localField": "_id",
+                "foreignField": "studentID",
+                "pipeline": [
+                    {"$lookup": {"from": "subjects", "localField": "subjectID", "foreignField": "_id", "as": "subject"}},
+                    {"$unwind": "$subject"},
+                    {"$replaceRoot": {"newRoot": "$subject"}},
+                    {"$sort": {"grade": 1, "name": 1}},
+                ],
+                "as": "subjects",
+            }})
+        if "performance" in sections:
+            pipeline.append({"$lookup": {
+                "from": "student-monthly-performance-trackers",
+                "localField": "_id",
+                "foreignField": "studentID",
+                "pipeline": [
+                    {"$project": {"studentID": 0}},
+                    {"$sort": {"year_batch": -1, "subjectID": 1}},
+                ],
+                "as": "performance",
+            }})
+        if "installments" in sections:
+            pipeline.append({"$lookup": {
+                "from": "installments",
+                "localField": "_id",
+                "foreignField": "studentID",
+                "pipeline": [
+                    {"$project": {"studentID": 0}},
+                    {"$sort": {"installment_number": 1}},
+                ],
+                "as": "installments",
+            }})
+
+        profiles = await self.db.aggregate("students", pipeline)
+        return profiles[0] if profiles else None
+
+    @staticmethod
+    def attendance_updates(subjectID:str, year_batch:int, class_date:datetime, marks:List[Tuple[ObjectId, bool]]) -> List[UpdateOne]:
+        """
+        One tracker update per mark, counting the class in `monthly_attendance.<month>`.
+
+        Each update only matches while the date is not yet in that month's `marked_dates`, and
+        records it there in the same atomic update, so applying the same marks twice counts
+        them once. Absences also land in `dates_of_absence`; present marks `$addToSet` an empty
+        `$each` there so the field exists either way.
+
+        Args:
+            subjectID (str): subject code of the class
+            year_batch (int): year batch of the trackers
+            class_date (datetime): day of the class, at midnight
+            marks (List[Tuple[ObjectId, bool]]): studentID and whether the student attended
+
+        Returns:
+            List[UpdateOne]: updates for `student-monthly-performance-trackers`
+        """
+        month = f"monthly_attendance.{class_date.month}"
+        return [
+            UpdateOne(
+                {"studentID": studentID, "subjectID": subjectID, "year_batch": year_batch, f"{month}.marked_dates": {"$ne": class_date}},
+                {
+                    "$inc": {f"{month}.total_classes": 1, f"{month}.attended_classes": int(present)},
+                    "$addToSet": {
+                        f"{month}.marked_dates": class_date,
+                        f"{month}.dates_of_absence": {"$each": [] if present else [class_date]},
+                    },
+                }
+            )
+            for studentID, present in marks
+        ]
+
+    async def mark_attendance(self, subjectID:str, year_batch:int, class_date:datetime, marks:List[Tuple[ObjectId, bool]], collection_name:str="student-monthly-performance-trackers") -> Optional[BulkWriteResult]:
+        """
+        Count a class for a whole roster in one unordered `bulk_write`, each update keyed on the
+        `(studentID, subjectID, year_batch)` index
+
+        Being unordered, a write error on one tracker does not stop the others: the result then
+        comes from the error's details, and its `writeErrors` list the indexes of the failed marks.
+
+        Returns:
+            Optional[BulkWriteResult]: the result, `matched_count` is the number of marks counted; None if the write failed
+        """
+        try:
+            return await self.db.bulk_write(
+                collection_name, self.attendance_updates(subjectID, year_batch, class_date, marks), ordered=False, raise_write_errors=True
+            )
+        except BulkWriteError as e:
+            return BulkWriteResult(e.details, acknowledged=True)
+
+    async def students_with_tracker(self, student_objIDs:List[ObjectId], subjectID:str, year_batch:int, collection_name:str="student-monthly-performance-trackers") -> Set[ObjectId]:
+        """Which of the students have a tracker for the subject and year batch"""
+        trackers = await self.db.find(
+            collection_name,
+            {"studentID": {"$in": student_objIDs}, "subjectID": subjectID, "year_batch": year_batch},
+            {"_id": 0, "studentID": 1}
+        )
+        return {tracker["studentID"] for tracker in trackers}
+
+    async def get_fee_type_configurations(self) -> FeeTypeConfigurations | None:
+        return await self.config_cache.get(FEE_TYPE_CONFIG, "fee_type")
     
-    def get_coaching_modes(self, mode_type:str, collection_name:str="coaching-mode-config") -> Dict[str, str] | None:
-        return self.db.find_one(collection_name, {"name":mode_type})
+    async def get_coaching_modes(self, mode_type:str) -> CoachingModes | None:
+        return await self.config_cache.get(COACHING_MODE_CONFIG, mode_type)
     
-    def add_installments(self, installments:List[Installments], collection_name:str="installments") -> List[ObjectId] | None:
+    async def add_installments(self, installments:List[Installments], collection_name:str="installments") -> List[ObjectId] | None:
         installments = [installment.model_dump(by_alias=True) for installment in installments]
-        return self.db.insert_many(collection_name, installments)
+        return await self.db.insert_many(collection_name, installments)
     
-    def save_teacher_profile(self, teacher:Teachers, collection_name:str="teachers"):
-        return self.db.insert(collection_name, teacher.model_dump(by_alias=True))
+    async def save_teacher_profile(self, teacher:Teachers, collection_name:str="teachers"):
+        return await self.db.insert(collection_name, teacher.model_dump(by_alias=True))
     
-    def map_teacher_subject(self, teacher_objID:ObjectId, subject_objIDs:List[ObjectId], collection_name:str="teacher-subjects") -> List[ObjectId] | None:
+    async def map_teacher_subject(self, teacher_objID:ObjectId, subject_objIDs:List[ObjectId], collection_name:str="teacher-subjects") -> List[ObjectId] | None:
         teacher_subject_mappings = [
             {
                 "teacherID":teacher_objID,
                 "subjectID":subject_objID
             } for subject_objID in subject_objIDs
         ]
-        return self.db.insert_many(collection_name, teacher_subject_mappings)
\ No newline at end of file
+        return await self.db.insert_many(collection_name, teacher_subject_mappings)
\ No newline at end of file
@@ -1,15 +1,32 @@
-from app.db.client import MongoDBClient
-from app.schemas.auth_schema import UserInDB, Auth
+from app.db.async_client import AsyncMongoDBClient
+from app.db.indexes import HotQuery
+from app.schemas.auth_schema import UserInDB, Auth, LoginCredentials
+from pymongo import IndexModel, ASCENDING, UpdateOne
 from datetime import datetime, timezone
+from typing import Dict, Optional
 
 # from app.utils.code_profiler import log_timeit
 
 class AuthRepository:
-    def __init__(self, db:MongoDBClient):
+    # The login lookup is a point read on the unique userID index; the projection keeps the
+    # reply down to the three fields login reads. Password hashes are kept out of index keys.
+    CREDENTIALS_PROJECTION = {"_id": 0, "userID": 1, "hashed_pswd": 1, "is_active": 1}
+
+    indexes = {
+        "auth": [
+            IndexModel([("userID", ASCENDING)], unique=True),
+        ],
+    }
+    hot_queries = [
+        HotQuery(name="auth.by_userID", collection="auth", filter={"userID": "sample-user"}),
+        HotQuery(name="auth.login_credentials", collection="auth", filter={"userID": "sample-user"}, projection=CREDENTIALS_PROJECTION),
+    ]
+
+    def __init__(self, db:AsyncMongoDBClient):
         self.db = db
     
     # @log_timeit("Find User by ID")
-    def get_user_by_id(self, user_id:str, collection_name:str) -> UserInDB | None:
+    async def get_user_by_id(self, user_id:str, collection_name:str) -> UserInDB | None:
         """
         Get a user by user_id from a given collection_name
 
@@ -20,11 +37,70 @@ class AuthRepository:
         Returns:
             UserInDB | None: The user if found, None otherwise
         """
-        user = self.db.find_one(collection_name, {"userID": user_id})
+        user = await self.db.find_one(collection_name, {"userID": user_id})
         return Auth(**user) if user else None
 
+    async def get_login_credentials(self, user_id:str, collection_name:str) -> LoginCredentials | None:
+        """
+        Lean lookup for the login path: one point read on the unique userID index returning
+        only userID, hashed_pswd and is_active, and the model is built without re-validation
+        since the document was written by our own onboarding code
+
+        Args:
+            user_id (str): User's id
+            collection_name (str): Name of the MongoDB collection to query
+
+        Returns:
+            LoginCredentials | None: The user's credentials if found, None otherwise
+        """
+        credentials = await self.db.find_one(collection_name, {"userID": user_id}, self.CREDENTIALS_PROJECTION)
+        return LoginCredentials.model_construct(**credentials) if credentials else None
+
+    async def is_user_active(self, user_id:str, collection_name:str) -> Optional[bool]:
+        """
+        Whether a user may still sign in
+
+        Args:
+            user_id (str): User's id
+            collection_name (str): Name of the MongoDB collection to query
+        Returns:
+            Optional[bool]: the user's is_active flag, None if the user does not exist
+        """
+        user = await self.db.find_one(collection_name, {"userID": user_id}, {"_id": 0, "is_active": 1})
+        return user.get("is_active", False) if user else None
+
+    async def set_user_active(self, user_id:str, is_active:bool, collection_name:str) -> bool:
+        """
+        Activate or deactivate a user
+
+        Args:
+            user_id (str): User's id
+            is_active (bool): the new is_active flag
+            collection_name (str): Name of the MongoDB collection to query
+        Returns:
+            bool: True if the user exists
+        """
+        return await self.db.find_one_and_update(collection_name, {"userID": user_id}, {"$set": {"is_active": is_active}}, projection={"_id": 1}) is not None
+
+    async def get_user_role(self, user_id:str, collection_name:str, roles_collection_name:str = "user-roles") -> Optional[str]:
+        """
+        Role of a user from `user-roles`, keyed by the user's auth ObjectID
+
+        Args:
+            user_id (str): User's id
+            collection_name (str): Name of the auth collection
+            roles_collection_name (str): Name of the roles collection
+        Returns:
+            Optional[str]: admin, teacher or developer; None for students and unknown users
+        """
+        user = await self.db.find_one(collection_name, {"userID": user_id}, {"_id": 1})
+        if not user:
+            return None
+        role = await self.db.find_one(roles_collection_name, {"_id": user["_id"]}, {"_id": 0, "role": 1})
+        return role["role"] if role else None
+
     # @log_timeit("Update User Last Login")
-    def update_user_last_login(self, user_id:str, collection_name:str):
+    async def update_user_last_login(self, user_id:str, collection_name:str):
         """
         Update the last_login field of a user in a given collection_name
 
@@ -34,4 +110,35 @@ class AuthRepository:
         Returns:
             None
         """
-        self.db.update(collection_name, {"userID": user_id}, {"last_login": datetime.now(timezone.utc)})
\ No newline at end of file
+        await self.db.update(collection_name, {"userID": user_id}, {"last_login": datetime.now(timezone.utc)})
+
+    async def update_user_password_hash(self, user_id:str, hashed_password:str, collection_name:str) -> bool:
+        """
+        Replace a user's password hash, used to upgrade hashes made with an outdated argon2 cost
+
+        Args:
+            user_id (str): User's id
+            hashed_password (str): The new hash
+            collection_name (str): Name of the MongoDB collection to query
+        Returns:
+            bool: True if the update went through
+        """
+        return await self.db.update(collection_name, {"userID": user_id}, {"hashed_pswd": hashed_password})
+
+    async def bulk_update_last_login(self, last_logins:Dict[str, datetime], collection_name:str) -> Optional[int]:
+        """
+        Write many users' last_login in one unordered bulk write. `$max` keeps the update
+        idempotent and never moves a timestamp backwards.
+
+        Args:
+            last_logins (Dict[str, datetime]): login time keyed by user's id
+            collection_name (str): Name of the MongoDB collection to query
+        Returns:
+            Optional[int]: number of users matched, None if the write failed
+        """
+        result = await self.db.bulk_write(
+            collection_name,
+            [UpdateOne({"userID": user_id}, {"$max": {"last_login": timestamp}}) for user_id, timestamp in last_logins.items()],
+            ordered=False
+        )
+        return result.matched_count if result is not None else None
@@ -1,37 +1,108 @@
-from app.db.client import MongoDBClient
+from app.db.async_client import AsyncMongoDBClient
+from app.db.indexes import IndexRegistry
+from app.db.config_cache import ConfigDocument
+from app.repositories.auth_repository import AuthRepository
+from app.repositories.admin_repository import AdminRepository
+from app.repositories.payment_repository import PaymentRepository
+from app.repositories.rate_limit_repository import RateLimitRepository
+from app.repositories.refresh_token_repository import RefreshTokenRepository
+from typing import Dict, List
+
+# Repositories whose `indexes` / `hot_queries` declarations make up the index registry
+# and whose `cached_configs` are preloaded into the config cache
+REGISTERED_REPOSITORIES = [AuthRepository, AdminRepository, PaymentRepository, RateLimitRepository, RefreshTokenRepository]
 
 class BaseRepository:
-    def __init__(self, db: MongoDBClient):
+    def __init__(self, db: AsyncMongoDBClient):
         self.db = db
+        self.index_registry = IndexRegistry.from_repositories(REGISTERED_REPOSITORIES)
     
-    def connect(self):
+    async def connect(self):
         """
         Connect to the MongoDB database
 
         Raises:
             ConnectionFailure: If the connection fails
         """
-        self.db.connect()
+        await self.db.connect()
     
-    def close(self):
+    async def close(self):
         """
         Close the MongoDB connection
 
         Returns:
             - None
         """
-        self.db.close()
+        await self.db.close()
     
-    def create_indexes(self):
+    def config_documents(self) -> List[ConfigDocument]:
         """
-        Create MongoDB indexes on the collection
+        Config collections served from the config cache, as declared by the registered repositories
 
-        Args:
-            - collection_name (str): Name of the MongoDB collection to create index on
-            - key (str): Name of the field on which to create the index
-            - unique (bool): Whether the index should be unique or not
+        Returns:
+            - List[ConfigDocument]: config collection declarations
+        """
+        return [document for repository in REGISTERED_REPOSITORIES for document in getattr(repository, "cached_configs", [])]
+
+    async def create_indexes(self) -> Dict[str, List[str]]:
+        """
+        Reconcile the indexes declared by every registered repository with the cluster.
+        Existing indexes are left as they are, so it is safe to run on every startup.
 
         Returns:
-            - None
+            - Dict[str, List[str]]: names of the ensured indexes per collection
+        """
+        return await self.index_registry.apply(self.db, self.db.logger)
+
+    async def index_report(self) -> Dict[str, Dict[str, List]]:
+        """
+        Report missing, unused (`$indexStats`) and undeclared indexes per collection
+
+        Returns:
+            - Dict[str, Dict[str, List]]: index report keyed by collection name
+        """
+        return await self.index_registry.report(self.db)
+
+    async def explain_hot_queries(self) -> Dict[str, List[str]]:
         """
-        self.db.create_index(collection_name="auth", key="userID", unique=True)
\ No newline at end of file
+        Explain every declared hot query
+
+        Returns:
+            - Dict[str, List[str]]: winning plan stages keyed by hot query name
+        """
+        return await self.index_registry.explain_hot_queries(self.db)
+
+    async def collection_scans(self) -> List[str]:
+        """
+        Hot queries whose winning plan falls back to a COLLSCAN
+
+        Returns:
+            - List[str]: names of the offending hot queries, empty when every plan is index-backed
+        """
+        return await self.index_registry.collection_scans(self.db)
+
+
+if __name__ == "__main__":
+    # Explain-based index check, exits with status 1 when a hot query plan falls back to COLLSCAN:
+    #   python -m app.repositories.base_repository
+    import asyncio
+    import sys
+    from app.config.settings import get_settings
+    from app.core.logger import get_logger
+
+    async def check_indexes() -> int:
+        base = BaseRepository(AsyncMongoDBClient(get_settings(), get_logger()))
+        await base.connect()
+        try:
+            await base.create_indexes()
+            print(await base.index_report())
+            scans = await base.collection_scans()
+        finally:
+            await base.close()
+        if scans:
+            print(f"COLLSCAN in hot queries: {', '.join(scans)}")
+            return 1
+        print("All hot queries are index-backed")
+        return 0
+
+    sys.exit(asyncio.run(check_indexes()))
@@ -1,12 +1,110 @@
-from app.db.client import MongoDBClient
+from app.db.async_client import AsyncMongoDBClient
+from app.db.config_cache import ConfigCache, ConfigDocument
+from app.repositories.admin_repository import FEE_TYPE_CONFIG
+from app.schemas.fee_schema import FeeConfigurations, DiscountConfigurations, FeeTypeConfigurations
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional
+
+COURSE_FEE_CONFIG = ConfigDocument(collection="course-fee-config", model=FeeConfigurations)
+DISCOUNT_CONFIG = ConfigDocument(collection="discount-config", model=DiscountConfigurations)
 
 
 class PaymentRepository:
-    def __init__(self, db: MongoDBClient):
+    cached_configs = [COURSE_FEE_CONFIG, DISCOUNT_CONFIG]
+
+    def __init__(self, db: AsyncMongoDBClient, config_cache: ConfigCache):
         self.db = db
+        self.config_cache = config_cache
 
-    def get_course_fees_config(self, collection_name:str='course-fee-config'):
-        return self.db.find_one(collection_name, {})    # return first record
+    async def get_course_fees_config(self) -> Optional[FeeConfigurations]:
+        return await self.config_cache.get(COURSE_FEE_CONFIG)    # first record, served from memory
     
-    def get_discount_config(self, collection_name:str='discount-config'):
-        return self.db.find_one(collection_name, {})    # return first record
\ No newline at end of file
+    async def get_discount_config(self) -> Optional[DiscountConfigurations]:
+        return await self.config_cache.get(DISCOUNT_CONFIG)    # first record, served from memory
+
+    async def get_fee_type_configurations(self) -> Optional[FeeTypeConfigurations]:
+        return await self.config_cache.get(FEE_TYPE_CONFIG, "fee_type")    # served from memory
+
+    async def outstanding_report_groups(self, grade:Optional[int] = None) -> List[Dict]:
+        """
+        The (grade, coaching mode) groups students are in, in report order. Read from the keys
+        of the `(grade, coaching_modeID, _id)` index alone; students whose coaching mode is not
+        configured form an `unknown` group of their grade.
+
+        Returns:
+            List[Dict]: `grade`, `coaching_modeID` and `coaching_mode` name of every group
+        """
+        pipeline = [
+            *([{"$match": {"grade": grade}}] if grade is not None else []),
+            {"$group": {"_id": {"grade": "$grade", "coaching_modeID": "$coaching_modeID"}}},
+            {"$lookup": {
+                "from": "coaching-mode-config",
+                "localField": "_id.coaching_modeID",
+                "foreignField": "_id",
+                "pipeline": [{"$project": {"_id": 0, "name": 1}}],
+                "as": "coaching_mode",
+            }},
+            {"$project": {
+                "_id": 0,
+                "grade": "$_id.grade",
+                "coaching_modeID": "$_id.coaching_modeID",
+                "coaching_mode": {"$ifNull": [{"$first": "$coaching_mode.name"}, "unknown"]},
+            }},
+        ]
+        groups = await self.db.aggregate("students", pipeline)
+        return sorted(groups, key=lambda group: (group["grade"], group["coaching_mode"]))
+
+    async def stream_outstanding_installments(self, due_before:datetime, batch_size:int, grade:Optional[int] = None) -> AsyncIterator[dict]:
+        """
+        Unpaid installments whose payment window ended before `due_before` and that still have
+        an amount outstanding, with the student's grade, name and coaching mode, ordered by
+        grade, coaching mode, student and installment number.
+
+        Every order in the report is served by an index, so nothing is sorted in memory and
+        arrears of any age are included: groups come from `outstanding_report_groups`, and one
+        aggregation per group walks its students on `(grade, coaching_modeID, _id)`, looking
+        up each student's overdue installments on `(studentID, installment_number)`. A report
+        costs one index walk over the students plus one index lookup per student; its first
+        rows go out as soon as the first group's first batch is read.
+
+        Args:
+            due_before (datetime): windows ending before this instant are overdue
+            batch_size (int): documents per cursor batch
+            grade (Optional[int]): only this grade
+
+        Returns:
+            AsyncIterator[dict]: the installments, one batch in memory at a time
+        """
+        for group in await self.outstanding_report_groups(grade):
+            pipeline = [
+                {"$match": {"grade": group["grade"], "coaching_modeID": group["coaching_modeID"]}},
+                {"$sort": {"_id": 1}},
+                {"$project": {"name": 1}},
+                {"$lookup": {
+                    "from": "installments",
+                    "localField": "_id",
+                    "foreignField": "studentID",
+                    "pipeline": [
+                        {"$match": {"payment_status": False, "payment_window.end_date": {"$lt": due_before}}},
+                        {"$set": {"outstanding": {"$subtract": ["$total_installment_amount_to_pay", {"$ifNull": ["$amount_paid", 0]}]}}},
+                        {"$match": {"outstanding": {"$gt": 0}}},
+                        {"$sort": {"installment_number": 1}},
+                    ],
+                    "as": "installment",
+                }},
+                {"$unwind": "$installment"},
+                {"$project": {
+                    "_id": 0,
+                    "grade": {"$literal": group["grade"]},
+                    "coaching_mode": {"$literal": group["coaching_mode"]},
+                    "studentID": "$_id",
+                    "student_name": "$name",
+                    "installment_number": "$installment.installment_number",
+                    "end_date": "$installment.payment_window.end_date",
+                    "total_installment_amount_to_pay": "$installment.total_installment_amount_to_pay",
+                    "amount_paid": {"$ifNull": ["$installment.amount_paid", 0]},
+                    "outstanding": "$installment.outstanding",
+                }},
+            ]
+            async for row in self.db.stream_aggregate("students", pipeline, batch_size=batch_size):
+                yield row
\ No newline at end of file
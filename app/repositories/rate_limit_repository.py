@@ -0,0 +1,52 @@
+from app.db.async_client import AsyncMongoDBClient
+from pymongo import IndexModel, ASCENDING
+from datetime import datetime, timedelta, timezone
+from time import time
+from typing import Tuple
+
+class RateLimitRepository:
+    """Token buckets shared by every worker, one document per throttled key"""
+    collection_name = "login-rate-limits"
+
+    indexes = {
+        # Buckets are deleted once they would have refilled completely, an absent bucket is a full one
+        "login-rate-limits": [IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0)],
+    }
+
+    def __init__(self, db:AsyncMongoDBClient):
+        self.db = db
+
+    async def consume(self, key:str, capacity:float, refill_per_second:float, cost:float = 1.0) -> Tuple[bool, float]:
+        """
+        Refill a bucket for the time elapsed since its last update and take `cost` tokens from
+        it, in one atomic pipeline update so concurrent workers never double spend
+
+        Args:
+            key (str): bucket key
+            capacity (float): burst size, a new bucket starts full
+            refill_per_second (float): tokens added back per second
+            cost (float): tokens taken by this attempt
+
+        Returns:
+            Tuple[bool, float]: whether the attempt is allowed, and the tokens left
+        """
+        now = time()
+        refilled = {"$min": [capacity, {"$add": [
+            {"$ifNull": ["$tokens", capacity]},
+            {"$multiply": [{"$max": [0, {"$subtract": [now, {"$ifNull": ["$updated_at", now]}]}]}, refill_per_second]},
+        ]}]}
+        bucket = await self.db.find_one_and_update(
+            self.collection_name,
+            {"_id": key},
+            [
+                {"$set": {"tokens": refilled, "updated_at": now}},
+                {"$set": {"allowed": {"$gte": ["$tokens", cost]}}},
+                {"$set": {
+                    "tokens": {"$cond": ["$allowed", {"$subtract": ["$tokens", cost]}, "$tokens"]},
+                    "expires_at": datetime.now(timezone.utc) + timedelta(seconds=capacity / refill_per_second),
+                }},
+            ],
+            projection={"_id": 0, "allowed": 1, "tokens": 1},
+            upsert=True
+        )
+        return bucket["allowed"], bucket["tokens"]
@@ -0,0 +1,77 @@
+from app.db.async_client import AsyncMongoDBClient
+from app.db.indexes import HotQuery
+from pymongo import IndexModel, ASCENDING
+from datetime import datetime, timezone
+from typing import Optional
+
+class RefreshTokenRepository:
+    """
+    Revocation store of refresh tokens. Only the token ids (`jti`) are stored, never the tokens:
+    one document per issued refresh token, grouped in a `family` per login so that reuse of a
+    rotated token can revoke the whole session.
+    """
+    collection_name = "refresh-tokens"
+
+    indexes = {
+        "refresh-tokens": [
+            # Tokens are worthless once expired, let the server delete them
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+            IndexModel([("family", ASCENDING)]),
+            IndexModel([("userID", ASCENDING)]),
+        ],
+    }
+    hot_queries = [
+        HotQuery(name="refresh-tokens.by_family", collection="refresh-tokens", filter={"family": "sample-family"}),
+    ]
+
+    def __init__(self, db:AsyncMongoDBClient):
+        self.db = db
+
+    async def add(self, jti:str, family:str, user_id:str, expires_at:datetime) -> bool:
+        """
+        Record a newly issued refresh token
+
+        Args:
+            jti (str): token id
+            family (str): id shared by every token rotated from the same login
+            user_id (str): the token's subject
+            expires_at (datetime): the token's expiry
+
+        Returns:
+            bool: True if the token was recorded
+        """
+        return await self.db.insert(self.collection_name, {
+            "_id": jti,
+            "family": family,
+            "userID": user_id,
+            "issued_at": datetime.now(timezone.utc),
+            "expires_at": expires_at,
+            "revoked": False,
+        }) is not None
+
+    async def rotate(self, jti:str, replaced_by:str) -> bool:
+        """
+        Atomically retire a live refresh token in favour of its successor; of two concurrent
+        refreshes with the same token only one succeeds
+
+        Returns:
+            bool: True if the token was live and is now retired
+        """
+        retired = await self.db.find_one_and_update(
+            self.collection_name,
+            {"_id": jti, "revoked": False},
+            {"$set": {"revoked": True, "replaced_by": replaced_by, "used_at": datetime.now(timezone.utc)}},
+            projection={"_id": 1}
+        )
+        return retired is not None
+
+    async def get(self, jti:str) -> Optional[dict]:
+        return await self.db.find_one(self.collection_name, {"_id": jti}, {"family": 1, "revoked": 1})
+
+    async def revoke_family(self, family:str) -> Optional[int]:
+        """Revoke every token of a login session"""
+        return await self.db.update_many(self.collection_name, {"family": family, "revoked": False}, {"revoked": True})
+
+    async def revoke_user(self, user_id:str) -> Optional[int]:
+        """Revoke every refresh token of a user, e.g. after deactivation"""
+        return await self.db.update_many(self.collection_name, {"userID": user_id, "revoked": False}, {"revoked": True})
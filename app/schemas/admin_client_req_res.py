@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, EmailStr
-from typing import Optional, List, Dict
+from typing import Any, Optional, List, Dict
 from datetime import date
 from .base import *
 from .common import GenderModel
@@ -83,7 +83,7 @@ class AddNewStudentRequest(BaseModel):
     userPassword:str
     studentProfile:Student
     selectedSubjects:List[str]
-    installments:List[Installments]
+    installments:Optional[List[Installments]] = None    # generated from the fee table when omitted
 
 class CalculateCourseFeeRequest(BaseModel):
     grade:int
@@ -99,6 +99,27 @@ class AddNewTeacherRequest(BaseModel):
     teacherProfile:TeacherProfile
     teachingSubjects:Dict[int, List[str]]
 
+class StudentListFilters(BaseModel):
+    grade:Optional[int] = None
+    coaching_mode:Optional[CoachingModes] = None
+    fee_type:Optional[FeeTypes] = None
+    date_joined_from:Optional[date] = None    # inclusive
+    date_joined_to:Optional[date] = None      # inclusive
+
+class TeacherListFilters(BaseModel):
+    date_joined_from:Optional[date] = None    # inclusive
+    date_joined_to:Optional[date] = None      # inclusive
+
+class AttendanceMark(BaseModel):
+    studentID:str
+    present:bool
+
+class MarkAttendanceRequest(BaseModel):
+    subjectID:str                              # ex: MATH009
+    year_batch:int
+    class_date:date
+    marks:List[AttendanceMark] = Field(..., min_length=1)
+
 # *************************** Response Models Main ***************************
 
 class CalculateCourseFeeResponse(BaseModel):
@@ -109,3 +130,51 @@ class CalculateCourseFeeResponse(BaseModel):
     total_fee:float
     final_fee:float
 
+class CourseFeeQuoteError(BaseModel):
+    row:int
+    error:str
+
+class CourseFeeQuoteBatchResponse(BaseModel):
+    version:str                                # fee config version the quotes were computed with
+    count:int
+    failed:int
+    columns:Dict[str, List[Optional[float]]]   # one list per quote field, index = request row
+    errors:List[CourseFeeQuoteError]
+
+class StudentInstallmentSchedule(BaseModel):
+    row:int
+    fee_typeID:str
+    final_fee:float
+    installments:List[Installments]
+
+class InstallmentScheduleBatchResponse(BaseModel):
+    version:str                                # fee config version the schedules were computed with
+    count:int
+    failed:int
+    schedules:List[StudentInstallmentSchedule]
+    errors:List[CourseFeeQuoteError]
+
+class ListPageResponse(BaseModel):
+    items:List[Dict[str, Any]]
+    count:int
+    next_cursor:Optional[str] = None           # pass back as `cursor` for the next page, None on the last page
+
+class MarkAttendanceResponse(BaseModel):
+    received:int
+    marked:int
+    already_marked:int                         # marks skipped because the date was already counted
+    not_enrolled:List[str]                     # studentIDs without a tracker for the subject and year batch
+    failed:List[str] = []                      # studentIDs whose tracker update was rejected by the server
+
+class BulkImportRowResult(BaseModel):
+    row:int
+    userID:Optional[str] = None
+    status:str                                 # created, failed
+    error:Optional[str] = None
+    retryable:bool = False                     # failed for a transient reason, the same row can be uploaded again
+
+class BulkImportResponse(BaseModel):
+    received:int
+    created:int
+    failed:int
+    results:List[BulkImportRowResult]
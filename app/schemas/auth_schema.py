@@ -6,6 +6,10 @@ from typing import Optional
 class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
+    refresh_token: Optional[str] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 class LoginRequest(BaseModel):
     user_id: str
@@ -22,4 +26,10 @@ class Auth(BaseModelWithConfig):
     userID:str
     hashed_pswd:str
     is_active:bool
-    last_login:datetime
\ No newline at end of file
+    last_login:datetime
+
+class LoginCredentials(BaseModel):
+    """The fields the login path reads, projected from the auth document"""
+    userID:str
+    hashed_pswd:str
+    is_active:bool
@@ -43,6 +43,7 @@ class AttendanceModel(BaseModel):
     total_classes:int
     attended_classes:int
     dates_of_absence:List[date]
+    marked_dates:List[date] = Field(default_factory=list)   # class dates already counted, re-submitted marks are ignored
 
 class RemarksModel(BaseModel):
     teacherID:PyObjectId = Field(..., alias="teacherID")
@@ -38,6 +38,7 @@ class FeeConfigurations(BaseModelWithConfig):
     id: str = Field(default_factory="course_fee", alias="_id")
     fees: Dict[str, FeeStructureModel]
     subject_preference_fee: Dict[str, int]
+    course_end_dates: Optional[Dict[str, datetime]] = None   # grade -> last day of the course
 
 class DiscountConfigurations(BaseModelWithConfig):
     id: str = Field(default_factory="discount", alias="_id")
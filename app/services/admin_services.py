@@ -1,21 +1,57 @@
 # Imports
 from fastapi import HTTPException, status
 from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
 from app.repositories.admin_repository import AdminRepository
 from app.utils.timeFormat import get_utc_timestamp
 from app.core.security import Security
+from app.config.settings import Settings
+from app.utils.bulkImport import ParsedRow
+from pydantic import ValidationError
+from pymongo.errors import DuplicateKeyError
 from logging import Logger
-from typing import Union, List, Dict
+from typing import AsyncIterator, Optional, Union, List, Dict, Tuple
 from bson import ObjectId
+from datetime import datetime, time, timedelta
+import asyncio
 
 from app.schemas.auth_schema import Auth
 from app.schemas.admin_client_req_res import AddNewStudentRequest, Student as StudentProfile, Installments as ClientSentInstallments
+from app.schemas.admin_client_req_res import CalculateCourseFeeRequest, PaymentType, CoachingModes, Modes
 from app.schemas.admin_client_req_res import AddNewTeacherRequest, TeacherProfile
+from app.schemas.admin_client_req_res import BulkImportResponse, BulkImportRowResult
+from app.schemas.admin_client_req_res import StudentListFilters, TeacherListFilters, ListPageResponse
+from app.schemas.admin_client_req_res import MarkAttendanceRequest, MarkAttendanceResponse
 from app.schemas.student_schema import Students
 from app.schemas.teacher_scherma import Teachers
 from app.schemas.common import Subjects, MonthlyPerformanceTracker, UserRoles, Roles
 from app.schemas.fee_schema import FeeTypeConfigurations, Installments
 from app.exceptions.adminExceptions import *
+from app.exceptions.paymentExceptions import FailedToGetCourseFeeConfig, FailedToGetDiscountConfig
+from app.exceptions.authExceptions import HashingPoolSaturated
+from app.services.fee_table import FeeTableProvider
+from app.services.installment_schedule import InstallmentScheduler
+from app.services.student_profile_cache import StudentProfileCache, PROFILE_SECTIONS
+from app.utils.pagination import decode_cursor, encode_cursor, keyset_query, keyset_sort
+
+# Fields list views may ask for, and the ones they get by default
+STUDENT_LIST_FIELDS = {
+    "name", "email", "contact_number", "address", "gender", "guardian_parent_name", "dob", "grade",
+    "school_name", "coaching_modeID", "fee_typeID", "prev_year_results", "date_joined",
+}
+STUDENT_LIST_DEFAULT_FIELDS = ("name", "grade", "school_name", "coaching_modeID", "fee_typeID", "date_joined")
+TEACHER_LIST_FIELDS = {
+    "name", "email", "contact_number", "address", "teaching_experience", "qualifications", "achievements", "date_joined",
+}
+TEACHER_LIST_DEFAULT_FIELDS = ("name", "email", "contact_number", "teaching_experience", "date_joined")
+
+# Coaching mode a student is billed at: the fee config only prices online and offline classes,
+# one-on-one tuition is taught in person and billed like offline
+COACHING_MODE_FEE_MODES = {
+    CoachingModes.ONLINE: Modes.ONLINE,
+    CoachingModes.OFFLINE: Modes.OFFLINE,
+    CoachingModes.PERSONALISED_ONE_ON_ONE: Modes.OFFLINE,
+}
 
 class StudentUtilities:
     def __init__(self, repo:AdminRepository, security:Security) -> None:
@@ -31,44 +67,37 @@ class StudentUtilities:
     def get_fee_id(self, payment_type:str) -> str:
         return self.fee_types[payment_type]
 
-    def get_coaching_mode_id(self, mode:str) -> ObjectId:
-        coching_mode_config = self.repo.get_coaching_modes(mode_type=mode)
-        return coching_mode_config["_id"]
+    async def get_coaching_mode_id(self, mode:str) -> ObjectId:
+        coching_mode_config = await self.repo.get_coaching_modes(mode_type=mode)
+        return coching_mode_config.id
 
-    def save_student(self, studentProfile:StudentProfile, student_objID:ObjectId, coaching_mode:str, fee_typeID:str) -> ObjectId:
-        studentDB = Students(
+    async def get_fee_type_configurations(self) -> FeeTypeConfigurations:
+        fee_configurations = await self.repo.get_fee_type_configurations()
+        if not fee_configurations:
+            raise FailedToAddInstallments("Failed to fetch fee configurations")
+        return fee_configurations
+
+    def build_student(self, studentProfile:StudentProfile, student_objID:ObjectId, coaching_mode:ObjectId, fee_typeID:str) -> Students:
+        return Students(
             **studentProfile.model_dump(exclude={"coaching_mode", "fee_type"}),
             id=student_objID,
             coaching_modeID=coaching_mode,
             fee_typeID=fee_typeID
         )
-        student_id = self.repo.save_student_profile(student=studentDB)
-        if student_id is None:
-            raise FailedToCreateNewStudent("Failed to create new student")
-        return student_id
-
-    def map_student_subject(self, student_objID:ObjectId, subject_objIDs:List[ObjectId]):
-        inserted_ids = self.repo.add_mapped_student_subject(student_objID=student_objID, subject_objIDs=subject_objIDs)
-        if not inserted_ids:
+
+    def build_subject_mappings(self, student_objID:ObjectId, subject_objIDs:List[ObjectId]) -> List[Dict]:
+        if not subject_objIDs:
             raise FailedToMapStudentSubjects("Failed to map student subjects")
-        return inserted_ids
+        return [{"studentID": student_objID, "subjectID": subject_objID} for subject_objID in subject_objIDs]
 
-    def map_student_monthly_performance_tracker(self, student_objID:ObjectId, grade:int, subject_objIDs:List[ObjectId], year_batch:int):
-        trackers = [
+    def build_monthly_performance_trackers(self, student_objID:ObjectId, grade:int, subject_objIDs:List[ObjectId], year_batch:int) -> List[MonthlyPerformanceTracker]:
+        return [
             MonthlyPerformanceTracker(studentID=student_objID, grade=grade, subjectID=subject_objID, year_batch=year_batch)
             for subject_objID in subject_objIDs
         ]
-        inserted_ids = self.repo.add_mapped_student_monthly_performance_tracker(performance_trackers=trackers)
-        if not inserted_ids:
-            raise FailedToAddPerformanceTracker("Failed to map student performance tracker")
-        return inserted_ids
 
-    def add_installments(self, student_objID:ObjectId, student_installments:List[ClientSentInstallments], fee_typeID:str):
-        fee_configurations = self.repo.get_fee_type_configurations()
-        if not fee_configurations:
-            raise FailedToAddInstallments("Failed to fetch fee configurations")
-
-        num_of_installments = fee_configurations["types"][fee_typeID]["installments"]
+    def build_installments(self, student_objID:ObjectId, student_installments:List[ClientSentInstallments], fee_typeID:str, fee_configurations:FeeTypeConfigurations) -> List[Installments]:
+        num_of_installments = fee_configurations.types[fee_typeID].installments
         installments = []
         for installment in student_installments:
             if installment.installment_number > num_of_installments:
@@ -87,59 +116,129 @@ class StudentUtilities:
                     payment_status=installment.payment_status
                 )
             )
-
-        installments_objIDs = self.repo.add_installments(installments=installments)
-        if not installments_objIDs:
-            raise FailedToAddInstallments("Failed to add installments, Database Error")
-        return installments_objIDs
+        return installments
+
+    def build_fee_request(self, student:AddNewStudentRequest) -> CalculateCourseFeeRequest:
+        """The fee quote inputs of an already validated onboarding request"""
+        profile = student.studentProfile
+        return CalculateCourseFeeRequest(
+            grade=profile.grade,
+            date_joined=datetime.combine(profile.date_joined, time.min),
+            prev_year_results=profile.prev_year_results,
+            selectedSubjects=student.selectedSubjects,
+            payment_type=PaymentType(profile.fee_type.value.replace("-", "_")),
+            coaching_mode=COACHING_MODE_FEE_MODES[profile.coaching_mode]
+        )
   
-    def get_subjects_by_grade(self, grade:int, preferred_subjects:List[str]) -> List  [ObjectId]:    
-        subjects = self.repo.get_preferred_subjects(grade_subjects={grade: preferred_subjects})
+    async def get_subjects_by_grade(self, grade:int, preferred_subjects:List[str]) -> List  [ObjectId]:    
+        subjects = await self.repo.get_preferred_subjects(grade_subjects={grade: preferred_subjects})
 
         if not subjects:
-            raise FailedToGetPreferredSubjects("Failed to get preferred subjects for teacher")
+            raise FailedToGetPreferredSubjects("Failed to get preferred subjects for student")
         return [subject["_id"] for subject in subjects]
 
+    def build_onboarding_documents(self, student:AddNewStudentRequest, user:Auth, coaching_modeID:ObjectId, subject_ids:List[ObjectId], fee_configurations:FeeTypeConfigurations, installments:List[ClientSentInstallments]) -> Dict[str, List[dict]]:
+        """
+        Build every document a new student needs, keyed by collection name
+
+        Args:
+            student (AddNewStudentRequest): the validated onboarding request
+            user (Auth): the student's auth document, its `_id` is the student's ObjectID
+            coaching_modeID (ObjectId): resolved coaching mode
+            subject_ids (List[ObjectId]): resolved subjects
+            fee_configurations (FeeTypeConfigurations): fee type configuration
+            installments (List[ClientSentInstallments]): client-sent or generated installment schedule
+
+        Returns:
+            Dict[str, List[dict]]: auth, profile, subject mappings, trackers and installments
+        """
+        fee_typeID = self.get_fee_id(student.studentProfile.fee_type)
+        student_objID = user.id
+        studentDB = self.build_student(
+            studentProfile=student.studentProfile,
+            student_objID=student_objID,
+            coaching_mode=coaching_modeID,
+            fee_typeID=fee_typeID
+        )
+        trackers = self.build_monthly_performance_trackers(
+            student_objID=student_objID,
+            grade=student.studentProfile.grade,
+            subject_objIDs=subject_ids,
+            year_batch=student.studentProfile.date_joined.year
+        )
+        installments = self.build_installments(
+            student_objID=student_objID,
+            student_installments=installments,
+            fee_typeID=fee_typeID,
+            fee_configurations=fee_configurations
+        )
+        return {
+            "auth": [user.model_dump(by_alias=True)],
+            "students": [studentDB.model_dump(by_alias=True)],
+            "student-subjects": self.build_subject_mappings(student_objID=student_objID, subject_objIDs=subject_ids),
+            "student-monthly-performance-trackers": [tracker.model_dump(by_alias=True) for tracker in trackers],
+            "installments": [installment.model_dump(by_alias=True) for installment in installments],
+        }
+
 
 class TeacherUtilities:
     def __init__(self, repo:AdminRepository, security:Security) -> None:
         self.repo = repo
         self.security = security
 
-    def add_teacher_role(self, teacher_objID:ObjectId):
-        # Add New Teacher Role
-        user_role = UserRoles(
+    def build_teacher_role(self, teacher_objID:ObjectId) -> UserRoles:
+        return UserRoles(
             id=teacher_objID,
             role=Roles.TEACHER
         )
-        _ = self.repo.create_new_roles(user=user_role)
-
-        if _ is None:
-            raise FailedToAddTeacherRole("Failed to add teacher role")
     
-    def create_teacher_profile(self, teacher:TeacherProfile, teacher_objID:ObjectId):
-        teacherDB = Teachers(
+    def build_teacher_profile(self, teacher:TeacherProfile, teacher_objID:ObjectId) -> Teachers:
+        return Teachers(
             **teacher.model_dump(),
             id=teacher_objID
         )
-        teacher_id = self.repo.save_teacher_profile(teacher=teacherDB)
-        if teacher_id is None:
-            raise FailedToCreateNewTeacherProfile("Failed to create new teacher profile")
-        return teacher_id
-
-    def map_teacher_subject(self, teacher_objID:ObjectId, subject_objIDs:List[ObjectId]):
-        inserted_ids = self.repo.map_teacher_subject(teacher_objID=teacher_objID, subject_objIDs=subject_objIDs)
-        if not inserted_ids:
+
+    def build_subject_mappings(self, teacher_objID:ObjectId, subject_objIDs:List[ObjectId]) -> List[Dict]:
+        if not subject_objIDs:
             raise FailedToMapTeacherSubjects("Failed to map teacher subjects")
-        return inserted_ids
+        return [{"teacherID": teacher_objID, "subjectID": subject_objID} for subject_objID in subject_objIDs]
 
-    def get_subjects_by_grade(self, grade_subjects:Dict[int, List[str]]):
-        subjects = self.repo.get_preferred_subjects(grade_subjects=grade_subjects)
+    async def get_subjects_by_grade(self, grade_subjects:Dict[int, List[str]]):
+        subjects = await self.repo.get_preferred_subjects(grade_subjects=grade_subjects)
 
         if not subjects:
             raise FailedToGetPreferredSubjects("Failed to get preferred subjects for teacher")
         return [subject["_id"] for subject in subjects]
 
+    def resolve_subject_ids(self, teaching_subjects:Dict[int, List[str]], subject_ids:Dict[Tuple[int, str], ObjectId]) -> List[ObjectId]:
+        """Pick a teacher's subjects out of a batch-wide (grade, name) -> ObjectID lookup"""
+        return [
+            subject_ids[(grade, name)]
+            for grade, names in teaching_subjects.items()
+            for name in dict.fromkeys(names)
+            if (grade, name) in subject_ids
+        ]
+
+    def build_onboarding_documents(self, teacher:AddNewTeacherRequest, user:Auth, subject_ids:List[ObjectId]) -> Dict[str, List[dict]]:
+        """
+        Build every document a new teacher needs, keyed by collection name
+
+        Args:
+            teacher (AddNewTeacherRequest): the validated onboarding request
+            user (Auth): the teacher's auth document, its `_id` is the teacher's ObjectID
+            subject_ids (List[ObjectId]): resolved teaching subjects
+
+        Returns:
+            Dict[str, List[dict]]: auth, role, profile and subject mappings
+        """
+        teacher_objID = user.id
+        return {
+            "auth": [user.model_dump(by_alias=True)],
+            "user-roles": [self.build_teacher_role(teacher_objID=teacher_objID).model_dump(by_alias=True)],
+            "teachers": [self.build_teacher_profile(teacher=teacher.teacherProfile, teacher_objID=teacher_objID).model_dump(by_alias=True)],
+            "teacher-subjects": self.build_subject_mappings(teacher_objID=teacher_objID, subject_objIDs=subject_ids),
+        }
+
 # class AdminService:
 #     def __init__(self, AuthRepository:AdminRepository, security:Security, logger:Logger) -> None:
 #         self.logger = logger
@@ -350,50 +449,64 @@ class TeacherUtilities:
 
 
 class AdminService:
-    def __init__(self, AuthRepository:AdminRepository, security:Security, logger:Logger) -> None:
+    def __init__(self, AuthRepository:AdminRepository, security:Security, logger:Logger, settings:Settings, fee_tables:FeeTableProvider, scheduler:InstallmentScheduler, profile_cache:StudentProfileCache) -> None:
         self.logger = logger
         self.repo = AuthRepository
         self.security = security
+        self.fee_tables = fee_tables
+        self.scheduler = scheduler
+        self.profile_cache = profile_cache
+        self.bulk_import_chunk_size = settings.bulk_import_chunk_size
+        self.attendance_max_marks = settings.attendance_max_marks
         self.student_utils = StudentUtilities(self.repo, self.security)
         self.teacher_utils = TeacherUtilities(self.repo, self.security)
 
-    def add_student(self, student:AddNewStudentRequest) -> Union[JSONResponse, HTTPException]:
-        try:
-            student_objID = self.add_new_user_auth(
-                user_id=student.userID,
-                user_password=student.userPassword,
-                is_active=True
-            )
+    async def add_student(self, student:AddNewStudentRequest) -> Union[JSONResponse, HTTPException]:
+        """
+        Onboard a student in two phases so it costs as few round trips as possible:
+        1. resolve every reference (userID availability, coaching mode, subjects, fee types) concurrently
+        2. write auth, profile, subject mappings, trackers and installments in one transaction
 
-            fee_typeID = self.student_utils.get_fee_id(student.studentProfile.fee_type)
-            coaching_modeID = self.student_utils.get_coaching_mode_id(student.studentProfile.coaching_mode)
-
-            self.student_utils.save_student(
-                studentProfile=student.studentProfile,
-                student_objID=student_objID,
-                coaching_mode=coaching_modeID,
-                fee_typeID=fee_typeID
-            )
-
-            subjects_ids = self.student_utils.get_subjects_by_grade(
-                grade=student.studentProfile.grade,
-                preferred_subjects=student.selectedSubjects
+        The password is hashed only once every check has passed, so a rejected request never
+        takes a slot of the hashing pool
+        """
+        try:
+            user_exists, coaching_modeID, subjects_ids, fee_configurations = await asyncio.gather(
+                self.repo.user_id_exists(user_id=student.userID),
+                self.student_utils.get_coaching_mode_id(student.studentProfile.coaching_mode),
+                self.student_utils.get_subjects_by_grade(
+                    grade=student.studentProfile.grade,
+                    preferred_subjects=student.selectedSubjects
+                ),
+                self.student_utils.get_fee_type_configurations()
             )
+            if user_exists:
+                raise UserIDAlreadyExists(f"UserID {student.userID} already exists")
 
-            self.student_utils.map_student_subject(student_objID=student_objID, subject_objIDs=subjects_ids)
+            installments = (await self.resolve_installments([student]))[0]
+            if isinstance(installments, FailedToAddInstallments):
+                raise installments
 
-            self.student_utils.map_student_monthly_performance_tracker(
-                student_objID=student_objID,
-                grade=student.studentProfile.grade,
-                subject_objIDs=subjects_ids,
-                year_batch=student.studentProfile.date_joined.year
-            )
-
-            self.student_utils.add_installments(
-                student_objID=student_objID,
-                student_installments=student.installments,
-                fee_typeID=fee_typeID
+            user = self.build_new_user_auth(
+                user_id=student.userID,
+                hashed_password=await self.security.hash_password_async(student.userPassword),
+                is_active=True
             )
+            try:
+                committed = await self.repo.insert_onboarding_documents(
+                    self.student_utils.build_onboarding_documents(
+                        student=student,
+                        user=user,
+                        coaching_modeID=coaching_modeID,
+                        subject_ids=subjects_ids,
+                        fee_configurations=fee_configurations,
+                        installments=installments
+                    )
+                )
+            except DuplicateKeyError:
+                raise UserIDAlreadyExists(f"UserID {student.userID} already exists")
+            if not committed:
+                raise FailedToOnboardStudent("Failed to create new student, no changes were saved")
 
             return JSONResponse(
                 status_code=status.HTTP_201_CREATED,
@@ -404,21 +517,21 @@ class AdminService:
                 }
             )
 
-        except FailedToCreateNewUserAuth as e:
+        except UserIDAlreadyExists as e:
             self.logger.error(e)
             raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                status_code=status.HTTP_409_CONFLICT,
                 detail=str(e)
             )
 
-        except FailedToCreateNewStudent as e:
+        except FailedToOnboardStudent as e:
             self.logger.error(e)
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
                 detail=str(e)
             )
         
-        except InvalidGrade as e:
+        except (InvalidGrade, FailedToGetPreferredSubjects) as e:
             self.logger.error(e)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -428,41 +541,44 @@ class AdminService:
         except FailedToMapStudentSubjects as e:
             self.logger.error(e)
             raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail=str(e)
-            )
-        
-        except FailedToAddPerformanceTracker as e:
-            self.logger.error(e)
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                status_code=status.HTTP_400_BAD_REQUEST,
                 detail=str(e)
             )
     
         except FailedToAddInstallments as e:
             self.logger.error(e)
             raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                status_code=status.HTTP_400_BAD_REQUEST,
                 detail=str(e)
             )
 
-    def add_teacher(self, teacher:AddNewTeacherRequest) -> Union[JSONResponse, HTTPException]:
-
+    async def add_teacher(self, teacher:AddNewTeacherRequest) -> Union[JSONResponse, HTTPException]:
+        """
+        Onboard a teacher: resolve userID availability and subjects concurrently, then write
+        auth, role, profile and subject mappings in one transaction. The password is hashed
+        once the userID and subjects check out
+        """
         try:
-            # Create New Teacher Auth
-            teacher_objID = self.add_new_user_auth(
-                user_id=teacher.userID,
-                user_password=teacher.userPassword,
-                is_active=True
+            user_exists, subject_ids = await asyncio.gather(
+                self.repo.user_id_exists(user_id=teacher.userID),
+                self.teacher_utils.get_subjects_by_grade(teacher.teachingSubjects)
             )
+            if user_exists:
+                raise UserIDAlreadyExists(f"UserID {teacher.userID} already exists")
 
-            self.teacher_utils.add_teacher_role(teacher_objID=teacher_objID)
-            self.teacher_utils.create_teacher_profile(
-                teacher=teacher.teacherProfile,
-                teacher_objID=teacher_objID
+            user = self.build_new_user_auth(
+                user_id=teacher.userID,
+                hashed_password=await self.security.hash_password_async(teacher.userPassword),
+                is_active=True
             )
-            subject_ids = self.teacher_utils.get_subjects_by_grade(teacher.teachingSubjects)
-            self.teacher_utils.map_teacher_subject(teacher_objID=teacher_objID, subject_objIDs=subject_ids)
+            try:
+                committed = await self.repo.insert_onboarding_documents(
+                    self.teacher_utils.build_onboarding_documents(teacher=teacher, user=user, subject_ids=subject_ids)
+                )
+            except DuplicateKeyError:
+                raise UserIDAlreadyExists(f"UserID {teacher.userID} already exists")
+            if not committed:
+                raise FailedToOnboardTeacher("Failed to create new teacher, no changes were saved")
 
             return JSONResponse(
                 status_code=status.HTTP_201_CREATED,
@@ -473,39 +589,582 @@ class AdminService:
                 }
             )
 
-        except FailedToCreateNewUserAuth as e:
+        except UserIDAlreadyExists as e:
             self.logger.error(e)
             raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                status_code=status.HTTP_409_CONFLICT,
                 detail=str(e)
             )
 
-        except FailedToCreateNewTeacherProfile as e:
+        except FailedToOnboardTeacher as e:
             self.logger.error(e)
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
                 detail=str(e)
             )
 
-        except FailedToMapTeacherSubjects as e:
+        except (FailedToGetPreferredSubjects, FailedToMapTeacherSubjects) as e:
             self.logger.error(e)
             raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                status_code=status.HTTP_400_BAD_REQUEST,
                 detail=str(e)
             )
     
-    def add_new_user_auth(self, user_id:str, user_password:str, is_active:bool=True) -> ObjectId:
-        hashed_password = self.security.hash_password(user_password)
+    async def bulk_import_students(self, rows:AsyncIterator[ParsedRow]) -> BulkImportResponse:
+        """
+        Onboard students from a streamed upload. Rows are validated as they arrive and
+        onboarded in chunks of `bulk_import_chunk_size`: one query resolves the taken userIDs
+        and one the subjects of the whole chunk, passwords are hashed in parallel and every
+        document of the chunk is written in one transaction.
+        A bad row is reported and skipped, it never aborts the rest of the upload. When the
+        password hashing queue is saturated by logins, the rows of that chunk are reported as
+        failed and `retryable` instead.
+
+        Args:
+            rows (AsyncIterator[ParsedRow]): parsed rows of the upload, see app.utils.bulkImport
+
+        Returns:
+            BulkImportResponse: per-row results in upload order
+        """
+        results: List[BulkImportRowResult] = []
+        chunk: List[Tuple[int, AddNewStudentRequest]] = []
+        seen_user_ids = set()
+
+        async for row_number, row in rows:
+            if isinstance(row, ValueError):
+                results.append(BulkImportRowResult(row=row_number, status="failed", error=str(row)))
+                continue
+            try:
+                student = AddNewStudentRequest.model_validate(row)
+            except ValidationError as e:
+                user_id = row.get("userID")
+                results.append(BulkImportRowResult(
+                    row=row_number,
+                    userID=user_id if isinstance(user_id, str) else None,
+                    status="failed",
+                    error="; ".join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors())
+                ))
+                continue
+            if student.userID in seen_user_ids:
+                results.append(BulkImportRowResult(row=row_number, userID=student.userID, status="failed", error="Duplicate userID in upload"))
+                continue
+
+            seen_user_ids.add(student.userID)
+            chunk.append((row_number, student))
+            if len(chunk) >= self.bulk_import_chunk_size:
+                results.extend(await self.import_student_chunk(chunk))
+                chunk = []
+
+        if chunk:
+            results.extend(await self.import_student_chunk(chunk))
+
+        results.sort(key=lambda result: result.row)
+        created = sum(result.status == "created" for result in results)
+        self.logger.info(f"Bulk import: {created} of {len(results)} students onboarded")
+        return BulkImportResponse(
+            received=len(results),
+            created=created,
+            failed=len(results) - created,
+            results=results
+        )
+
+    async def import_student_chunk(self, chunk:List[Tuple[int, AddNewStudentRequest]]) -> List[BulkImportRowResult]:
+        """Onboard one chunk of validated rows with a constant number of round trips"""
+        grade_subjects: Dict[int, set] = {}
+        for _, student in chunk:
+            grade_subjects.setdefault(student.studentProfile.grade, set()).update(student.selectedSubjects)
+
+        try:
+            taken_user_ids, subjects, fee_configurations = await asyncio.gather(
+                self.repo.existing_user_ids([student.userID for _, student in chunk]),
+                self.repo.get_preferred_subjects(grade_subjects={grade: sorted(names) for grade, names in grade_subjects.items()}),
+                self.student_utils.get_fee_type_configurations()
+            )
+        except FailedToAddInstallments as e:
+            self.logger.error(e)
+            return [BulkImportRowResult(row=row_number, userID=student.userID, status="failed", error=str(e)) for row_number, student in chunk]
+        subject_ids = {(subject["grade"], subject["name"]): subject["_id"] for subject in subjects or []}
+
+        results: List[BulkImportRowResult] = []
+        pending = []
+        for row_number, student in chunk:
+            if student.userID in taken_user_ids:
+                results.append(BulkImportRowResult(row=row_number, userID=student.userID, status="failed", error=f"UserID {student.userID} already exists"))
+            else:
+                pending.append((row_number, student))
+
+        schedules = await self.resolve_installments([student for _, student in pending])
+
+        # Every check runs before hashing, so only rows that will be written cost a password hash;
+        # the auth document gets its hash once the whole chunk is hashed
+        ready: List[Tuple[int, AddNewStudentRequest, Dict[str, List[dict]]]] = []
+        for (row_number, student), installments in zip(pending, schedules):
+            try:
+                if isinstance(installments, FailedToAddInstallments):
+                    raise installments
+                grade = student.studentProfile.grade
+                student_subject_ids = [
+                    subject_ids[(grade, name)] for name in dict.fromkeys(student.selectedSubjects) if (grade, name) in subject_ids
+                ]
+                if not student_subject_ids:
+                    raise FailedToGetPreferredSubjects("Failed to get preferred subjects for student")
+
+                student_documents = self.student_utils.build_onboarding_documents(
+                    student=student,
+                    user=self.build_new_user_auth(user_id=student.userID, hashed_password="", is_active=True),
+                    coaching_modeID=await self.student_utils.get_coaching_mode_id(student.studentProfile.coaching_mode),
+                    subject_ids=student_subject_ids,
+                    fee_configurations=fee_configurations,
+                    installments=installments
+                )
+            except (InvalidGrade, FailedToGetPreferredSubjects, FailedToMapStudentSubjects, FailedToAddInstallments) as e:
+                results.append(BulkImportRowResult(row=row_number, userID=student.userID, status="failed", error=str(e)))
+                continue
+            ready.append((row_number, student, student_documents))
+
+        try:
+            hashed_passwords = await self.security.hash_passwords_async([student.userPassword for _, student, _ in ready])
+        except HashingPoolSaturated as e:
+            self.logger.warning(f"Bulk import: {e}, {len(ready)} rows of the chunk left for retry")
+            results.extend(
+                BulkImportRowResult(row=row_number, userID=student.userID, status="failed", error="Password hashing is busy, upload this row again", retryable=True)
+                for row_number, student, _ in ready
+            )
+            return results
+
+        documents: Dict[str, List[dict]] = {}
+        onboarded: List[Tuple[int, str]] = []
+        for (row_number, student, student_documents), hashed_password in zip(ready, hashed_passwords):
+            student_documents["auth"][0]["hashed_pswd"] = hashed_password
+            for collection_name, collection_documents in student_documents.items():
+                documents.setdefault(collection_name, []).extend(collection_documents)
+            onboarded.append((row_number, student.userID))
+
+        try:
+            committed = not onboarded or await self.repo.insert_onboarding_documents(documents)
+        except DuplicateKeyError:
+            self.logger.warning(f"Bulk import: a userID of the chunk was taken meanwhile, {len(onboarded)} rows left for retry")
+            results.extend(
+                BulkImportRowResult(row=row_number, userID=user_id, status="failed", error="A userID of this chunk was taken meanwhile, upload this row again", retryable=True)
+                for row_number, user_id in onboarded
+            )
+            return results
+        if not committed:
+            self.logger.error(f"Bulk import: failed to write a chunk of {len(onboarded)} students, no changes were saved")
+            results.extend(
+                BulkImportRowResult(row=row_number, userID=user_id, status="failed", error="Failed to create new student, no changes were saved")
+                for row_number, user_id in onboarded
+            )
+            return results
+
+        results.extend(BulkImportRowResult(row=row_number, userID=user_id, status="created") for row_number, user_id in onboarded)
+        return results
+
+    async def bulk_add_teachers(self, teachers:List[dict]) -> BulkImportResponse:
+        """
+        Onboard a batch of teachers with a constant number of round trips: one query for the
+        taken userIDs, one `$or` query resolving every (grade, subject) pair of the batch,
+        passwords hashed in parallel and auth, roles, profiles and subject mappings written in
+        one transaction. Invalid teachers are reported and skipped without aborting the rest.
+
+        Args:
+            teachers (List[dict]): AddNewTeacherRequest payloads
+
+        Returns:
+            BulkImportResponse: per-teacher results in request order, `row` is 1-based
+        """
+        results: List[BulkImportRowResult] = []
+        pending: List[Tuple[int, AddNewTeacherRequest]] = []
+        seen_user_ids = set()
+        for row_number, payload in enumerate(teachers, start=1):
+            try:
+                teacher = AddNewTeacherRequest.model_validate(payload)
+            except ValidationError as e:
+                user_id = payload.get("userID") if isinstance(payload, dict) else None
+                results.append(BulkImportRowResult(
+                    row=row_number,
+                    userID=user_id if isinstance(user_id, str) else None,
+                    status="failed",
+                    error="; ".join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors())
+                ))
+                continue
+            if teacher.userID in seen_user_ids:
+                results.append(BulkImportRowResult(row=row_number, userID=teacher.userID, status="failed", error="Duplicate userID in request"))
+                continue
+            seen_user_ids.add(teacher.userID)
+            pending.append((row_number, teacher))
+
+        if pending:
+            results.extend(await self.add_teacher_batch(pending))
+
+        results.sort(key=lambda result: result.row)
+        created = sum(result.status == "created" for result in results)
+        self.logger.info(f"Bulk teacher onboarding: {created} of {len(results)} teachers onboarded")
+        return BulkImportResponse(
+            received=len(results),
+            created=created,
+            failed=len(results) - created,
+            results=results
+        )
+
+    async def add_teacher_batch(self, batch:List[Tuple[int, AddNewTeacherRequest]]) -> List[BulkImportRowResult]:
+        """Onboard a batch of validated teachers in one transaction"""
+        grade_subjects: Dict[int, set] = {}
+        for _, teacher in batch:
+            for grade, names in teacher.teachingSubjects.items():
+                grade_subjects.setdefault(grade, set()).update(names)
+
+        taken_user_ids, subjects = await asyncio.gather(
+            self.repo.existing_user_ids([teacher.userID for _, teacher in batch]),
+            self.repo.get_preferred_subjects(grade_subjects={grade: sorted(names) for grade, names in grade_subjects.items()})
+        )
+        subject_ids = {(subject["grade"], subject["name"]): subject["_id"] for subject in subjects or []}
+
+        results: List[BulkImportRowResult] = []
+        pending = []
+        for row_number, teacher in batch:
+            if teacher.userID in taken_user_ids:
+                results.append(BulkImportRowResult(row=row_number, userID=teacher.userID, status="failed", error=f"UserID {teacher.userID} already exists"))
+            else:
+                pending.append((row_number, teacher))
+
+        ready: List[Tuple[int, AddNewTeacherRequest, Dict[str, List[dict]]]] = []
+        for row_number, teacher in pending:
+            try:
+                teacher_documents = self.teacher_utils.build_onboarding_documents(
+                    teacher=teacher,
+                    user=self.build_new_user_auth(user_id=teacher.userID, hashed_password="", is_active=True),
+                    subject_ids=self.teacher_utils.resolve_subject_ids(teacher.teachingSubjects, subject_ids)
+                )
+            except FailedToMapTeacherSubjects as e:
+                results.append(BulkImportRowResult(row=row_number, userID=teacher.userID, status="failed", error=str(e)))
+                continue
+            ready.append((row_number, teacher, teacher_documents))
+
+        try:
+            hashed_passwords = await self.security.hash_passwords_async([teacher.userPassword for _, teacher, _ in ready])
+        except HashingPoolSaturated as e:
+            self.logger.warning(f"Bulk teacher onboarding: {e}, {len(ready)} rows of the batch left for retry")
+            results.extend(
+                BulkImportRowResult(row=row_number, userID=teacher.userID, status="failed", error="Password hashing is busy, upload this row again", retryable=True)
+                for row_number, teacher, _ in ready
+            )
+            return results
+
+        documents: Dict[str, List[dict]] = {}
+        onboarded: List[Tuple[int, str]] = []
+        for (row_number, teacher, teacher_documents), hashed_password in zip(ready, hashed_passwords):
+            teacher_documents["auth"][0]["hashed_pswd"] = hashed_password
+            for collection_name, collection_documents in teacher_documents.items():
+                documents.setdefault(collection_name, []).extend(collection_documents)
+            onboarded.append((row_number, teacher.userID))
+
+        try:
+            committed = not onboarded or await self.repo.insert_onboarding_documents(documents)
+        except DuplicateKeyError:
+            self.logger.warning(f"Bulk teacher onboarding: a userID of the batch was taken meanwhile, {len(onboarded)} rows left for retry")
+            results.extend(
+                BulkImportRowResult(row=row_number, userID=user_id, status="failed", error="A userID of this batch was taken meanwhile, send this row again", retryable=True)
+                for row_number, user_id in onboarded
+            )
+            return results
+        if not committed:
+            self.logger.error(f"Bulk teacher onboarding: failed to write {len(onboarded)} teachers, no changes were saved")
+            results.extend(
+                BulkImportRowResult(row=row_number, userID=user_id, status="failed", error="Failed to create new teacher, no changes were saved")
+                for row_number, user_id in onboarded
+            )
+            return results
+
+        results.extend(BulkImportRowResult(row=row_number, userID=user_id, status="created") for row_number, user_id in onboarded)
+        return results
+
+    async def resolve_installments(self, students:List[AddNewStudentRequest]) -> List[Union[List[ClientSentInstallments], FailedToAddInstallments]]:
+        """
+        Installment schedules of a batch of students: client-sent schedules are kept once they
+        add up to the quoted final fee, the missing ones are generated together in one pass of
+        the installment scheduler
+
+        Returns:
+            List[Union[List[ClientSentInstallments], FailedToAddInstallments]]: a schedule, or
+            the reason it was rejected or could not be generated, per student
+        """
+        schedules: List[Union[List[ClientSentInstallments], FailedToAddInstallments]] = [student.installments for student in students]
+        if not students:
+            return schedules
+
+        try:
+            fee_table = await self.fee_tables.current()
+        except (FailedToGetCourseFeeConfig, FailedToGetDiscountConfig) as e:
+            self.logger.error(e)
+            return [FailedToAddInstallments(f"Failed to check installments: {str(e)}") for _ in students]
+
+        sent = [index for index, student in enumerate(students) if student.installments is not None]
+        if sent:
+            errors = self.scheduler.check_schedules(
+                fee_table,
+                [self.student_utils.build_fee_request(students[index]) for index in sent],
+                [students[index].installments for index in sent]
+            )
+            for row, index in enumerate(sent):
+                if row in errors:
+                    schedules[index] = FailedToAddInstallments(f"Installments rejected: {errors[row]}")
+
+        missing = [index for index, student in enumerate(students) if student.installments is None]
+        if not missing:
+            return schedules
+
+        batch = self.scheduler.schedule_batch(fee_table, [self.student_utils.build_fee_request(students[index]) for index in missing])
+        for row, index in enumerate(missing):
+            if row in batch.errors:
+                schedules[index] = FailedToAddInstallments(f"Failed to generate installments: {batch.errors[row]}")
+            else:
+                schedules[index] = batch.installments(row)
+        return schedules
+
+    async def list_students(self, filters:StudentListFilters, order:str = "_id", limit:int = 50, cursor:Optional[str] = None, fields:Optional[str] = None) -> ListPageResponse:
+        """
+        One page of students, keyset-paginated on `_id` or `(grade, _id)`: the next page starts
+        after the last document of this one instead of skipping over the previous pages, so
+        page 500 costs the same index range scan as page 1
+
+        Args:
+            filters (StudentListFilters): grade, coaching mode, fee type and date_joined range
+            order (str): `_id` or `grade`
+            limit (int): page size
+            cursor (Optional[str]): `next_cursor` of the previous page
+            fields (Optional[str]): comma-separated fields of the list view
+
+        Returns:
+            ListPageResponse: the page and the cursor of the next one
+        """
+        try:
+            query = {}
+            if filters.grade is not None:
+                query["grade"] = filters.grade
+            if filters.coaching_mode is not None:
+                coaching_mode = await self.repo.get_coaching_modes(mode_type=filters.coaching_mode.value)
+                if coaching_mode is None:
+                    return ListPageResponse(items=[], count=0)
+                query["coaching_modeID"] = coaching_mode.id
+            if filters.fee_type is not None:
+                query["fee_typeID"] = self.student_utils.get_fee_id(filters.fee_type.value)
+            query.update(self.date_joined_query(filters.date_joined_from, filters.date_joined_to))
+
+            projection = self.list_projection(fields, STUDENT_LIST_FIELDS, STUDENT_LIST_DEFAULT_FIELDS, order)
+            return await self.list_page("students", query, filters.model_dump(mode="json"), order, limit, cursor, projection)
+
+        except InvalidListQuery as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+
+    async def list_teachers(self, filters:TeacherListFilters, limit:int = 50, cursor:Optional[str] = None, fields:Optional[str] = None) -> ListPageResponse:
+        """
+        One page of teachers, keyset-paginated on `_id`
+
+        Args:
+            filters (TeacherListFilters): date_joined range
+            limit (int): page size
+            cursor (Optional[str]): `next_cursor` of the previous page
+            fields (Optional[str]): comma-separated fields of the list view
+
+        Returns:
+            ListPageResponse: the page and the cursor of the next one
+        """
+        try:
+            query = self.date_joined_query(filters.date_joined_from, filters.date_joined_to)
+            projection = self.list_projection(fields, TEACHER_LIST_FIELDS, TEACHER_LIST_DEFAULT_FIELDS, "_id")
+            return await self.list_page("teachers", query, filters.model_dump(mode="json"), "_id", limit, cursor, projection)
+
+        except InvalidListQuery as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+
+    async def list_page(self, collection_name:str, query:dict, filters:dict, order:str, limit:int, cursor:Optional[str], projection:dict) -> ListPageResponse:
+        """Fetch one page past the cursor; one extra document tells whether another page follows"""
+        position = decode_cursor(cursor, order, filters) if cursor else None
+        after = keyset_query(order, position)
+        documents = await self.repo.list_page(
+            collection_name,
+            {"$and": [query, after]} if query and after else (query or after),
+            keyset_sort(order),
+            limit + 1,
+            projection
+        )
+
+        next_cursor = encode_cursor(order, documents[limit - 1], filters) if len(documents) > limit else None
+        items = [
+            {"id": str(document.pop("_id")), **{key: str(value) if isinstance(value, ObjectId) else value for key, value in document.items()}}
+            for document in documents[:limit]
+        ]
+        return ListPageResponse(items=items, count=len(items), next_cursor=next_cursor)
+
+    def list_projection(self, fields:Optional[str], allowed:set, default:Tuple[str, ...], order:str) -> dict:
+        """
+        Projection of a list view, always including the keyset fields
+
+        Raises:
+            InvalidListQuery: When a requested field is not available in list views
+        """
+        requested = [field.strip() for field in fields.split(",") if field.strip()] if fields else list(default)
+        unknown = sorted(set(requested) - allowed)
+        if unknown:
+            raise InvalidListQuery(f"Unknown list fields: {', '.join(unknown)}")
+        projection = {field: 1 for field in requested}
+        if order == "grade":
+            projection["grade"] = 1
+        return projection
+
+    def date_joined_query(self, date_from, date_to) -> dict:
+        """
+        Filter on an inclusive date_joined range
+
+        Raises:
+            InvalidListQuery: When the range ends before it starts
+        """
+        if date_from and date_to and date_from > date_to:
+            raise InvalidListQuery("date_joined_from must not be after date_joined_to")
+        date_range = {}
+        if date_from:
+            date_range["$gte"] = datetime.combine(date_from, time.min)
+        if date_to:
+            date_range["$lt"] = datetime.combine(date_to + timedelta(days=1), time.min)
+        return {"date_joined": date_range} if date_range else {}
+
+    async def get_student_profile(self, student_id:str, include:Optional[str] = None) -> Dict:
+        """
+        Everything known about a student in one response: the profile with its coaching mode and,
+        as asked for, its subjects, monthly performance trackers and installments. A miss costs a
+        single aggregation; the result is cached until one of the student's documents is written.
+
+        Args:
+            student_id (str): the student's ObjectID
+            include (Optional[str]): comma-separated sections among subjects, performance and
+                installments, all of them when omitted
+
+        Returns:
+            Dict: the student profile
+        """
+        try:
+            if not ObjectId.is_valid(student_id):
+                raise InvalidProfileQuery(f"Invalid student id: {student_id}")
+            student_objID = ObjectId(student_id)
+            sections = self.profile_sections(include)
+
+            profile = self.profile_cache.get(student_objID, sections)
+            if profile is None:
+                document = await self.repo.get_student_profile(student_objID, sections)
+                if document is None:
+                    raise StudentNotFound(f"No student with id {student_id}")
+                profile = jsonable_encoder({"id": document.pop("_id"), **document}, custom_encoder={ObjectId: str})
+                self.profile_cache.set(student_objID, sections, profile)
+            return profile
+
+        except InvalidProfileQuery as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+
+        except StudentNotFound as e:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=str(e)
+            )
+
+    def profile_sections(self, include:Optional[str]) -> Tuple[str, ...]:
+        """
+        Requested profile sections in canonical order, so equivalent requests share a cache entry
+
+        Raises:
+            InvalidProfileQuery: When a requested section does not exist
+        """
+        if include is None:
+            return PROFILE_SECTIONS
+        requested = {section.strip() for section in include.split(",") if section.strip()}
+        unknown = sorted(requested - set(PROFILE_SECTIONS))
+        if unknown:
+            raise InvalidProfileQuery(f"Unknown profile sections: {', '.join(unknown)}")
+        return tuple(section for section in PROFILE_SECTIONS if section in requested)
+
+    async def mark_attendance(self, attendance:MarkAttendanceRequest) -> MarkAttendanceResponse:
+        """
+        Record one class of one subject for a whole roster: a single unordered `bulk_write` of
+        `$inc`/`$addToSet` updates on the students' monthly performance trackers. Submitting the
+        same date again changes nothing, those marks are counted as `already_marked`; marks the
+        server rejects do not stop the others and are listed in `failed`.
+
+        Args:
+            attendance (MarkAttendanceRequest): subject, year batch, class date and one mark per student
+
+        Returns:
+            MarkAttendanceResponse: how many marks were counted and which students were skipped
+        """
+        try:
+            if len(attendance.marks) > self.attendance_max_marks:
+                raise InvalidAttendanceRequest(f"At most {self.attendance_max_marks} students can be marked at once, got {len(attendance.marks)}")
+            invalid = [mark.studentID for mark in attendance.marks if not ObjectId.is_valid(mark.studentID)]
+            if invalid:
+                raise InvalidAttendanceRequest(f"Invalid studentIDs: {', '.join(invalid)}")
+            marks = [(ObjectId(mark.studentID), mark.present) for mark in attendance.marks]
+            student_objIDs = [studentID for studentID, _ in marks]
+            if len(set(student_objIDs)) != len(student_objIDs):
+                raise InvalidAttendanceRequest("A student can only be marked once per submission")
+
+            class_date = datetime.combine(attendance.class_date, time.min)
+            try:
+                result = await self.repo.mark_attendance(attendance.subjectID, attendance.year_batch, class_date, marks)
+            finally:
+                # Unordered writes can be partly applied even when they fail
+                self.profile_cache.invalidate(student_objIDs)
+            if result is None:
+                raise FailedToMarkAttendance("Failed to mark attendance, some marks may not have been saved")
+
+            failed_indexes = {error["index"] for error in result.bulk_api_result.get("writeErrors", [])}
+            failed = [str(student_objIDs[index]) for index in sorted(failed_indexes)]
+            if failed:
+                self.logger.error(f"Mark attendance: {len(failed)} of {len(marks)} tracker updates were rejected")
+
+            # Only a partial match costs a second query, to tell re-submitted marks from unknown students
+            not_enrolled = []
+            if result.matched_count + len(failed) < len(marks):
+                enrolled = await self.repo.students_with_tracker(student_objIDs, attendance.subjectID, attendance.year_batch)
+                not_enrolled = [
+                    str(studentID) for index, studentID in enumerate(student_objIDs) if studentID not in enrolled and index not in failed_indexes
+                ]
+
+            return MarkAttendanceResponse(
+                received=len(marks),
+                marked=result.matched_count,
+                already_marked=len(marks) - result.matched_count - len(not_enrolled) - len(failed),
+                not_enrolled=not_enrolled,
+                failed=failed
+            )
+
+        except InvalidAttendanceRequest as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+
+        except FailedToMarkAttendance as e:
+            self.logger.error(e)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=str(e)
+            )
+
+    def build_new_user_auth(self, user_id:str, hashed_password:str, is_active:bool=True) -> Auth:
+        """Build the auth document; its `_id` becomes the user's ObjectID everywhere"""
         timestamp = get_utc_timestamp()
 
-        user = Auth(
+        return Auth(
             userID=user_id,
             hashed_pswd=hashed_password,
             is_active=is_active,
             last_login=timestamp
         )
-        user_objectID = self.repo.create_new_user_auth(user=user)
-        if user_objectID is None:
-            raise FailedToCreateNewUserAuth("Failed to create new user auth")
-        return user_objectID
-    
\ No newline at end of file
@@ -1,43 +1,57 @@
 # from fastapi import status, HTTPException
 from app.repositories.auth_repository import AuthRepository
-from app.schemas.auth_schema import UserInDB, Auth
+from app.repositories.refresh_token_repository import RefreshTokenRepository
+from app.schemas.auth_schema import UserInDB, LoginCredentials, Token
+from app.schemas.common import Roles
 from app.core.security import Security
 from app.exceptions.authExceptions import InvalidCredentials, UserNotFound, AccessDenied
-from app.repositories.auth_repository import AuthRepository
+from app.services.last_login_buffer import LastLoginBuffer
+from app.core.rate_limiter import LoginRateLimiter
+from typing import Optional
+from uuid import uuid4
 # from app.utils.timeFormat import format_ist
 
 class AuthService:
-    def __init__(self, security:Security, repo:AuthRepository, collection_name:str = "auth"):
+    def __init__(self, security:Security, repo:AuthRepository, refresh_repo:RefreshTokenRepository, last_login_buffer:LastLoginBuffer, rate_limiter:LoginRateLimiter, collection_name:str = "auth"):
         """
         Initialize the AuthService with security, repository, and collection name.
 
         Args:
             security (Security): The security service for handling authentication and token operations, injected by dependency injection.
             repo (AuthRepository): The repository used for database operations related to authentication, injected by dependency injection.
+            refresh_repo (RefreshTokenRepository): The revocation store of refresh tokens, injected by dependency injection.
+            last_login_buffer (LastLoginBuffer): Write-behind buffer the last login times are recorded in, injected by dependency injection.
+            rate_limiter (LoginRateLimiter): Per-user and per-IP login throttle, injected by dependency injection.
             collection_name (str, optional): The name of the MongoDB collection for storing authentication data. Defaults to "auth",  injected by dependency injection.
         """
 
         self.repo = repo
         self.security = security
+        self.refresh_repo = refresh_repo
+        self.last_login_buffer = last_login_buffer
+        self.rate_limiter = rate_limiter
         self.collection_name = collection_name
     
-    def authenticate(self, user_id:str, password:str):
+    async def authenticate(self, user_id:str, password:str, client_ip:Optional[str] = None):
         """
         Authenticates a user
 
         Args:
             user_id (str): The id of the user
             password (str): The password of the user
+            client_ip (Optional[str]): The client's address, used for per-IP throttling
 
         Returns:
-            str: An access token for the user
+            Token: An access token and a refresh token for the user
 
         Raises:
+            LoginThrottled: If the user or the IP made too many attempts, checked before any hashing
             UserNotFound: If the user does not exist
             InvalidCredentials: If the password is wrong
         """
+        await self.rate_limiter.check(user_id=user_id, client_ip=client_ip)
 
-        user:Auth = self.repo.get_user_by_id(user_id=user_id, collection_name=self.collection_name)
+        user:LoginCredentials = await self.repo.get_login_credentials(user_id=user_id, collection_name=self.collection_name)
 
         if not user:
             raise UserNotFound(f"User {user_id} does not exist")
@@ -45,10 +59,105 @@ class AuthService:
         if not user.is_active:
             raise AccessDenied(f"User {user_id} is no longer active or have been blocked by the admin")
 
-        if not self.security.verify_password(password, user.hashed_pswd):
+        verified, upgraded_hash = await self.security.verify_and_rehash_async(password, user.hashed_pswd)
+        if not verified:
             raise InvalidCredentials("Wrong password")
+
+        if upgraded_hash:
+            # The hash was made with an older argon2 cost, swap it now that we know the password
+            await self.repo.update_user_password_hash(user_id=user_id, hashed_password=upgraded_hash, collection_name=self.collection_name)
         
         # print(f"User {user_id} last logged in at {format_ist(user.last_login)}")
-        self.repo.update_user_last_login(user_id=user_id, collection_name=self.collection_name)
-        return self.security.create_access_token(user_id=user.userID)
-    
+        await self.last_login_buffer.record(user_id=user_id)
+        return await self.issue_tokens(user_id=user.userID, family=uuid4().hex)
+
+    async def issue_tokens(self, user_id:str, family:str) -> Token:
+        """
+        Issue an access token and a refresh token belonging to the login session `family`.
+        If the refresh token cannot be recorded the session is still opened, without one.
+        """
+        refresh_token, jti, expires_at = self.security.create_refresh_token(user_id=user_id, family=family)
+        recorded = await self.refresh_repo.add(jti=jti, family=family, user_id=user_id, expires_at=expires_at)
+        return Token(
+            access_token=self.security.create_access_token(user_id=user_id),
+            refresh_token=refresh_token if recorded else None
+        )
+
+    async def refresh(self, refresh_token:str) -> Token:
+        """
+        Exchange a refresh token for a new access token and a new refresh token (rotation).
+        Costs a signature check and an indexed update, no password hash.
+
+        A refresh token can only be used once: presenting an already rotated one means it was
+        stolen or replayed, so every token of that login session is revoked.
+
+        Args:
+            refresh_token (str): The refresh token issued at login or by the last refresh
+
+        Returns:
+            Token: A new access token and refresh token
+
+        Raises:
+            TokenExpired: If the refresh token has expired
+            InvalidCredentials: If the refresh token is invalid, unknown, revoked or reused
+            AccessDenied: If the user was deactivated or deleted since login, the session is revoked
+        """
+        claims = self.security.decode_refresh_token(refresh_token)
+        if not await self.repo.is_user_active(user_id=claims["sub"], collection_name=self.collection_name):
+            await self.refresh_repo.revoke_family(family=claims["fam"])
+            raise AccessDenied(f"User {claims['sub']} is no longer active or have been blocked by the admin")
+
+        successor = uuid4().hex
+        if not await self.refresh_repo.rotate(jti=claims["jti"], replaced_by=successor):
+            stored = await self.refresh_repo.get(jti=claims["jti"])
+            if stored is not None:
+                await self.refresh_repo.revoke_family(family=stored["family"])
+                raise InvalidCredentials("Refresh token was already used, the session has been revoked")
+            raise InvalidCredentials("Refresh token is not recognised")
+
+        return await self.issue_tokens(user_id=claims["sub"], family=claims["fam"])
+
+    async def logout(self, token:str, refresh_token:Optional[str] = None):
+        """
+        Revoke an access token so it is rejected until it expires, and the session's refresh tokens
+
+        Args:
+            token (str): The bearer token of the session
+            refresh_token (Optional[str]): The session's refresh token, if the client has one
+        """
+        self.security.revoke_token(token)
+        if refresh_token:
+            claims = self.security.decode_refresh_token(refresh_token)
+            await self.refresh_repo.revoke_family(family=claims["fam"])
+
+    async def deactivate_user(self, user_id:str):
+        """
+        Block a user: further logins and refreshes are denied and every session is revoked.
+        Access tokens already issued are rejected by this worker at once and by the others when
+        they expire.
+
+        Args:
+            user_id (str): The id of the user
+
+        Raises:
+            UserNotFound: If the user does not exist
+        """
+        if not await self.repo.set_user_active(user_id=user_id, is_active=False, collection_name=self.collection_name):
+            raise UserNotFound(f"User {user_id} does not exist")
+        await self.revoke_user_sessions(user_id=user_id)
+
+    async def is_admin(self, user_id:str) -> bool:
+        """Whether a user holds the admin or developer role"""
+        role = await self.repo.get_user_role(user_id=user_id, collection_name=self.collection_name)
+        return role in (Roles.ADMIN.value, Roles.DEVELOPER.value)
+
+    async def revoke_user_sessions(self, user_id:str):
+        """
+        Sign a user out everywhere: refresh tokens are revoked in the store, access tokens
+        issued so far are rejected by this worker
+
+        Args:
+            user_id (str): The id of the user
+        """
+        await self.refresh_repo.revoke_user(user_id=user_id)
+        self.security.revoke_user_tokens(user_id)
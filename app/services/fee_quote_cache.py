@@ -0,0 +1,50 @@
+from app.config.settings import Settings
+from app.core.cache import TTLCache
+from app.services.fee_table import FeeQuote, FeeQuoteKey, FeeTable
+from typing import Dict, Optional
+
+
+class FeeQuoteCache:
+    """
+    Per-process cache of fee quotes keyed on the normalised pricing inputs (`FeeQuoteKey`):
+    grade, clamped subject count, payment type, coaching mode, scholarship band and join day.
+    Requests differing only in irrelevant details (exact percentage within a band, time of
+    day, subject names) share an entry.
+
+    The fee table version is part of the key, so a config edit never serves an old quote; the
+    cache is also emptied the first time a new version is seen, freeing the stale entries.
+
+    Args:
+        settings (Settings): FEE_QUOTE_CACHE_SIZE and FEE_QUOTE_CACHE_TTL_SECONDS
+    """
+
+    def __init__(self, settings:Settings):
+        self._quotes: TTLCache[FeeQuoteKey, FeeQuote] = TTLCache(settings.fee_quote_cache_size, settings.fee_quote_cache_ttl_seconds)
+        self._version: Optional[str] = None
+
+    def quote_for_key(self, fee_table:FeeTable, key:FeeQuoteKey) -> FeeQuote:
+        """
+        Cached quote of a key from `FeeTable.quote_key`, computed from the fee table on a miss
+
+        Raises:
+            GradeNotOffered: When the grade has no fee or course end date
+            UnknownDiscount: When the payment type or coaching mode has no discount configured
+        """
+        if fee_table.version != self._version:
+            self._quotes.clear()
+            self._version = fee_table.version
+
+        quote = self._quotes.get(key)
+        if quote is None:
+            quote = fee_table.quote_from_key(key)
+            self._quotes.set(key, quote)
+        return quote
+
+    def cache_stats(self) -> Dict:
+        """
+        Size and hit rate of the quote cache
+
+        Returns:
+            Dict: cache statistics
+        """
+        return {"version": self._version, **self._quotes.cache_stats()}
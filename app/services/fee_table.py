@@ -0,0 +1,478 @@
+from dataclasses import dataclass
+from datetime import date, datetime, time, timezone
+from functools import cached_property
+from hashlib import sha256
+from types import MappingProxyType
+from typing import Dict, Iterator, Mapping, NamedTuple, Optional, Sequence, Tuple
+from logging import Logger
+import asyncio
+import json
+
+import numpy as np
+
+from app.db.config_cache import ConfigCache
+from app.repositories.payment_repository import PaymentRepository, COURSE_FEE_CONFIG, DISCOUNT_CONFIG, FEE_TYPE_CONFIG
+from app.schemas.fee_schema import FeeConfigurations, DiscountConfigurations, FeeTypeConfigurations
+from app.schemas.admin_client_req_res import CalculateCourseFeeRequest, CalculateCourseFeeResponse
+from app.exceptions.paymentExceptions import FailedToGetCourseFeeConfig, FailedToGetDiscountConfig, GradeNotOffered, UnknownDiscount
+from app.utils.timeFormat import get_remaining_days_month_ratio
+
+# Used for grades the course fee config has no `course_end_dates` entry for
+DEFAULT_COURSE_END_DATES = {
+    6: datetime(2026, 2, 28),
+    7: datetime(2026, 2, 28),
+    8: datetime(2026, 2, 28),
+    9: datetime(2026, 2, 28),
+    10: datetime(2026, 2, 28),
+}
+
+# Fee type (FEE01, FEE02, FEE04) each payment type is billed with
+PAYMENT_TYPE_FEE_TYPES = {"one_time": "FEE01", "two_time": "FEE02", "four_time": "FEE04"}
+
+# Minimum previous-year percentage of every scholarship band, best band first
+SCHOLARSHIP_THRESHOLDS = (("high", 90.0), ("medium", 85.0), ("low", 80.0), ("none", float("-inf")))
+
+
+@dataclass(frozen=True)
+class GradeFee:
+    admission_fee: float
+    fixed_amt: float
+    monthly_fee: float
+    course_duration: int
+    course_end_date: datetime
+
+
+@dataclass(frozen=True)
+class ScholarshipBand:
+    name: str
+    min_percentage: float
+    discount: float
+
+
+class FeeQuoteKey(NamedTuple):
+    """The inputs a quote actually depends on, normalised; equal keys always get equal quotes"""
+    version: str
+    grade: int
+    number_of_subjects: int                            # clamped to the configured range
+    payment_type: str
+    coaching_mode: str
+    scholarship_band: str
+    date_joined: date                                  # tuition is pro-rated by day
+
+    def etag(self) -> str:
+        """Strong HTTP entity tag of the quote, it changes with the config version and every input"""
+        return '"' + sha256("|".join(map(str, self)).encode()).hexdigest()[:32] + '"'
+
+
+@dataclass(frozen=True)
+class FeeQuote:
+    admission_fee: float
+    fixed_amt: float
+    tuition_fee: float
+    payment_type_discount: float
+    coaching_mode_discount: float
+    scholarship_discount: float
+    total_discount: float
+    total_fee: float
+    final_fee: float
+
+    def to_response(self) -> CalculateCourseFeeResponse:
+        return CalculateCourseFeeResponse(
+            admission_fee=self.admission_fee,
+            fixed_amt=self.fixed_amt,
+            tuition_fee=self.tuition_fee,
+            discount={
+                "total_discount": self.total_discount,
+                "discounts_applied": {
+                    "payment_type_discount": self.payment_type_discount,
+                    "coaching_mode_discount": self.coaching_mode_discount,
+                    "scholarship_discount": self.scholarship_discount,
+                }
+            },
+            total_fee=self.total_fee,
+            final_fee=self.final_fee
+        )
+
+
+def calculate_tuition_fee(current_date:datetime, end_date:datetime, monthly_fee:float) -> float:
+    """Tuition from `current_date` to `end_date`, pro-rata for the first and the last month"""
+    current_date = current_date.replace(tzinfo=None)
+
+    # If already past end_date
+    if current_date >= end_date:
+        return 0.0
+
+    # 1. Pro-rata for the current partial month
+    total_fee = get_remaining_days_month_ratio(current_date) * monthly_fee
+
+    # 2. Full months between next month and end_date's previous month; the year only
+    # increments when the current month is December
+    next_month = (current_date.month % 12) + 1
+    next_month_year = current_date.year + (1 if next_month == 1 else 0)
+    full_months = (end_date.year - next_month_year) * 12 + (end_date.month - next_month)
+    total_fee += full_months * monthly_fee
+
+    # 3. Partial last month (if end_date is not the first of its month)
+    total_fee += get_remaining_days_month_ratio(end_date) * monthly_fee
+    return total_fee
+
+
+EPOCH_ORDINAL = datetime(1970, 1, 1).toordinal()
+
+
+def wall_clock_datetime64(dates:Sequence[datetime]) -> np.ndarray:
+    """
+    Dates as datetime64[us] of their wall-clock time (any tzinfo is dropped, like the scalar
+    path does). Builds the integers directly, numpy's own datetime conversion is ~8x slower.
+    """
+    return np.fromiter(
+        ((date.toordinal() - EPOCH_ORDINAL) * 86_400_000_000 + (date.hour * 3600 + date.minute * 60 + date.second) * 1_000_000 + date.microsecond for date in dates),
+        dtype=np.int64, count=len(dates)
+    ).view("datetime64[us]")
+
+
+def remaining_days_month_ratio(days:np.ndarray) -> np.ndarray:
+    """`get_remaining_days_month_ratio` over an array of datetime64[D]"""
+    month = days.astype("datetime64[M]")
+    first_day = month.astype("datetime64[D]")
+    total_days = ((month + 1).astype("datetime64[D]") - first_day).astype(np.int64)
+    remaining_days = total_days - (days - first_day).astype(np.int64)
+    return remaining_days / total_days
+
+
+def calculate_tuition_fees(current_dates:np.ndarray, end_dates:np.ndarray, monthly_fees:np.ndarray) -> np.ndarray:
+    """`calculate_tuition_fee` over arrays of datetime64[us] dates and monthly fees, term for term"""
+    current_days = current_dates.astype("datetime64[D]")
+    end_days = end_dates.astype("datetime64[D]")
+    full_months = (end_days.astype("datetime64[M]") - current_days.astype("datetime64[M]")).astype(np.int64) - 1
+    total_fees = remaining_days_month_ratio(current_days) * monthly_fees + full_months * monthly_fees + remaining_days_month_ratio(end_days) * monthly_fees
+    return np.where(current_dates >= end_dates, 0.0, total_fees)
+
+
+@dataclass(frozen=True)
+class FeeArrays:
+    """The per-grade and per-band values of a FeeTable as arrays, for batch quotes"""
+    grade_index: Mapping[int, int]
+    admission_fees: np.ndarray
+    fixed_amts: np.ndarray
+    monthly_fees: np.ndarray
+    course_end_dates: np.ndarray                       # datetime64[us]
+    subject_multipliers: np.ndarray
+    scholarship_thresholds: np.ndarray                 # ascending
+    scholarship_discounts: np.ndarray
+
+
+# Per-quote columns of a batch, in response order
+QUOTE_COLUMNS = (
+    "admission_fee", "fixed_amt", "tuition_fee",
+    "payment_type_discount", "coaching_mode_discount", "scholarship_discount", "total_discount",
+    "total_fee", "final_fee",
+)
+
+
+@dataclass(frozen=True)
+class FeeQuoteBatch:
+    """
+    Quotes of a batch of requests as one array per column, row i of every column belongs to
+    request i. Rows that could not be quoted hold NaN and are listed in `errors`.
+    """
+    version: str
+    columns: Mapping[str, np.ndarray]
+    errors: Mapping[int, str]
+
+    def __len__(self) -> int:
+        return len(self.columns["final_fee"])
+
+    def to_columnar(self) -> Dict:
+        columns = {}
+        for name, values in self.columns.items():
+            column = values.tolist()
+            for row in self.errors:
+                column[row] = None
+            columns[name] = column
+        return {
+            "version": self.version,
+            "count": len(self),
+            "failed": len(self.errors),
+            "columns": columns,
+            "errors": [{"row": row, "error": error} for row, error in sorted(self.errors.items())],
+        }
+
+    def to_ndjson(self) -> Iterator[str]:
+        """One JSON object per request, in request order"""
+        rows = zip(*(self.columns[name].tolist() for name in QUOTE_COLUMNS))
+        for row, values in enumerate(rows):
+            if row in self.errors:
+                yield json.dumps({"row": row, "error": self.errors[row]}) + "\n"
+            else:
+                yield json.dumps({"row": row, **dict(zip(QUOTE_COLUMNS, values))}) + "\n"
+
+
+@dataclass(frozen=True)
+class FeeTable:
+    """
+    Immutable snapshot of the fee, discount, fee type and course-end configuration, compiled
+    once per config version so that a quote is a pure in-memory computation: typed lookups by
+    grade, subject count, payment type and coaching mode, and scholarship bands sorted once.
+
+    `version` combines the config cache versions of the config collections, it changes
+    whenever any of the documents does.
+    """
+    version: str
+    grades: Mapping[int, GradeFee]
+    subject_multipliers: Tuple[float, ...]             # index = number of subjects - 1
+    payment_type_discounts: Mapping[str, float]
+    coaching_mode_discounts: Mapping[str, float]
+    scholarship_bands: Tuple[ScholarshipBand, ...]
+    installment_counts: Mapping[str, int]              # fee type ID (FEE01, ...) -> installments
+
+    @classmethod
+    def compile(cls, fee_config:FeeConfigurations, discount_config:DiscountConfigurations, version:str, fee_type_config:Optional[FeeTypeConfigurations] = None) -> "FeeTable":
+        course_end_dates = {**DEFAULT_COURSE_END_DATES, **{int(grade): end for grade, end in (fee_config.course_end_dates or {}).items()}}
+        grades = {
+            int(grade): GradeFee(
+                admission_fee=float(fee.admission_fee),
+                fixed_amt=float(fee.fixed_amt),
+                monthly_fee=float(fee.monthly_fee),
+                course_duration=fee.course_duration,
+                course_end_date=course_end_dates[int(grade)].replace(tzinfo=None),
+            )
+            for grade, fee in fee_config.fees.items()
+            if int(grade) in course_end_dates
+        }
+        subject_counts = sorted(int(count) for count in fee_config.subject_preference_fee)
+        subject_multipliers = tuple(fee_config.subject_preference_fee[str(count)] / 100 for count in subject_counts)
+        scholarship_bands = tuple(
+            ScholarshipBand(name=name, min_percentage=threshold, discount=float(discount_config.scholarship_discount[name]))
+            for name, threshold in SCHOLARSHIP_THRESHOLDS
+            if name in discount_config.scholarship_discount
+        )
+        return cls(
+            version=version,
+            grades=MappingProxyType(grades),
+            subject_multipliers=subject_multipliers,
+            payment_type_discounts=MappingProxyType({key: float(value) for key, value in discount_config.payment_type_discount.items()}),
+            coaching_mode_discounts=MappingProxyType({key: float(value) for key, value in discount_config.coaching_mode_discount.items()}),
+            scholarship_bands=scholarship_bands,
+            installment_counts=MappingProxyType({fee_typeID: fee_type.installments for fee_typeID, fee_type in (fee_type_config.types if fee_type_config else {}).items()}),
+        )
+
+    def grade_fee(self, grade:int) -> GradeFee:
+        fee = self.grades.get(grade)
+        if fee is None:
+            raise GradeNotOffered(f"Grade {grade} is not offered")
+        return fee
+
+    def subject_multiplier(self, number_of_subjects:int) -> float:
+        """Share of the tuition charged for a number of subjects, clamped to the configured range"""
+        return self.subject_multipliers[min(max(number_of_subjects, 1), len(self.subject_multipliers)) - 1]
+
+    def scholarship_band(self, percentage:float) -> ScholarshipBand:
+        for band in self.scholarship_bands:
+            if percentage >= band.min_percentage:
+                return band
+        return ScholarshipBand(name="none", min_percentage=float("-inf"), discount=0.0)
+
+    def discount(self, table:Mapping[str, float], key:str) -> float:
+        value = table.get(key)
+        if value is None:
+            raise UnknownDiscount(f"No discount is configured for {key}")
+        return value
+
+    def quote_key(self, grade:int, number_of_subjects:int, payment_type:str, coaching_mode:str, percentage:float, date_joined:datetime) -> FeeQuoteKey:
+        """Normalise quote inputs: subject count clamped, percentage reduced to its band, join time to its day"""
+        return FeeQuoteKey(
+            version=self.version,
+            grade=grade,
+            number_of_subjects=min(max(number_of_subjects, 1), len(self.subject_multipliers)),
+            payment_type=payment_type,
+            coaching_mode=coaching_mode,
+            scholarship_band=self.scholarship_band(percentage).name,
+            date_joined=date_joined.replace(tzinfo=None).date(),
+        )
+
+    def quote_from_key(self, key:FeeQuoteKey) -> FeeQuote:
+        """Quote normalised inputs, the student is taken to join at the start of the day"""
+        band = next((band for band in self.scholarship_bands if band.name == key.scholarship_band), None)
+        return self.quote(
+            grade=key.grade,
+            number_of_subjects=key.number_of_subjects,
+            payment_type=key.payment_type,
+            coaching_mode=key.coaching_mode,
+            percentage=band.min_percentage if band else float("-inf"),
+            date_joined=datetime.combine(key.date_joined, time.min),
+        )
+
+    def quote(self, grade:int, number_of_subjects:int, payment_type:str, coaching_mode:str, percentage:float, date_joined:datetime) -> FeeQuote:
+        """
+        Quote the course fee of a student
+
+        Raises:
+            GradeNotOffered: When the grade has no fee or course end date
+            UnknownDiscount: When the payment type or coaching mode has no discount configured
+        """
+        fee = self.grade_fee(grade)
+        tuition_fee = calculate_tuition_fee(date_joined, fee.course_end_date, fee.monthly_fee) * self.subject_multiplier(number_of_subjects)
+
+        payment_type_discount = self.discount(self.payment_type_discounts, payment_type)
+        coaching_mode_discount = self.discount(self.coaching_mode_discounts, coaching_mode)
+        scholarship_discount = self.scholarship_band(percentage).discount
+        total_discount = payment_type_discount + coaching_mode_discount + scholarship_discount
+
+        total_fee = fee.admission_fee + fee.fixed_amt + tuition_fee
+        return FeeQuote(
+            admission_fee=fee.admission_fee,
+            fixed_amt=fee.fixed_amt,
+            tuition_fee=tuition_fee,
+            payment_type_discount=payment_type_discount,
+            coaching_mode_discount=coaching_mode_discount,
+            scholarship_discount=scholarship_discount,
+            total_discount=total_discount,
+            total_fee=total_fee,
+            final_fee=total_fee - tuition_fee * (total_discount / 100),
+        )
+
+    @cached_property
+    def arrays(self) -> FeeArrays:
+        grades = sorted(self.grades)
+        bands = sorted(self.scholarship_bands, key=lambda band: band.min_percentage)
+        arrays = FeeArrays(
+            grade_index=MappingProxyType({grade: index for index, grade in enumerate(grades)}),
+            admission_fees=np.array([self.grades[grade].admission_fee for grade in grades], dtype=np.float64),
+            fixed_amts=np.array([self.grades[grade].fixed_amt for grade in grades], dtype=np.float64),
+            monthly_fees=np.array([self.grades[grade].monthly_fee for grade in grades], dtype=np.float64),
+            course_end_dates=np.array([self.grades[grade].course_end_date for grade in grades], dtype="datetime64[us]"),
+            subject_multipliers=np.array(self.subject_multipliers, dtype=np.float64),
+            scholarship_thresholds=np.array([band.min_percentage for band in bands], dtype=np.float64),
+            scholarship_discounts=np.array([band.discount for band in bands], dtype=np.float64),
+        )
+        for array in (arrays.admission_fees, arrays.fixed_amts, arrays.monthly_fees, arrays.course_end_dates,
+                      arrays.subject_multipliers, arrays.scholarship_thresholds, arrays.scholarship_discounts):
+            array.flags.writeable = False
+        return arrays
+
+    def quote_batch(self, requests:Sequence[CalculateCourseFeeRequest]) -> FeeQuoteBatch:
+        """
+        Quote many requests at once. Inputs are gathered into arrays in one pass, then tuition,
+        discounts and final fees are computed as array operations over the whole batch, with
+        the same results as `quote` row by row. A row with an unknown grade or discount fails
+        on its own, the rest of the batch is still quoted.
+        """
+        arrays = self.arrays
+        count = len(requests)
+
+        # One pass over the requests to gather the inputs, everything else is array arithmetic
+        grade_rows = np.fromiter((arrays.grade_index.get(request.grade, -1) for request in requests), dtype=np.int64, count=count)
+        subject_counts = np.fromiter((len(request.selectedSubjects) for request in requests), dtype=np.int64, count=count)
+        percentages = np.fromiter((request.prev_year_results.percentage for request in requests), dtype=np.float64, count=count)
+        payment_type_discounts = np.fromiter((self.payment_type_discounts.get(request.payment_type.value, np.nan) for request in requests), dtype=np.float64, count=count)
+        coaching_mode_discounts = np.fromiter((self.coaching_mode_discounts.get(request.coaching_mode.value, np.nan) for request in requests), dtype=np.float64, count=count)
+        date_joined = wall_clock_datetime64([request.date_joined for request in requests])
+
+        errors: Dict[int, str] = {}
+        for row in np.flatnonzero((grade_rows < 0) | np.isnan(payment_type_discounts) | np.isnan(coaching_mode_discounts)).tolist():
+            request = requests[row]
+            if grade_rows[row] < 0:
+                errors[row] = f"Grade {request.grade} is not offered"
+            elif np.isnan(payment_type_discounts[row]):
+                errors[row] = f"No discount is configured for {request.payment_type.value}"
+            else:
+                errors[row] = f"No discount is configured for {request.coaching_mode.value}"
+        grade_rows[grade_rows < 0] = 0
+
+        multipliers = arrays.subject_multipliers[np.clip(subject_counts, 1, len(arrays.subject_multipliers)) - 1]
+        tuition_fees = calculate_tuition_fees(date_joined, arrays.course_end_dates[grade_rows], arrays.monthly_fees[grade_rows]) * multipliers
+
+        scholarship_discounts = np.zeros(count, dtype=np.float64)
+        if len(arrays.scholarship_discounts):
+            bands = np.searchsorted(arrays.scholarship_thresholds, percentages, side="right") - 1
+            scholarship_discounts = np.where(bands >= 0, arrays.scholarship_discounts[np.maximum(bands, 0)], 0.0)
+        total_discounts = payment_type_discounts + coaching_mode_discounts + scholarship_discounts
+
+        admission_fees = arrays.admission_fees[grade_rows]
+        fixed_amts = arrays.fixed_amts[grade_rows]
+        total_fees = admission_fees + fixed_amts + tuition_fees
+
+        return FeeQuoteBatch(
+            version=self.version,
+            columns={
+                "admission_fee": admission_fees,
+                "fixed_amt": fixed_amts,
+                "tuition_fee": tuition_fees,
+                "payment_type_discount": payment_type_discounts,
+                "coaching_mode_discount": coaching_mode_discounts,
+                "scholarship_discount": scholarship_discounts,
+                "total_discount": total_discounts,
+                "total_fee": total_fees,
+                "final_fee": total_fees - tuition_fees * (total_discounts / 100),
+            },
+            errors=errors,
+        )
+
+
+class FeeTableProvider:
+    """
+    Holds the current FeeTable and swaps it atomically (one reference assignment) when the
+    config cache reports a new version of the fee, discount or fee type config. Readers always see a
+    complete table, never a half-updated one.
+    """
+
+    def __init__(self, payment_repository:PaymentRepository, config_cache:ConfigCache, logger:Logger):
+        self.repo = payment_repository
+        self.config_cache = config_cache
+        self.logger = logger
+        self._table: Optional[FeeTable] = None
+        self._lock = asyncio.Lock()
+        self.compiled_at: Optional[datetime] = None
+        self.compilations = 0
+
+    def config_version(self) -> str:
+        return ".".join(str(self.config_cache.version(document.collection)) for document in (COURSE_FEE_CONFIG, DISCOUNT_CONFIG, FEE_TYPE_CONFIG))
+
+    async def current(self) -> FeeTable:
+        """
+        The fee table of the current config version, compiled on first use and after every change
+
+        Raises:
+            FailedToGetCourseFeeConfig: When the course fee config is missing
+            FailedToGetDiscountConfig: When the discount config is missing
+        """
+        # Reading through the repository keeps the config cache's TTL refresh working
+        fee_config = await self.repo.get_course_fees_config()
+        discount_config = await self.repo.get_discount_config()
+        fee_type_config = await self.repo.get_fee_type_configurations()
+
+        table = self._table
+        if table is not None and table.version == self.config_version():
+            return table
+
+        async with self._lock:
+            version = self.config_version()
+            if self._table is not None and self._table.version == version:
+                return self._table
+            if fee_config is None:
+                raise FailedToGetCourseFeeConfig("Failed to get course fee config from the db")
+            if discount_config is None:
+                raise FailedToGetDiscountConfig("Failed to get discount config from the db")
+
+            self._table = FeeTable.compile(fee_config, discount_config, version=version, fee_type_config=fee_type_config)
+            self.compiled_at = datetime.now(timezone.utc)
+            self.compilations += 1
+            self.logger.info(f"Fee table compiled for config version {version}")
+            return self._table
+
+    def table_stats(self) -> Dict:
+        """
+        Version, compile time and shape of the current fee table
+
+        Returns:
+            Dict: fee table statistics
+        """
+        table = self._table
+        return {
+            "version": table.version if table else None,
+            "compiled_at": self.compiled_at.isoformat() if self.compiled_at else None,
+            "compilations": self.compilations,
+            "grades": sorted(table.grades) if table else [],
+            "max_subjects": len(table.subject_multipliers) if table else 0,
+        }
@@ -0,0 +1,184 @@
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Sequence
+
+import numpy as np
+
+from app.config.settings import Settings
+from app.schemas.admin_client_req_res import CalculateCourseFeeRequest, Installments
+from app.schemas.fee_schema import PaymentWindow
+from app.services.fee_table import FeeQuoteBatch, FeeTable, PAYMENT_TYPE_FEE_TYPES, wall_clock_datetime64
+
+
+@dataclass(frozen=True)
+class InstallmentScheduleBatch:
+    """
+    Installment schedules of a batch of students, flattened: the installments of student i are
+    rows `offsets[i]:offsets[i + 1]` of the installment columns. Students that could not be
+    scheduled have no installments and are listed in `errors`.
+    """
+    version: str
+    fee_typeIDs: Sequence[str]
+    quotes: FeeQuoteBatch
+    offsets: np.ndarray
+    installment_numbers: np.ndarray
+    amounts: np.ndarray
+    start_dates: np.ndarray                            # datetime64[D]
+    end_dates: np.ndarray                              # datetime64[D]
+    errors: Mapping[int, str]
+
+    def __len__(self) -> int:
+        return len(self.fee_typeIDs)
+
+    def installments(self, row:int) -> List[Installments]:
+        """Schedule of one student, in the shape onboarding accepts from clients"""
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        return [
+            Installments(
+                installment_number=number,
+                total_installment_amount_to_pay=amount,
+                payment_window=PaymentWindow(start_date=window_start, end_date=window_end),
+                payment_status=False
+            )
+            for number, amount, window_start, window_end in zip(
+                self.installment_numbers[start:end].tolist(),
+                self.amounts[start:end].tolist(),
+                self.start_dates[start:end].astype("datetime64[us]").tolist(),
+                self.end_dates[start:end].astype("datetime64[us]").tolist(),
+            )
+        ]
+
+    def to_response(self) -> Dict:
+        offsets = self.offsets.tolist()
+        numbers = self.installment_numbers.tolist()
+        amounts = self.amounts.tolist()
+        start_dates = np.datetime_as_string(self.start_dates.astype("datetime64[s]")).tolist()
+        end_dates = np.datetime_as_string(self.end_dates.astype("datetime64[s]")).tolist()
+        final_fees = self.quotes.columns["final_fee"].tolist()
+        schedules = []
+        for row in range(len(self)):
+            if row in self.errors:
+                continue
+            schedules.append({
+                "row": row,
+                "fee_typeID": self.fee_typeIDs[row],
+                "final_fee": final_fees[row],
+                "installments": [
+                    {
+                        "installment_number": numbers[index],
+                        "total_installment_amount_to_pay": amounts[index],
+                        "payment_window": {"start_date": start_dates[index], "end_date": end_dates[index]},
+                        "payment_status": False,
+                    }
+                    for index in range(offsets[row], offsets[row + 1])
+                ],
+            })
+        return {
+            "version": self.version,
+            "count": len(self),
+            "failed": len(self.errors),
+            "schedules": schedules,
+            "errors": [{"row": row, "error": error} for row, error in sorted(self.errors.items())],
+        }
+
+
+class InstallmentScheduler:
+    """
+    Derives installment schedules from the fee table instead of trusting client-sent ones.
+
+    The final fee of every student is quoted with `FeeTable.quote_batch` and rounded to whole
+    rupees, then split into as many installments as the student's fee type (FEE01, FEE02,
+    FEE04) has; the remainder of the split goes to the first installment. The time from the
+    join date to the course end date is cut into equal periods, installment k is due in a
+    window of `installment_payment_window_days` starting at period k (the first one on the
+    join date), never running past the course end date.
+
+    Everything is computed as array operations over the whole batch, so thousands of
+    students are scheduled in one pass.
+
+    Args:
+        settings (Settings): INSTALLMENT_PAYMENT_WINDOW_DAYS
+    """
+
+    def __init__(self, settings:Settings):
+        self.payment_window_days = settings.installment_payment_window_days
+
+    def schedule_batch(self, fee_table:FeeTable, requests:Sequence[CalculateCourseFeeRequest]) -> InstallmentScheduleBatch:
+        """
+        Schedule a batch of students; the payment type of each request picks its fee type.
+        A student with an unknown grade, discount or fee type, a final fee that is not
+        positive, or a join date on or after the course end date fails on its own.
+        """
+        quotes = fee_table.quote_batch(requests)
+        errors: Dict[int, str] = dict(quotes.errors)
+        count = len(requests)
+
+        fee_typeIDs = [PAYMENT_TYPE_FEE_TYPES.get(request.payment_type.value, request.payment_type.value) for request in requests]
+        installment_counts = np.fromiter((fee_table.installment_counts.get(fee_typeID, 0) for fee_typeID in fee_typeIDs), dtype=np.int64, count=count)
+        for row in np.flatnonzero(installment_counts < 1).tolist():
+            errors.setdefault(row, f"Fee type {fee_typeIDs[row]} is not configured")
+
+        totals = self.rounded_final_fees(quotes)
+        joined = wall_clock_datetime64([request.date_joined for request in requests]).astype("datetime64[D]")
+        grade_index = fee_table.arrays.grade_index
+        grade_rows = np.fromiter((grade_index.get(request.grade, 0) for request in requests), dtype=np.int64, count=count)
+        course_ends = fee_table.arrays.course_end_dates[grade_rows].astype("datetime64[D]")
+        for row in np.flatnonzero(totals <= 0).tolist():
+            errors.setdefault(row, f"Final fee of {totals[row]} is not positive")
+        for row in np.flatnonzero(joined >= course_ends).tolist():
+            errors.setdefault(row, f"Join date {joined[row]} is not before the course end date {course_ends[row]}")
+
+        failed = np.zeros(count, dtype=bool)
+        failed[list(errors)] = True
+        installment_counts[failed] = 0
+        course_days = np.maximum((course_ends - joined).astype(np.int64), 0)
+
+        # One row per installment: the student it belongs to and its 0-based number
+        offsets = np.concatenate(([0], np.cumsum(installment_counts)))
+        students = np.repeat(np.arange(count), installment_counts)
+        numbers = np.arange(len(students)) - offsets[:-1][students]
+        per_student = installment_counts[students]
+
+        start_dates = joined[students] + (course_days[students] * numbers // np.maximum(per_student, 1)).astype("timedelta64[D]")
+        window_ends = start_dates + np.timedelta64(self.payment_window_days, "D")
+        student_course_ends = course_ends[students]
+        end_dates = np.where(student_course_ends > start_dates, np.minimum(window_ends, student_course_ends), window_ends)
+
+        student_totals = totals[students]
+        amounts = student_totals // np.maximum(per_student, 1) + np.where(numbers == 0, student_totals % np.maximum(per_student, 1), 0)
+
+        return InstallmentScheduleBatch(
+            version=fee_table.version,
+            fee_typeIDs=fee_typeIDs,
+            quotes=quotes,
+            offsets=offsets,
+            installment_numbers=numbers + 1,
+            amounts=amounts,
+            start_dates=start_dates,
+            end_dates=end_dates,
+            errors=errors,
+        )
+
+    def check_schedules(self, fee_table:FeeTable, requests:Sequence[CalculateCourseFeeRequest], schedules:Sequence[List[Installments]]) -> Dict[int, str]:
+        """
+        Check client-sent schedules against the fee table: the installments of every student
+        must add up to the final fee quoted for the same request. Clients round each
+        installment their own way, so the sum may be off by up to one rupee per installment.
+
+        Returns:
+            Dict[int, str]: why a schedule was rejected, by row; rows that passed are absent
+        """
+        quotes = fee_table.quote_batch(requests)
+        errors: Dict[int, str] = dict(quotes.errors)
+        final_fees = quotes.columns["final_fee"]
+        for row, schedule in enumerate(schedules):
+            if row in errors:
+                continue
+            scheduled = sum(installment.total_installment_amount_to_pay for installment in schedule)
+            if not schedule or abs(scheduled - final_fees[row]) > len(schedule):
+                errors[row] = f"Installments add up to {scheduled}, the final fee is {final_fees[row]:.2f}"
+        return errors
+
+    @staticmethod
+    def rounded_final_fees(quotes:FeeQuoteBatch) -> np.ndarray:
+        """Final fees in whole rupees, rows that could not be quoted are 0"""
+        return np.floor(np.nan_to_num(quotes.columns["final_fee"]) + 0.5).astype(np.int64)
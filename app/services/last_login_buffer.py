@@ -0,0 +1,145 @@
+from app.repositories.auth_repository import AuthRepository
+from app.config.settings import Settings
+from logging import Logger
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import Dict, Optional
+import asyncio
+
+
+class LastLoginBuffer:
+    """
+    Write-behind buffer for `last_login` timestamps, keeping the replicated write off the
+    login critical path.
+
+    Logins are recorded in memory and coalesced per user (the latest timestamp wins); the buffer
+    is flushed every `last_login_flush_interval_seconds` as one unordered bulk write of `$max`
+    updates, so a late or retried flush can never move a timestamp backwards. The buffer holds
+    at most `last_login_buffer_size` users: a login that would overflow it flushes first.
+    Whatever is pending is flushed on shutdown; a crash loses at most one interval of
+    timestamps, which only feed reporting.
+    """
+
+    def __init__(self, repo:AuthRepository, settings:Settings, logger:Logger, collection_name:str = "auth"):
+        self.repo = repo
+        self.logger = logger
+        self.collection_name = collection_name
+        self.flush_interval_seconds = settings.last_login_flush_interval_seconds
+        self.max_size = settings.last_login_buffer_size
+
+        self._pending: Dict[str, datetime] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flusher: Optional[asyncio.Task] = None
+        self.stats = {
+            "recorded": 0,
+            "coalesced": 0,
+            "flushes": 0,
+            "written": 0,
+            "failed_flushes": 0,
+            "dropped": 0,
+            "last_flush_ms": 0.0,
+        }
+
+    async def record(self, user_id:str, timestamp:Optional[datetime] = None):
+        """
+        Queue a user's login time; only waits on the database when the buffer is full
+
+        Args:
+            user_id (str): User's id
+            timestamp (datetime, optional): login time. Defaults to now (UTC).
+        """
+        timestamp = timestamp or datetime.now(timezone.utc)
+        self.stats["recorded"] += 1
+        if user_id in self._pending:
+            self.stats["coalesced"] += 1
+            self._pending[user_id] = max(self._pending[user_id], timestamp)
+            return
+
+        if len(self._pending) >= self.max_size:
+            await self.flush()
+            if len(self._pending) >= self.max_size:
+                # The database is unreachable and the buffer is still full, drop rather than grow
+                self.stats["dropped"] += 1
+                return
+        self._pending[user_id] = timestamp
+
+    async def flush(self) -> int:
+        """
+        Write every pending timestamp as one unordered bulk write
+
+        Returns:
+            int: number of users written
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+
+            started = perf_counter()
+            try:
+                written = await self.repo.bulk_update_last_login(batch, collection_name=self.collection_name)
+            except asyncio.CancelledError:
+                # Cancelled mid-write (a login request going away), keep the batch for the next flush
+                self._requeue(batch)
+                raise
+            self.stats["last_flush_ms"] = round((perf_counter() - started) * 1000, 2)
+            self.stats["flushes"] += 1
+
+            if written is None:
+                self.stats["failed_flushes"] += 1
+                self._requeue(batch)
+                self.logger.error(f"Failed to flush {len(batch)} last_login updates, {len(self._pending)} pending")
+                return 0
+
+            self.stats["written"] += len(batch)
+            return len(batch)
+
+    def _requeue(self, batch:Dict[str, datetime]):
+        """Put a failed batch back, merging with logins recorded meanwhile and respecting the bound"""
+        for user_id, timestamp in batch.items():
+            if user_id in self._pending:
+                self._pending[user_id] = max(self._pending[user_id], timestamp)
+            elif len(self._pending) < self.max_size:
+                self._pending[user_id] = timestamp
+            else:
+                self.stats["dropped"] += 1
+
+    def start(self):
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the periodic flush and write whatever is still pending"""
+        if self._flusher is not None:
+            # Holding the flush lock lets a running flush finish, the flusher is only cancelled while it sleeps
+            async with self._flush_lock:
+                self._flusher.cancel()
+                try:
+                    await self._flusher
+                except asyncio.CancelledError:
+                    pass
+            self._flusher = None
+        flushed = await self.flush()
+        self.logger.info(f"last_login buffer stopped, flushed {flushed} pending updates")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval_seconds)
+            try:
+                await self.flush()
+            except Exception as e:
+                self.logger.error(f"last_login flush failed: {str(e)}")
+
+    def buffer_stats(self) -> Dict:
+        """
+        Pending users and flush counters
+
+        Returns:
+            Dict: buffer statistics
+        """
+        return {
+            "pending": len(self._pending),
+            "max_size": self.max_size,
+            "flush_interval_seconds": self.flush_interval_seconds,
+            **self.stats,
+        }
@@ -0,0 +1,104 @@
+from datetime import date, datetime
+from io import StringIO
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import csv
+import json
+
+# Columns of the report, in CSV order. Installment rows leave `installments` empty, subtotal and
+# total rows leave the per-installment columns empty.
+REPORT_COLUMNS = (
+    "record", "grade", "coaching_mode", "studentID", "student_name", "installment_number", "end_date",
+    "days_overdue", "installments", "total_installment_amount_to_pay", "amount_paid", "outstanding",
+)
+
+
+class OutstandingFeesReport:
+    """
+    Overdue installments as a stream of report records, grouped by grade and coaching mode.
+
+    Rows arrive already ordered by group; a `subtotal` record is emitted every time
+    the group changes and a final `total` record after the last row, so the report never holds
+    more than the current cursor batch and one chunk of output in memory.
+
+    Args:
+        rows (AsyncIterator[dict]): overdue installments sorted by grade and coaching mode
+        as_of (date): day the report is run for, days overdue are counted up to it
+        chunk_rows (int): records rendered into one chunk of the response body
+    """
+
+    def __init__(self, rows:AsyncIterator[dict], as_of:date, chunk_rows:int):
+        self.rows = rows
+        self.as_of = as_of
+        self.chunk_rows = chunk_rows
+
+    async def records(self) -> AsyncIterator[Dict]:
+        group: Optional[Tuple[int, str]] = None
+        subtotal = self.empty_totals()
+        total = self.empty_totals()
+
+        async for row in self.rows:
+            row_group = (row["grade"], row["coaching_mode"])
+            if group is not None and row_group != group:
+                yield self.totals_record("subtotal", group, subtotal)
+                subtotal = self.empty_totals()
+            group = row_group
+
+            end_date = row["end_date"]
+            yield {
+                "record": "installment",
+                "grade": row["grade"],
+                "coaching_mode": row["coaching_mode"],
+                "studentID": str(row["studentID"]),
+                "student_name": row.get("student_name"),
+                "installment_number": row["installment_number"],
+                "end_date": end_date.date().isoformat() if isinstance(end_date, datetime) else str(end_date),
+                "days_overdue": (self.as_of - end_date.date()).days if isinstance(end_date, datetime) else None,
+                "total_installment_amount_to_pay": row["total_installment_amount_to_pay"],
+                "amount_paid": row["amount_paid"],
+                "outstanding": row["outstanding"],
+            }
+            for totals in (subtotal, total):
+                totals["installments"] += 1
+                totals["total_installment_amount_to_pay"] += row["total_installment_amount_to_pay"]
+                totals["amount_paid"] += row["amount_paid"]
+                totals["outstanding"] += row["outstanding"]
+
+        if group is not None:
+            yield self.totals_record("subtotal", group, subtotal)
+        yield self.totals_record("total", None, total)
+
+    async def to_ndjson(self) -> AsyncIterator[str]:
+        """One JSON object per record"""
+        lines: List[str] = []
+        async for record in self.records():
+            lines.append(json.dumps(record) + "\n")
+            if len(lines) >= self.chunk_rows:
+                yield "".join(lines)
+                lines = []
+        if lines:
+            yield "".join(lines)
+
+    async def to_csv(self) -> AsyncIterator[str]:
+        """A header line, then one line per record"""
+        buffer = StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=REPORT_COLUMNS)
+        writer.writeheader()
+        rows = 0
+        async for record in self.records():
+            writer.writerow(record)
+            rows += 1
+            if rows >= self.chunk_rows:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                rows = 0
+        yield buffer.getvalue()
+
+    @staticmethod
+    def empty_totals() -> Dict:
+        return {"installments": 0, "total_installment_amount_to_pay": 0, "amount_paid": 0, "outstanding": 0}
+
+    @staticmethod
+    def totals_record(record:str, group:Optional[Tuple[int, str]], totals:Dict) -> Dict:
+        grade, coaching_mode = group if group is not None else (None, None)
+        return {"record": record, "grade": grade, "coaching_mode": coaching_mode, **totals}
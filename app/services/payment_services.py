@@ -1,57 +1,50 @@
 from fastapi import HTTPException, status
 from logging import Logger
+from typing import List, Optional, Tuple
+from app.config.settings import Settings
 from app.repositories.payment_repository import PaymentRepository
 from app.schemas.admin_client_req_res import CalculateCourseFeeRequest, CalculateCourseFeeResponse
-from app.schemas.fee_schema import FeeConfigurations, DiscountConfigurations
-from app.exceptions.paymentExceptions import FailedToGetCourseFeeConfig, FailedToGetDiscountConfig
-from app.utils.timeFormat import get_remaining_days_month_ratio
-from datetime import datetime
+from app.exceptions.paymentExceptions import FailedToGetCourseFeeConfig, FailedToGetDiscountConfig, GradeNotOffered, UnknownDiscount
+from app.services.fee_table import FeeQuoteBatch, FeeQuoteKey, FeeTable, FeeTableProvider, calculate_tuition_fee
+from app.services.fee_quote_cache import FeeQuoteCache
+from app.services.installment_schedule import InstallmentScheduleBatch, InstallmentScheduler
+from app.services.outstanding_fees_report import OutstandingFeesReport
+from datetime import date, datetime, time, timezone
 
 
 class PaymentService:
-    def __init__(self, payment_repository:PaymentRepository, logger:Logger) -> None:
+    def __init__(self, payment_repository:PaymentRepository, logger:Logger, fee_tables:FeeTableProvider, quote_cache:FeeQuoteCache, scheduler:InstallmentScheduler, settings:Settings) -> None:
         self.logger = logger
         self.repo = payment_repository
-
-        self.course_end_dates_mapping = {
-            6: datetime(2026, 2, 28),
-            7: datetime(2026, 2, 28),
-            8: datetime(2026, 2, 28),
-            9: datetime(2026, 2, 28),
-            10: datetime(2026, 2, 28),
-        }
-
-    def calculate_course_fee(self, studentDetails:CalculateCourseFeeRequest):
+        self.fee_tables = fee_tables
+        self.quote_cache = quote_cache
+        self.scheduler = scheduler
+        self.batch_max_rows = settings.fee_quote_batch_max_rows
+        self.quote_cache_control = f"public, max-age={settings.fee_quote_max_age_seconds}"
+        self.report_batch_size = settings.outstanding_report_batch_size
+
+    async def calculate_course_fee(self, studentDetails:CalculateCourseFeeRequest) -> CalculateCourseFeeResponse:
+        fee_table, key = await self.fee_quote_key(
+            grade=studentDetails.grade,
+            number_of_subjects=len(studentDetails.selectedSubjects),
+            payment_type=studentDetails.payment_type.value,
+            coaching_mode=studentDetails.coaching_mode.value,
+            percentage=studentDetails.prev_year_results.percentage,
+            date_joined=studentDetails.date_joined
+        )
+        return self.quote_for_key(fee_table, key)
+
+    async def fee_quote_key(self, grade:int, number_of_subjects:int, payment_type:str, coaching_mode:str, percentage:float, date_joined:datetime) -> Tuple[FeeTable, FeeQuoteKey]:
+        """
+        The current fee table and the normalised key of a quote, enough to answer conditional
+        requests (the key's ETag) without computing the quote
+
+        Raises:
+            HTTPException: 500 when the fee or discount config is missing
+        """
         try:
-            course_fee = self.get_course_fee_by_class(studentDetails.grade, len(studentDetails.selectedSubjects))
-            discount = self.get_discount(
-                studentDetails.payment_type.value,
-                studentDetails.coaching_mode.value,
-                studentDetails.prev_year_results.model_dump()['percentage']
-            )
-
-            total_tuition_fee = self.calculate_tuition_fee(
-                    studentDetails.date_joined,
-                    self.course_end_dates_mapping[studentDetails.grade],
-                    course_fee['fee']['monthly_fee']
-                ) * (course_fee['subject_preference_fee']/100)
-            
-            total_fee = course_fee['fee']['admission_fee'] + course_fee['fee']['fixed_amt'] + total_tuition_fee
-            total_dicount = discount['payment_type_discount'] + discount['coaching_mode_discount'] + discount['scholarship_discount']
-            final_fee = total_fee - (total_tuition_fee * (total_dicount/100))
-
-            response = CalculateCourseFeeResponse(
-                admission_fee=course_fee['fee']['admission_fee'],
-                fixed_amt=course_fee['fee']['fixed_amt'],
-                tuition_fee=total_tuition_fee,
-                discount={
-                    "total_discount": total_dicount,
-                    "discounts_applied": discount
-                },
-                total_fee=total_fee,
-                final_fee=final_fee
-            )
-            return response
+            fee_table = await self.fee_tables.current()
+            return fee_table, fee_table.quote_key(grade, number_of_subjects, payment_type, coaching_mode, percentage, date_joined)
 
         except FailedToGetCourseFeeConfig as e:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
@@ -59,71 +52,81 @@ class PaymentService:
         except FailedToGetDiscountConfig as e:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
-    def get_course_fee_by_class(self, grade:int, number_of_selected_subjects:int):
-        course_fee_config:FeeConfigurations = self.repo.get_course_fees_config()
-
-        if course_fee_config is None:
-            raise FailedToGetCourseFeeConfig("Failed to get course fee config from the db")
-
-        number_of_selected_subjects = min(len(course_fee_config['subject_preference_fee']), number_of_selected_subjects)
-        return {
-            "fee": course_fee_config['fees'][f'{grade}'],
-            "subject_preference_fee": course_fee_config['subject_preference_fee'][f'{number_of_selected_subjects}']
-        }
-    
-    def get_discount(self, payment_type:str, coaching_mode:str, prev_year_results:int):
-        discount_config:DiscountConfigurations = self.repo.get_discount_config()
-        if discount_config is None:
-            raise FailedToGetDiscountConfig("Failed to get discount config from the db")  
-
-        def calculate_scholarship(prev_year_results:int, scholarship_discount:dict[str, int]):
-            if prev_year_results >= 90:
-                return scholarship_discount['high']
-            elif prev_year_results >= 85:
-                return scholarship_discount['medium']
-            elif prev_year_results >= 80:
-                return scholarship_discount['low']
-            else:
-                return scholarship_discount['none']
-             
-        return {
-            "payment_type_discount": discount_config['payment_type_discount'][f'{payment_type}'],
-            "coaching_mode_discount": discount_config['coaching_mode_discount'][f'{coaching_mode}'],
-            "scholarship_discount": calculate_scholarship(prev_year_results, discount_config['scholarship_discount'])
-        }
-    
-    def calculate_tuition_fee(self, current_date:datetime, end_date:datetime, monthly_fee:float):
-        
-        # If already past end_date
-        if current_date >= end_date:
-            return 0.0
+    def quote_for_key(self, fee_table:FeeTable, key:FeeQuoteKey) -> CalculateCourseFeeResponse:
+        try:
+            return self.quote_cache.quote_for_key(fee_table, key).to_response()
 
-        total_fee = 0.0
+        except GradeNotOffered as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-        # 1. Pro-rata for the current partial month
-        remaining_days_ratio = get_remaining_days_month_ratio(current_date)
-        partial_curr_month_fee = remaining_days_ratio * monthly_fee
-        total_fee += partial_curr_month_fee
+        except UnknownDiscount as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
+    async def calculate_course_fees(self, requests:List[CalculateCourseFeeRequest]) -> FeeQuoteBatch:
+        """
+        Quote a batch of students in one pass over the compiled fee table
+
+        Raises:
+            HTTPException: 413 when the batch is larger than FEE_QUOTE_BATCH_MAX_ROWS
+        """
+        if len(requests) > self.batch_max_rows:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"At most {self.batch_max_rows} quotes per batch"
+            )
+        try:
+            fee_table = await self.fee_tables.current()
+            return fee_table.quote_batch(requests)
 
-        # 2. Iterate full months between next month and end_date's previous month
-        next_month = (current_date.month % 12) + 1
+        except FailedToGetCourseFeeConfig as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
-        # current year will increment only when the current month is December
-        # by this we can deciede whether the next month is in the same year or not
-        next_month_year = current_date.year + (1 if next_month == 1 else 0)
-        
-        # 3. Get first of end_date's month
-        end_year = end_date.year
-        end_month = end_date.month
+        except FailedToGetDiscountConfig as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+    async def generate_installment_schedules(self, requests:List[CalculateCourseFeeRequest]) -> InstallmentScheduleBatch:
+        """
+        Installment schedules of a batch of students, derived from their quoted final fee,
+        fee type and course end date in one pass
+
+        Raises:
+            HTTPException: 413 when the batch is larger than FEE_QUOTE_BATCH_MAX_ROWS
+        """
+        if len(requests) > self.batch_max_rows:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"At most {self.batch_max_rows} schedules per batch"
+            )
+        try:
+            fee_table = await self.fee_tables.current()
+            return self.scheduler.schedule_batch(fee_table, requests)
 
-        # 4. Count full months between next_month_date & end_date's previous month
-        full_months = (end_year - next_month_year) * 12 + (end_month - next_month)
-        total_fee += full_months * monthly_fee
+        except FailedToGetCourseFeeConfig as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+        except FailedToGetDiscountConfig as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
-        # 5. Partial last month (if end_date is not the first of its month)
-        days_in_end_month_ratio = get_remaining_days_month_ratio(end_date)
-        partial_end_month_fee = days_in_end_month_ratio * monthly_fee
-        total_fee += partial_end_month_fee
+    def outstanding_fees_report(self, as_of:Optional[date] = None, grade:Optional[int] = None) -> OutstandingFeesReport:
+        """
+        Installments still unpaid after their payment window ended, grouped by grade and coaching
+        mode with subtotals. Nothing is read until the report is iterated, and then one cursor
+        batch at a time.
+
+        Args:
+            as_of (Optional[date]): windows that ended before this day are overdue, today (UTC) by default
+            grade (Optional[int]): only this grade
+
+        Returns:
+            OutstandingFeesReport: the report, rendered with `to_ndjson` or `to_csv`
+        """
+        as_of = as_of or datetime.now(timezone.utc).date()
+        rows = self.repo.stream_outstanding_installments(
+            due_before=datetime.combine(as_of, time.min),
+            batch_size=self.report_batch_size,
+            grade=grade
+        )
+        return OutstandingFeesReport(rows, as_of=as_of, chunk_rows=self.report_batch_size)
 
-        return total_fee
\ No newline at end of file
+    def calculate_tuition_fee(self, current_date:datetime, end_date:datetime, monthly_fee:float):
+        return calculate_tuition_fee(current_date, end_date, monthly_fee)
@@ -0,0 +1,54 @@
+from app.config.settings import Settings
+from app.core.cache import TTLCache
+from bson import ObjectId
+from itertools import combinations
+from typing import Dict, Iterable, Optional, Tuple
+
+# Optional sections of a student profile, the student document itself is always included
+PROFILE_SECTIONS = ("subjects", "performance", "installments")
+
+
+class StudentProfileCache:
+    """
+    Per-process cache of assembled student profiles, keyed on the student and the sorted
+    sections that were asked for.
+
+    Anything writing to a student's documents (profile, subject mappings, trackers,
+    installments) calls `invalidate` with the students it touched; since there are only a
+    handful of section selections, that drops every cached variant of a student in O(1).
+    Other workers keep their copy until it expires, which bounds how stale a profile can get.
+
+    Args:
+        settings (Settings): STUDENT_PROFILE_CACHE_SIZE and STUDENT_PROFILE_CACHE_TTL_SECONDS
+    """
+
+    def __init__(self, settings:Settings):
+        self._profiles: TTLCache[Tuple[ObjectId, Tuple[str, ...]], Dict] = TTLCache(
+            settings.student_profile_cache_size, settings.student_profile_cache_ttl_seconds
+        )
+        self._selections = [
+            selection for size in range(len(PROFILE_SECTIONS) + 1) for selection in combinations(PROFILE_SECTIONS, size)
+        ]
+
+    def get(self, student_objID:ObjectId, sections:Tuple[str, ...]) -> Optional[Dict]:
+        return self._profiles.get((student_objID, sections))
+
+    def set(self, student_objID:ObjectId, sections:Tuple[str, ...], profile:Dict):
+        self._profiles.set((student_objID, sections), profile)
+
+    def invalidate(self, student_objIDs:Iterable[ObjectId]) -> int:
+        """Drop every cached profile of the given students, returns how many were dropped"""
+        dropped = 0
+        for student_objID in student_objIDs:
+            for selection in self._selections:
+                dropped += self._profiles.pop((student_objID, selection)) is not None
+        return dropped
+
+    def cache_stats(self) -> Dict:
+        """
+        Size and hit rate of the profile cache
+
+        Returns:
+            Dict: cache statistics
+        """
+        return self._profiles.cache_stats()
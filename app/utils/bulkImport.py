@@ -0,0 +1,119 @@
+import codecs
+import csv
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+
+# (row number, parsed row or the reason it could not be parsed)
+ParsedRow = Tuple[int, Union[Dict[str, Any], ValueError]]
+
+CSV_CONTENT_TYPES = ("text/csv", "application/csv")
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+# CSV columns holding a list that may be written as a plain `;`-separated cell instead of JSON
+CSV_LIST_COLUMNS = {"selectedSubjects"}
+
+
+async def iter_lines(chunks:AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into text lines without ever holding more than one line in memory"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def parse_ndjson(chunks:AsyncIterator[bytes]) -> AsyncIterator[ParsedRow]:
+    """Parse an NDJSON upload, one JSON object per line; blank lines are skipped"""
+    row_number = 0
+    async for line in iter_lines(chunks):
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            row = json.loads(line)
+            if not isinstance(row, dict):
+                raise ValueError("row is not a JSON object")
+            yield row_number, row
+        except ValueError as e:
+            yield row_number, ValueError(f"Invalid JSON: {str(e)}")
+
+
+async def parse_csv(chunks:AsyncIterator[bytes]) -> AsyncIterator[ParsedRow]:
+    """
+    Parse a CSV upload whose header names the fields with dotted paths
+    (`studentProfile.name`, `studentProfile.prev_year_results.percentage`, ...).
+    Cells starting with `[` or `{` are decoded as JSON (e.g. `installments`), list columns
+    also accept `;`-separated values and empty cells become None.
+    Quoted cells may span several lines.
+    """
+    header: Optional[List[str]] = None
+    record = ""
+    row_number = 0
+    async for line in iter_lines(chunks):
+        record = f"{record}\n{line}" if record else line
+        # An odd number of quotes means a quoted cell continues on the next line
+        if record.count('"') % 2:
+            continue
+        text, record = record, ""
+        if not text.strip():
+            continue
+
+        cells = next(csv.reader([text]))
+        if header is None:
+            header = [column.strip() for column in cells]
+            continue
+
+        row_number += 1
+        if len(cells) != len(header):
+            yield row_number, ValueError(f"Expected {len(header)} columns, got {len(cells)}")
+            continue
+        try:
+            yield row_number, unflatten_row(dict(zip(header, cells)))
+        except ValueError as e:
+            yield row_number, e
+
+    if record:
+        row_number += 1
+        yield row_number, ValueError("Unterminated quoted cell at end of upload")
+
+
+def unflatten_row(flat:Dict[str, str]) -> Dict[str, Any]:
+    """Turn `{"a.b": "1"}` into `{"a": {"b": "1"}}`, decoding JSON and list cells on the way"""
+    row: Dict[str, Any] = {}
+    for column, cell in flat.items():
+        cell = cell.strip()
+        if cell == "":
+            value = None
+        elif cell[0] in "[{":
+            try:
+                value = json.loads(cell)
+            except ValueError as e:
+                raise ValueError(f"Invalid JSON in column {column}: {str(e)}")
+        elif column in CSV_LIST_COLUMNS:
+            value = [item.strip() for item in cell.split(";") if item.strip()]
+        else:
+            value = cell
+
+        *parents, leaf = column.split(".")
+        node = row
+        for parent in parents:
+            node = node.setdefault(parent, {})
+            if not isinstance(node, dict):
+                raise ValueError(f"Column {column} conflicts with a non-object column")
+        node[leaf] = value
+    return row
+
+
+def row_parser(content_type:str):
+    """Pick the parser for an upload's content type, None if the format is not supported"""
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type in CSV_CONTENT_TYPES:
+        return parse_csv
+    if media_type in NDJSON_CONTENT_TYPES:
+        return parse_ndjson
+    return None
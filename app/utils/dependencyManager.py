@@ -4,17 +4,24 @@ from dependency_injector.wiring import Provide
 
 from logging import Logger
 from app.config.settings import Settings
-from app.db.client import MongoDBClient
+from app.db.async_client import AsyncMongoDBClient
+from app.repositories.base_repository import BaseRepository
+from app.db.config_cache import ConfigCache
 
 from app.core.security import Security
+from app.core.rate_limiter import LoginRateLimiter
 from app.dependencies.container import Container
 from app.dependencies.jwtAuth import get_current_user_id
 
 
 # Services
 from app.services.auth_service import AuthService
+from app.services.last_login_buffer import LastLoginBuffer
 from app.services.admin_services import AdminService
 from app.services.payment_services import PaymentService
+from app.services.fee_table import FeeTableProvider
+from app.services.fee_quote_cache import FeeQuoteCache
+from app.services.student_profile_cache import StudentProfileCache
 
 
 class Dependencies:
@@ -24,8 +31,15 @@ class Dependencies:
     """
     LoggerDependency = Annotated[Logger, Depends(Provide[Container.logger])]
     SettingsDependency = Annotated[Settings, Depends(Provide[Container.settings])]
-    MongoDBClientDependency = Annotated[MongoDBClient, Depends(Provide[Container.db])]
+    MongoDBClientDependency = Annotated[AsyncMongoDBClient, Depends(Provide[Container.db])]
+    BaseRepositoryDependency = Annotated[BaseRepository, Depends(Provide[Container.baseDB])]
+    ConfigCacheDependency = Annotated[ConfigCache, Depends(Provide[Container.config_cache])]
     SecurityDependency = Annotated[Security, Depends(Provide[Container.security])]
+    LoginRateLimiterDependency = Annotated[LoginRateLimiter, Depends(Provide[Container.login_rate_limiter])]
+    LastLoginBufferDependency = Annotated[LastLoginBuffer, Depends(Provide[Container.last_login_buffer])]
+    FeeTableDependency = Annotated[FeeTableProvider, Depends(Provide[Container.fee_tables])]
+    FeeQuoteCacheDependency = Annotated[FeeQuoteCache, Depends(Provide[Container.fee_quote_cache])]
+    StudentProfileCacheDependency = Annotated[StudentProfileCache, Depends(Provide[Container.student_profile_cache])]
     AuthService = Annotated[AuthService, Depends(Provide[Container.auth_service])]
     JWTAuthDependency = Annotated[str, Depends(get_current_user_id)]
     AdminService = Annotated[AdminService, Depends(Provide[Container.admin_service])]
@@ -0,0 +1,17 @@
+from typing import Optional
+
+
+def etag_matches(if_none_match:Optional[str], etag:str) -> bool:
+    """
+    Whether an `If-None-Match` header matches an entity tag, using the weak comparison
+    conditional GETs call for (a `W/` prefix is ignored)
+
+    Args:
+        if_none_match (Optional[str]): header value, a comma-separated list of tags or `*`
+        etag (str): current entity tag of the resource, quoted
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag.removeprefix("W/") for tag in if_none_match.split(","))
@@ -0,0 +1,60 @@
+from app.exceptions.adminExceptions import InvalidListQuery
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from bson import ObjectId
+from hashlib import sha256
+from typing import Any, Dict, List, Optional, Tuple
+import json
+
+# Sort orders a listing can be paged in, each ends with `_id` so the order is total
+KEYSET_ORDERS = {
+    "_id": ("_id",),
+    "grade": ("grade", "_id"),
+}
+
+
+def filters_digest(filters:Dict[str, Any]) -> str:
+    """Short fingerprint of a listing's filters, a cursor is only valid with the filters it was issued for"""
+    return sha256(json.dumps(filters, sort_keys=True, default=str).encode()).hexdigest()[:12]
+
+
+def encode_cursor(order:str, last:Dict[str, Any], filters:Dict[str, Any]) -> str:
+    """Opaque cursor pointing after `last`, the last document of a page"""
+    position = [str(last[field]) if isinstance(last[field], ObjectId) else last[field] for field in KEYSET_ORDERS[order]]
+    payload = json.dumps({"o": order, "p": position, "f": filters_digest(filters)}, separators=(",", ":"))
+    return urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor:str, order:str, filters:Dict[str, Any]) -> Tuple:
+    """
+    Keyset position stored in a cursor
+
+    Raises:
+        InvalidListQuery: When the cursor is malformed or was issued for another order or other filters
+    """
+    try:
+        payload = json.loads(urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        position = payload["p"]
+        if payload["o"] != order or payload["f"] != filters_digest(filters) or len(position) != len(KEYSET_ORDERS[order]):
+            raise InvalidListQuery("Cursor was issued for a different order or different filters")
+        return tuple(position[:-1]) + (ObjectId(position[-1]),)
+    except InvalidListQuery:
+        raise
+    except Exception:
+        raise InvalidListQuery("Malformed cursor")
+
+
+def keyset_query(order:str, position:Optional[Tuple]) -> Dict:
+    """Filter selecting the documents after `position` in `order`, an empty filter on the first page"""
+    if position is None:
+        return {}
+    fields = KEYSET_ORDERS[order]
+    clauses: List[Dict] = []
+    for depth, field in enumerate(fields):
+        clause = {fields[index]: position[index] for index in range(depth)}
+        clause[field] = {"$gt": position[depth]}
+        clauses.append(clause)
+    return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+
+def keyset_sort(order:str) -> List[Tuple[str, int]]:
+    return [(field, 1) for field in KEYSET_ORDERS[order]]
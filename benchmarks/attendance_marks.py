@@ -0,0 +1,111 @@
+"""
+Bulk attendance marking throughput against a real mongod.
+
+Every class is a roster of `--students` trackers of one subject; marking it is what
+`POST /v1/admin/attendance` does: one unordered `bulk_write` of the updates built by
+`AdminRepository.attendance_updates`. `--concurrency` teachers submit their classes at the same
+time. "per mark" sends the same updates one round trip each for comparison.
+
+After the timed rounds every class is submitted again with the same date: nothing may match,
+and every tracker must have counted each date exactly once. The target is 10k marks per minute.
+
+Usage (against a local mongod):
+    python -m benchmarks.attendance_marks --uri mongodb://localhost:27017 --classes 250 --students 40 --concurrency 10
+"""
+import argparse
+import asyncio
+import statistics
+from datetime import datetime
+from time import perf_counter
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING, AsyncMongoClient, MongoClient
+
+from app.repositories.admin_repository import AdminRepository
+
+DATABASE = "benchmarks"
+COLLECTION = "attendance-trackers"
+SUBJECT = "MATHS009"
+YEAR_BATCH = 2025
+
+Roster = List[Tuple[ObjectId, bool]]
+
+
+def seed(uri: str, classes: int, students: int) -> List[Roster]:
+    collection = MongoClient(uri)[DATABASE][COLLECTION]
+    collection.drop()
+    rosters = [[(ObjectId(), (index + student) % 7 != 0) for student in range(students)] for index in range(classes)]
+    collection.insert_many([
+        {"studentID": studentID, "grade": 9, "subjectID": SUBJECT, "monthly_remarks": {}, "monthly_attendance": {}, "year_batch": YEAR_BATCH}
+        for roster in rosters for studentID, _ in roster
+    ])
+    collection.create_index([("studentID", ASCENDING), ("subjectID", ASCENDING), ("year_batch", ASCENDING)])
+    return rosters
+
+
+async def run(submit: Callable[[Roster], Awaitable[int]], rosters: List[Roster], concurrency: int) -> Dict:
+    latencies: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def timed_submit(roster: Roster) -> int:
+        async with semaphore:
+            start = perf_counter()
+            matched = await submit(roster)
+            latencies.append((perf_counter() - start) * 1000)
+            return matched
+
+    start = perf_counter()
+    matched = sum(await asyncio.gather(*(timed_submit(roster) for roster in rosters)))
+    elapsed = perf_counter() - start
+
+    latencies.sort()
+    return {
+        "marks_counted": matched,
+        "marks_per_minute": round(matched * 60 / elapsed),
+        "p50_class_ms": round(statistics.median(latencies), 2),
+        "p99_class_ms": round(latencies[max(int(len(latencies) * 0.99) - 1, 0)], 2),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    rosters = seed(args.uri, args.classes, args.students)
+    client = AsyncMongoClient(args.uri, maxPoolSize=args.concurrency)
+    collection = client[DATABASE][COLLECTION]
+    bulk_date, per_mark_date = datetime(2025, 7, 14), datetime(2025, 7, 15)
+
+    async def bulk(roster: Roster) -> int:
+        updates = AdminRepository.attendance_updates(SUBJECT, YEAR_BATCH, bulk_date, roster)
+        return (await collection.bulk_write(updates, ordered=False)).matched_count
+
+    async def per_mark(roster: Roster) -> int:
+        matched = 0
+        for update in AdminRepository.attendance_updates(SUBJECT, YEAR_BATCH, per_mark_date, roster):
+            matched += (await collection.bulk_write([update])).matched_count
+        return matched
+
+    per_mark_result = await run(per_mark, rosters, args.concurrency)
+    bulk_result = await run(bulk, rosters, args.concurrency)
+    resubmitted = await run(bulk, rosters, args.concurrency)
+
+    marks = args.classes * args.students
+    counted = await collection.count_documents({"monthly_attendance.7.total_classes": 2, "monthly_attendance.7.marked_dates": {"$size": 2}})
+    await client.close()
+
+    print(f"{args.classes} classes x {args.students} students = {marks} marks, {args.concurrency} concurrent submissions")
+    print(f"{'metric':<18}{'per mark':>12}{'bulk':>12}")
+    for metric in bulk_result:
+        print(f"{metric:<18}{per_mark_result[metric]:>12}{bulk_result[metric]:>12}")
+    print(f"re-submitted marks counted: {resubmitted['marks_counted']} (expected 0)")
+    print(f"trackers counting both dates once: {counted} of {marks}")
+    assert bulk_result["marks_counted"] == marks, "bulk marking missed trackers"
+    assert resubmitted["marks_counted"] == 0 and counted == marks, "re-submitted marks were counted twice"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--classes", type=int, default=250)
+    parser.add_argument("--students", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=10)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,115 @@
+"""
+Before/after concurrency benchmark for the MongoDB data layer.
+
+"before" runs the blocking pymongo `find_one` inside an `async def` handler, exactly like the
+routes did when they went through `MongoDBClient`. "after" awaits the same query through
+pymongo's asyncio driver, which is what `AsyncMongoDBClient` uses.
+
+Every handler is scheduled on a single event loop (one uvicorn worker) with `--concurrency`
+requests in flight. A probe task measures event loop lag: with the blocking driver it grows
+with every round trip, with the async driver it stays near zero.
+
+Usage (against a local mongod):
+    python -m benchmarks.db_concurrency --uri mongodb://localhost:27017 --requests 2000 --concurrency 200
+
+Use `--server-delay-ms` to emulate an Atlas round trip with a server side `sleep()` inside `$where`.
+"""
+import argparse
+import asyncio
+import statistics
+from time import perf_counter
+from typing import Awaitable, Callable, List
+
+from pymongo import AsyncMongoClient, MongoClient
+
+DATABASE = "benchmarks"
+COLLECTION = "db-concurrency"
+
+
+def build_query(server_delay_ms: int) -> dict:
+    query = {"userID": "bench-user-1"}
+    if server_delay_ms > 0:
+        query["$where"] = f"sleep({server_delay_ms}) || true"
+    return query
+
+
+def seed(uri: str, documents: int) -> None:
+    collection = MongoClient(uri)[DATABASE][COLLECTION]
+    collection.drop()
+    collection.insert_many([
+        {"userID": f"bench-user-{i}", "hashed_pswd": "x" * 97, "is_active": True} for i in range(documents)
+    ])
+    collection.create_index("userID", unique=True)
+
+
+async def measure_loop_lag(stop: asyncio.Event, samples: List[float], interval: float = 0.005) -> None:
+    while not stop.is_set():
+        start = perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, perf_counter() - start - interval) * 1000)
+
+
+async def run(handler: Callable[[], Awaitable[None]], requests: int, concurrency: int) -> dict:
+    latencies: List[float] = []
+    lag_samples: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+    stop = asyncio.Event()
+
+    async def timed_request():
+        async with semaphore:
+            start = perf_counter()
+            await handler()
+            latencies.append((perf_counter() - start) * 1000)
+
+    probe = asyncio.create_task(measure_loop_lag(stop, lag_samples))
+    start = perf_counter()
+    await asyncio.gather(*(timed_request() for _ in range(requests)))
+    elapsed = perf_counter() - start
+    stop.set()
+    await probe
+
+    latencies.sort()
+    return {
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 2),
+        "max_loop_lag_ms": round(max(lag_samples, default=0.0), 2),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    seed(args.uri, args.documents)
+    query = build_query(args.server_delay_ms)
+
+    sync_collection = MongoClient(args.uri, maxPoolSize=args.concurrency)[DATABASE][COLLECTION]
+
+    async def blocking_handler():
+        sync_collection.find_one(query)
+
+    async_client = AsyncMongoClient(args.uri, maxPoolSize=args.concurrency)
+    async_collection = async_client[DATABASE][COLLECTION]
+
+    async def async_handler():
+        await async_collection.find_one(query)
+
+    # Warm both pools so connection set-up does not skew the first rounds
+    await run(blocking_handler, args.concurrency, args.concurrency)
+    await run(async_handler, args.concurrency, args.concurrency)
+
+    before = await run(blocking_handler, args.requests, args.concurrency)
+    after = await run(async_handler, args.requests, args.concurrency)
+    await async_client.close()
+
+    print(f"{'metric':<18}{'before (sync)':>16}{'after (async)':>16}")
+    for metric in before:
+        print(f"{metric:<18}{before[metric]:>16}{after[metric]:>16}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--documents", type=int, default=10_000)
+    parser.add_argument("--server-delay-ms", type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
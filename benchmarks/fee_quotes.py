@@ -0,0 +1,98 @@
+"""
+Per-row vs batch fee quotes over the same compiled `FeeTable`.
+
+"per row" is what `GET /v1/fee/calculate-course-fee` does for every request: `FeeTable.quote`
+followed by building the `CalculateCourseFeeResponse`. "batch" is
+`POST /v1/fee/calculate-course-fee/batch`: `FeeTable.quote_batch` over the whole list, then the
+columnar payload. Request parsing is left out of both, it costs the same either way.
+
+The requests cover every grade, subject count, payment type, coaching mode and scholarship
+band, with join dates spread over a year, and the results of both paths are checked to match.
+
+Usage:
+    python -m benchmarks.fee_quotes --rows 10000 --repeat 5
+"""
+import argparse
+import random
+from datetime import datetime, timedelta
+from time import perf_counter
+from typing import Callable, List
+
+from app.schemas.admin_client_req_res import CalculateCourseFeeRequest
+from app.schemas.fee_schema import DiscountConfigurations, FeeConfigurations
+from app.services.fee_table import FeeTable
+
+FEE_CONFIG = FeeConfigurations(**{
+    "_id": "course_fee",
+    "fees": {str(grade): {"admission_fee": 1000, "fixed_amt": 500, "monthly_fee": 2000 + 100 * grade, "course_duration": 10} for grade in range(6, 11)},
+    "subject_preference_fee": {"1": 50, "2": 80, "3": 100},
+})
+DISCOUNT_CONFIG = DiscountConfigurations(**{
+    "_id": "discount",
+    "payment_type_discount": {"one_time": 10, "two_time": 5, "four_time": 0},
+    "coaching_mode_discount": {"online": 5, "offline": 0},
+    "scholarship_discount": {"high": 15, "medium": 10, "low": 5, "none": 0},
+})
+
+
+def quote_requests(rows: int) -> List[CalculateCourseFeeRequest]:
+    rng = random.Random(42)
+    return [
+        CalculateCourseFeeRequest(
+            grade=rng.randint(6, 10),
+            date_joined=datetime(2025, 3, 1) + timedelta(days=rng.randint(0, 365)),
+            prev_year_results={"percentage": rng.uniform(60, 100), "year": 2024, "board": "CBSE"},
+            selectedSubjects=["maths", "science", "english"][:rng.randint(1, 3)],
+            payment_type=rng.choice(["one_time", "two_time", "four_time"]),
+            coaching_mode=rng.choice(["online", "offline"]),
+        )
+        for _ in range(rows)
+    ]
+
+
+def best_of(func: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        func()
+        timings.append(perf_counter() - start)
+    return min(timings)
+
+
+def main(rows: int, repeat: int) -> None:
+    table = FeeTable.compile(FEE_CONFIG, DISCOUNT_CONFIG, version="bench")
+    requests = quote_requests(rows)
+
+    def per_row():
+        return [
+            table.quote(
+                grade=request.grade,
+                number_of_subjects=len(request.selectedSubjects),
+                payment_type=request.payment_type.value,
+                coaching_mode=request.coaching_mode.value,
+                percentage=request.prev_year_results.percentage,
+                date_joined=request.date_joined,
+            ).to_response()
+            for request in requests
+        ]
+
+    def batch():
+        return table.quote_batch(requests).to_columnar()
+
+    expected = [response.final_fee for response in per_row()]
+    assert batch()["columns"]["final_fee"] == expected, "batch quotes differ from per-row quotes"
+
+    per_row_seconds = best_of(per_row, repeat)
+    batch_seconds = best_of(batch, repeat)
+    print(f"{'path':<10}{'total ms':>10}{'us/quote':>10}")
+    print(f"{'per row':<10}{per_row_seconds * 1e3:>10.1f}{per_row_seconds * 1e6 / rows:>10.2f}")
+    print(f"{'batch':<10}{batch_seconds * 1e3:>10.1f}{batch_seconds * 1e6 / rows:>10.2f}")
+    print(f"speedup: {per_row_seconds / batch_seconds:.1f}x at {rows} rows")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
@@ -0,0 +1,101 @@
+"""
+Encode/decode throughput of the JWT backends on our access token shape.
+
+"jose (per call)" is how `Security` used python-jose before token backends: the secret is
+passed as a string and turned into a key object on every call. The other rows are the
+backends in `app.core.token_backends`, which prepare their key objects once.
+
+HS256 always runs. RS256 and ES256 run when `cryptography` is installed (keys are generated in
+memory); the PyJWT rows run when PyJWT is installed.
+
+Usage:
+    python -m benchmarks.jwt_backends --iterations 5000
+"""
+import argparse
+from datetime import datetime, timedelta, timezone
+from time import perf_counter
+from typing import Callable, Dict, List, Tuple
+
+from jose import jwt as jose_jwt
+
+from app.core.token_backends import JoseTokenBackend, PyJWTTokenBackend, TokenBackend, pyjwt
+
+SECRET = "benchmark-secret-of-a-realistic-length-0123456789"
+
+
+def token_claims() -> Dict:
+    issued_at = datetime.now(timezone.utc)
+    return {"sub": "STU2025-0042", "typ": "access", "iat": issued_at, "exp": issued_at + timedelta(minutes=30)}
+
+
+def asymmetric_keys() -> Dict[str, str]:
+    try:
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import ec, rsa
+    except ImportError:
+        return {}
+
+    def pem(private_key) -> str:
+        return private_key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        ).decode()
+
+    return {
+        "RS256": pem(rsa.generate_private_key(public_exponent=65537, key_size=2048)),
+        "ES256": pem(ec.generate_private_key(ec.SECP256R1())),
+    }
+
+
+class JosePerCallBackend(TokenBackend):
+    """The pre-backend code path, kept here as the baseline"""
+    name = "jose (per call)"
+
+    def __init__(self, algorithm: str, signing_key: str, verification_key=None):
+        super().__init__(algorithm, signing_key, verification_key)
+        self.key = signing_key
+
+    def encode(self, claims: Dict) -> str:
+        return jose_jwt.encode(claims, self.key, algorithm=self.algorithm)
+
+    def decode(self, token: str) -> Dict:
+        return jose_jwt.decode(token, self.key, algorithms=[self.algorithm])
+
+    def public_jwk(self):
+        return None
+
+
+def ops_per_second(func: Callable[[], object], iterations: int) -> float:
+    for _ in range(min(iterations // 10, 200)):
+        func()
+    start = perf_counter()
+    for _ in range(iterations):
+        func()
+    return iterations / (perf_counter() - start)
+
+
+def candidates() -> List[Tuple[str, TokenBackend]]:
+    backends = [JosePerCallBackend, JoseTokenBackend] + ([PyJWTTokenBackend] if pyjwt else [])
+    keys = {"HS256": SECRET, **asymmetric_keys()}
+    rows = []
+    for algorithm, key in keys.items():
+        for backend in backends:
+            if backend is JosePerCallBackend and algorithm != "HS256":
+                continue
+            rows.append((algorithm, backend(algorithm, key)))
+    return rows
+
+
+def main(iterations: int) -> None:
+    claims = token_claims()
+    print(f"{'algorithm':<10}{'backend':<18}{'encode/s':>12}{'decode/s':>12}{'token bytes':>13}")
+    for algorithm, backend in candidates():
+        token = backend.encode(claims)
+        encode_rate = ops_per_second(lambda: backend.encode(claims), iterations)
+        decode_rate = ops_per_second(lambda: backend.decode(token), iterations)
+        print(f"{algorithm:<10}{backend.name:<18}{encode_rate:>12.0f}{decode_rate:>12.0f}{len(token):>13}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=5_000)
+    main(parser.parse_args().iterations)
@@ -0,0 +1,113 @@
+"""
+Per-login cost of the user lookup, before and after the lean credentials lookup.
+
+"before" is what `AuthRepository.get_user_by_id` does: fetch the whole auth document and
+validate it through `Auth(**user)`. "after" is `AuthRepository.get_login_credentials`: fetch
+only userID, hashed_pswd and is_active through the unique userID index and build
+`LoginCredentials` with `model_construct`, skipping validation.
+
+Without `--uri` the server reply is simulated with BSON bytes shaped like our auth documents,
+so the client side cost (BSON decode + model construction) and the reply size can be
+measured anywhere. With `--uri` the same lookups also run against a real server, and the
+explain output shows the projected query reading one index key and one document.
+
+Usage:
+    python -m benchmarks.login_lookup --iterations 50000 --rate 10000
+    python -m benchmarks.login_lookup --uri mongodb://localhost:27017
+"""
+import argparse
+import asyncio
+from datetime import datetime, timezone
+from time import perf_counter, process_time
+from typing import Callable
+
+from bson import ObjectId, decode, encode
+from passlib.hash import argon2
+from pymongo import AsyncMongoClient
+
+from app.repositories.auth_repository import AuthRepository
+from app.schemas.auth_schema import Auth, LoginCredentials
+
+DATABASE = "benchmarks"
+COLLECTION = "login-lookup"
+
+
+def auth_document(user_id: str) -> dict:
+    return {
+        "_id": ObjectId(),
+        "userID": user_id,
+        "hashed_pswd": argon2.using(rounds=1, memory_cost=1024, parallelism=1).hash("benchmark"),
+        "is_active": True,
+        "last_login": datetime.now(timezone.utc),
+    }
+
+
+def cpu_per_call_us(func: Callable[[], object], iterations: int) -> float:
+    for _ in range(min(iterations, 1000)):
+        func()
+    start = process_time()
+    for _ in range(iterations):
+        func()
+    return (process_time() - start) * 1e6 / iterations
+
+
+def client_side(iterations: int, rate: int) -> None:
+    document = auth_document("bench-user-1")
+    full_reply = encode(document)
+    projected_reply = encode({field: document[field] for field in ("userID", "hashed_pswd", "is_active")})
+
+    before_us = cpu_per_call_us(lambda: Auth(**decode(full_reply)), iterations)
+    after_us = cpu_per_call_us(lambda: LoginCredentials.model_construct(**decode(projected_reply)), iterations)
+
+    rows = {
+        "cpu_per_login_us": (round(before_us, 2), round(after_us, 2)),
+        "reply_bytes": (len(full_reply), len(projected_reply)),
+        f"cpu_ms_per_min@{rate}": (round(before_us * rate / 1000, 1), round(after_us * rate / 1000, 1)),
+        f"reply_kb_per_min@{rate}": (round(len(full_reply) * rate / 1024, 1), round(len(projected_reply) * rate / 1024, 1)),
+    }
+    print(f"{'client side':<26}{'before':>12}{'after':>12}{'saved':>12}")
+    for metric, (before, after) in rows.items():
+        print(f"{metric:<26}{before:>12}{after:>12}{round(before - after, 2):>12}")
+
+
+async def server_side(uri: str, documents: int, lookups: int) -> None:
+    client = AsyncMongoClient(uri)
+    collection = client[DATABASE][COLLECTION]
+    await collection.drop()
+    await collection.insert_many([auth_document(f"bench-user-{i}") for i in range(documents)])
+    for model in AuthRepository.indexes["auth"]:
+        await collection.create_indexes([model])
+
+    query = {"userID": "bench-user-1"}
+    projection = AuthRepository.CREDENTIALS_PROJECTION
+
+    async def timed(**kwargs) -> float:
+        start = perf_counter()
+        for i in range(lookups):
+            await collection.find_one({"userID": f"bench-user-{i % documents}"}, **kwargs)
+        return (perf_counter() - start) * 1000 / lookups
+
+    before_ms = await timed()
+    after_ms = await timed(projection=projection)
+    explain = await collection.find(query, projection).explain()
+    stats = explain["executionStats"]
+
+    print(f"\n{'server side':<26}{'before':>12}{'after':>12}")
+    print(f"{'lookup_ms':<26}{round(before_ms, 3):>12}{round(after_ms, 3):>12}")
+    print(f"keys examined {stats['totalKeysExamined']}, docs examined {stats['totalDocsExamined']}")
+    await collection.drop()
+    await client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50_000)
+    parser.add_argument("--rate", type=int, default=10_000, help="logins per minute to extrapolate to")
+    parser.add_argument("--uri", default=None)
+    parser.add_argument("--documents", type=int, default=10_000)
+    parser.add_argument("--lookups", type=int, default=2_000)
+    args = parser.parse_args()
+
+    client_side(args.iterations, args.rate)
+    if args.uri:
+        asyncio.run(server_side(args.uri, args.documents, args.lookups))